@@ -0,0 +1,299 @@
+"""
+Benchmarks for pattern collection, index introspection and matching.
+
+Generates a synthetic project (N modules x M decorated methods over K tables
+with I indexes each), times the runner internals against it and writes the
+results as JSON. Pass --compare to check a run against a previous one:
+
+    python benchmarks/bench.py --modules 200 --methods 20 -o before.json
+    python benchmarks/bench.py --modules 200 --methods 20 --compare before.json
+"""
+
+import json
+import os
+import platform
+import shutil
+import statistics
+import sys
+import tempfile
+import textwrap
+import time
+from pathlib import Path
+from typing import Callable
+
+import click
+
+from query_patterns.cli.runner.base import BaseRunner
+from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+from query_patterns.registry import registry
+
+
+PACKAGE = "bench_app"
+DJANGO_APP = "bench_django"
+
+
+class _Runner(BaseRunner):
+    quiet = True
+
+
+def _write_project(
+    root: Path, modules: int, methods: int, tables: int, indexes: int
+) -> None:
+    """
+    Write PACKAGE (repositories + SQLAlchemy metadata), a Django app with the
+    same tables, and a settings module using a SQLite file in root.
+    """
+    pkg = root / PACKAGE
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+
+    columns = indexes + 1
+    schema = ["from sqlalchemy import MetaData, Table, Column, Integer, Index", ""]
+    schema.append("metadata = MetaData()")
+    for t in range(tables):
+        cols = ", ".join(f'Column("c{c}", Integer)' for c in range(columns))
+        idx = ", ".join(
+            f'Index("ix_t{t}_{i}", "c{i}", "c{i + 1}")' for i in range(indexes)
+        )
+        schema.append(f'Table("t{t}", metadata, {cols}, {idx})')
+    (pkg / "schema.py").write_text("\n".join(schema) + "\n")
+
+    for n in range(modules):
+        lines = ["from query_patterns import query_pattern", "", "class Repo:"]
+        for m in range(methods):
+            seq = n * methods + m
+            table = f"t{seq % tables}"
+            # Mix of exact, prefix and missing matches.
+            first = seq % columns
+            cols = [f"c{first}", f"c{(first + 1) % columns}"][: 1 + seq % 2]
+            lines.append(f"    @query_pattern(table={table!r}, columns={cols!r})")
+            lines.append(f"    def q{m}(self): pass")
+        (pkg / f"repo_{n:04}.py").write_text("\n".join(lines) + "\n")
+
+    app = root / DJANGO_APP
+    app.mkdir()
+    (app / "__init__.py").write_text("")
+    models = ["from django.db import models", ""]
+    for t in range(tables):
+        models.append(f"class T{t}(models.Model):")
+        for c in range(columns):
+            models.append(f"    c{c} = models.IntegerField()")
+        models.append("    class Meta:")
+        models.append(f'        db_table = "t{t}"')
+        idx = ", ".join(
+            f'models.Index(fields=["c{i}", "c{i + 1}"], name="dj_t{t}_{i}")'
+            for i in range(indexes)
+        )
+        models.append(f"        indexes = [{idx}]")
+    (app / "models.py").write_text("\n".join(models) + "\n")
+
+    (root / "bench_settings.py").write_text(
+        textwrap.dedent(f"""
+            INSTALLED_APPS = ["{DJANGO_APP}"]
+            SECRET_KEY = "bench"
+            DATABASES = {{
+                "default": {{
+                    "ENGINE": "django.db.backends.sqlite3",
+                    "NAME": {str(root / "django.db")!r},
+                }}
+            }}
+        """)
+    )
+
+
+def _forget_project():
+    """
+    Unload the generated modules so the next import does the full work again.
+    """
+    for name in list(sys.modules):
+        if name == PACKAGE or name.startswith(f"{PACKAGE}."):
+            del sys.modules[name]
+            registry.discard_module(name)
+
+
+def _time(fn: Callable[[], object], repeat: int, setup=None) -> dict[str, float]:
+    timings = []
+    for _ in range(repeat):
+        if setup is not None:
+            setup()
+        start = time.perf_counter()
+        fn()
+        timings.append(time.perf_counter() - start)
+    return {
+        "min": min(timings),
+        "median": statistics.median(timings),
+        "repeat": repeat,
+    }
+
+
+def run_benchmarks(
+    root: Path, repeat: int, django: bool
+) -> dict[str, dict[str, float]]:
+    os.chdir(root)
+    sys.path.insert(0, str(root))
+    runner = _Runner()
+    results: dict[str, dict[str, float]] = {}
+
+    results["discover_modules"] = _time(
+        lambda: runner._discover_modules_from_cwd(), repeat, setup=_forget_project
+    )
+    modules = runner._discover_modules_from_cwd()
+    results["collect_query_patterns"] = _time(
+        lambda: runner._collect_query_patterns(modules), repeat
+    )
+    runner.module = tuple(m.__name__ for m in modules if ".repo_" in m.__name__)
+    results["collect_query_patterns_statically"] = _time(
+        lambda: runner._collect_query_patterns_statically(), repeat
+    )
+    patterns, _ = runner._collect_query_patterns(modules)
+
+    from sqlalchemy import create_engine
+    from bench_app.schema import metadata
+
+    engine = create_engine(f"sqlite:///{root / 'sqlalchemy.db'}")
+    metadata.create_all(engine)
+    results["sqlalchemy_indexes_from_schema"] = _time(
+        lambda: SQLAlchemyRunner._collect_sqlalchemy_indexes_from_schema(metadata),
+        repeat,
+    )
+    results["sqlalchemy_indexes_from_db"] = _time(
+        lambda: SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(engine), repeat
+    )
+    results["sqlalchemy_indexes_per_table"] = _time(
+        lambda: SQLAlchemyRunner._collect_sqlalchemy_indexes_per_table(engine),
+        repeat,
+    )
+    indexes = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_schema(metadata)
+    engine.dispose()
+
+    results["analyze_patterns"] = _time(
+        lambda: runner._analyze_patterns(patterns, indexes), repeat
+    )
+
+    if django:
+        results.update(_run_django_benchmarks(repeat))
+    return results
+
+
+def _run_django_benchmarks(repeat: int) -> dict[str, dict[str, float]]:
+    import django
+    from django.apps import apps
+    from django.db import connection
+
+    from query_patterns.cli.runner.django import DjangoRunner
+
+    os.environ["DJANGO_SETTINGS_MODULE"] = "bench_settings"
+    django.setup()
+    with connection.schema_editor() as editor:
+        for model in apps.get_app_config(DJANGO_APP).get_models():
+            editor.create_model(model)
+
+    return {
+        "django_indexes_from_schema": _time(
+            DjangoRunner._collect_django_indexes_from_schema, repeat
+        ),
+        "django_indexes_from_db": _time(
+            DjangoRunner._collect_django_indexes_from_db, repeat
+        ),
+    }
+
+
+def compare(baseline: dict, current: dict) -> list[tuple[str, float, float, float]]:
+    """
+    Return (name, baseline median, current median, ratio) for every benchmark
+    present in both runs.
+    """
+    rows = []
+    for name, result in current["results"].items():
+        before = baseline.get("results", {}).get(name)
+        if before is None:
+            continue
+        ratio = result["median"] / before["median"] if before["median"] else 1.0
+        rows.append((name, before["median"], result["median"], ratio))
+    return rows
+
+
+@click.command()
+@click.option("--modules", type=click.IntRange(min=1), default=100)
+@click.option("--methods", type=click.IntRange(min=1), default=10)
+@click.option("--tables", type=click.IntRange(min=1), default=50)
+@click.option("--indexes", type=click.IntRange(min=1), default=4)
+@click.option("--repeat", type=click.IntRange(min=1), default=5)
+@click.option("--django/--no-django", default=True, help="Include Django benchmarks.")
+@click.option(
+    "--output",
+    "-o",
+    type=click.Path(dir_okay=False),
+    default="bench_output.json",
+    help="Where to write the results.",
+)
+@click.option(
+    "--compare",
+    "baseline_file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Previous results to compare against.",
+)
+@click.option(
+    "--threshold",
+    type=float,
+    default=1.2,
+    help="Median slowdown ratio reported as a regression with --compare.",
+)
+def main(
+    modules,
+    methods,
+    tables,
+    indexes,
+    repeat,
+    django,
+    output,
+    baseline_file,
+    threshold,
+):
+    output = Path(output).resolve()
+    params = {
+        "modules": modules,
+        "methods": methods,
+        "tables": tables,
+        "indexes": indexes,
+    }
+    root = Path(tempfile.mkdtemp(prefix="query-patterns-bench-"))
+    cwd = Path.cwd()
+    try:
+        _write_project(root, modules, methods, tables, indexes)
+        results = run_benchmarks(root, repeat, django)
+    finally:
+        os.chdir(cwd)
+        shutil.rmtree(root, ignore_errors=True)
+
+    document = {
+        "params": params,
+        "python": platform.python_version(),
+        "platform": platform.platform(),
+        "results": results,
+    }
+    output.write_text(json.dumps(document, indent=2) + "\n")
+
+    for name, result in results.items():
+        click.echo(f"{name:40} {result['median'] * 1000:10.2f} ms")
+    click.echo(f"Wrote {output}")
+
+    if baseline_file:
+        baseline = json.loads(Path(baseline_file).read_text())
+        if baseline.get("params") != params:
+            click.echo("[WARN] Baseline was run with different parameters", err=True)
+        regressions = 0
+        for name, before, after, ratio in compare(baseline, document):
+            line = f"{name:40} {before * 1000:10.2f} -> {after * 1000:10.2f} ms"
+            line += f" ({ratio:.2f}x)"
+            if ratio > threshold:
+                regressions += 1
+                click.echo(click.style(line, fg="red"))
+            else:
+                click.echo(line)
+        if regressions:
+            raise click.ClickException(f"{regressions} benchmark(s) regressed")
+
+
+if __name__ == "__main__":
+    main()
@@ -1,9 +1,16 @@
-from importlib.metadata import version
-
-__version__ = version("query-patterns")
-
 from .decorator import query_pattern
 
 __all__ = [
     "query_pattern",
 ]
+
+
+def __getattr__(name: str):
+    # Reading package metadata is slow; only pay for it when asked.
+    if name == "__version__":
+        from importlib.metadata import version
+
+        global __version__
+        __version__ = version("query-patterns")
+        return __version__
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
@@ -0,0 +1,92 @@
+import hashlib
+import json
+import os
+from dataclasses import asdict
+from pathlib import Path
+
+from query_patterns.cli.collector.static import FileExtract, extract_file
+
+
+DEFAULT_CACHE_DIR = ".query-patterns-cache"
+CACHE_FILE = "extracts.json"
+CACHE_VERSION = 4
+
+
+class ExtractCache:
+    """
+    Per-file cache of static extraction results.
+
+    Entries are keyed by path and validated by size and mtime first; when those
+    changed, the content hash decides whether the file really needs to be parsed
+    again (e.g. after a checkout that only touched timestamps).
+    """
+
+    def __init__(self, directory: Path):
+        self.directory = directory
+        self.path = directory / CACHE_FILE
+        self.entries: dict[str, dict] = {}
+        self.seen: set[str] = set()
+        self.hits = 0
+        self.misses = 0
+
+    def load(self):
+        try:
+            data = json.loads(self.path.read_text())
+        except (OSError, ValueError):
+            return
+        if data.get("version") != CACHE_VERSION:
+            return
+        self.entries = data.get("entries", {})
+
+    def save(self):
+        self.directory.mkdir(parents=True, exist_ok=True)
+        # Files are parsed on demand, so unseen entries are only dropped once
+        # their file is gone.
+        entries = {
+            k: v for k, v in self.entries.items() if k in self.seen or os.path.exists(k)
+        }
+        tmp = self.path.with_suffix(f".{os.getpid()}.tmp")
+        tmp.write_text(
+            json.dumps(
+                {"version": CACHE_VERSION, "entries": entries}, separators=(",", ":")
+            )
+        )
+        tmp.replace(self.path)
+
+    def get(self, path: Path, module: str) -> FileExtract:
+        key = str(path)
+        self.seen.add(key)
+        stat = path.stat()
+        entry = self.entries.get(key)
+
+        if (
+            entry is not None
+            and entry["module"] == module
+            and entry["size"] == stat.st_size
+            and entry["mtime_ns"] == stat.st_mtime_ns
+        ):
+            self.hits += 1
+            return FileExtract.from_dict(entry["extract"])
+
+        source = path.read_bytes()
+        digest = hashlib.sha256(source).hexdigest()
+        if (
+            entry is not None
+            and entry["module"] == module
+            and entry["sha256"] == digest
+        ):
+            self.hits += 1
+            entry["size"] = stat.st_size
+            entry["mtime_ns"] = stat.st_mtime_ns
+            return FileExtract.from_dict(entry["extract"])
+
+        self.misses += 1
+        extract = extract_file(path, module, source)
+        self.entries[key] = {
+            "module": module,
+            "size": stat.st_size,
+            "mtime_ns": stat.st_mtime_ns,
+            "sha256": digest,
+            "extract": asdict(extract),
+        }
+        return extract
@@ -0,0 +1,106 @@
+import importlib
+import sys
+from collections import OrderedDict
+from concurrent.futures import ProcessPoolExecutor
+from typing import Any, Callable
+
+from query_patterns import registry
+from query_patterns.pattern import QueryPattern
+from query_patterns.registry import registry as pattern_registry
+from query_patterns.utils import iter_module_patterns
+
+
+# Picklable form of a QueryPattern: (table, columns, order_by, condition)
+PatternKey = tuple[str, tuple[str, ...], tuple[str, ...], str | None]
+# Picklable declaration: (pattern key, qualname, file, line); the location
+# fields are empty for modules the registry doesn't know.
+DeclarationRow = tuple[PatternKey, str, str, int]
+
+# Modules per task; small enough to balance uneven shards across workers.
+CHUNK_SIZE = 16
+
+
+def _init_worker(cwd: str, load_env: Callable[[], None] | None):
+    registry.set_enabled(True)
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+    if load_env is not None:
+        load_env()
+
+
+def _module_rows(module) -> list[DeclarationRow]:
+    if pattern_registry.has_module(module.__name__):
+        return [
+            (_pattern_key(p), d.qualname, d.file, d.line)
+            for p, d in pattern_registry.iter_declarations([module.__name__])
+        ]
+    return [(_pattern_key(p), "", "", 0) for p in iter_module_patterns(module)]
+
+
+def _pattern_key(pattern: QueryPattern) -> PatternKey:
+    return (pattern.table, pattern.columns, pattern.order_by, pattern.condition)
+
+
+def _collect_shard(
+    shard: tuple[list[str], bool],
+) -> list[tuple[str, list[DeclarationRow]]]:
+    """
+    Import each module in the shard and return (module name, declarations)
+    as plain tuples, one entry per module, in declaration order.
+    """
+    module_names, strict = shard
+    results = []
+    for name in module_names:
+        try:
+            module = importlib.import_module(name)
+        except Exception:
+            if strict:
+                raise
+            results.append((name, []))
+            continue
+        results.append((name, _module_rows(module)))
+    return results
+
+
+def collect_in_processes(
+    module_names: list[str],
+    jobs: int,
+    cwd: str,
+    load_env: Callable[[], None] | None = None,
+    strict: bool = False,
+    locations: dict[QueryPattern, list[dict[str, Any]]] | None = None,
+) -> tuple[list[QueryPattern], OrderedDict[QueryPattern, int]]:
+    """
+    Import modules across `jobs` worker processes and merge the declarations
+    into the same (patterns, counts) shape as a single-process scan.
+
+    Shards are merged in submission order, so the result does not depend on
+    which worker finishes first. With strict=True, import errors propagate.
+    When `locations` is given, it is filled with the declaring locations of
+    every pattern.
+    """
+    shards = [
+        (module_names[i : i + CHUNK_SIZE], strict)
+        for i in range(0, len(module_names), CHUNK_SIZE)
+    ]
+    counts: OrderedDict[QueryPattern, int] = OrderedDict()
+
+    with ProcessPoolExecutor(
+        max_workers=jobs, initializer=_init_worker, initargs=(cwd, load_env)
+    ) as executor:
+        for shard_result in executor.map(_collect_shard, shards):
+            for module_name, rows in shard_result:
+                for key, qualname, file, line in rows:
+                    p = QueryPattern(*key)
+                    counts[p] = counts.get(p, 0) + 1
+                    if locations is not None and qualname:
+                        locations.setdefault(p, []).append(
+                            {
+                                "module": module_name,
+                                "qualname": qualname,
+                                "file": file,
+                                "line": line,
+                            }
+                        )
+
+    return list(counts.keys()), counts
@@ -0,0 +1,550 @@
+import ast
+from collections import OrderedDict
+from dataclasses import dataclass, field
+from pathlib import Path
+from typing import Any, Iterable, Mapping
+
+from query_patterns.pattern import QueryPattern
+from query_patterns.tables import qualify_table, split_schema
+
+
+DECORATOR_MODULES = {"query_patterns", "query_patterns.decorator"}
+DECORATOR_NAME = "query_pattern"
+
+# A reference is either a string literal or a dotted attribute chain
+# (e.g. ["User", "email"] for `User.email`, ["users", "c", "id"] for `users.c.id`).
+Ref = tuple[str, str] | tuple[str, list[str]]
+# An ORDER BY item: (reference, descending)
+OrderRef = tuple[Ref, bool]
+
+
+@dataclass
+class Declaration:
+    table: Ref
+    columns: list[Ref]
+    qualname: str
+    line: int
+    database: str | None = None
+    order_by: list[OrderRef] = field(default_factory=list)
+    condition: str | None = None
+
+
+@dataclass
+class FileExtract:
+    """
+    Everything the static collector needs from one source file.
+
+    Only plain types are stored so an extract can be serialized as-is.
+    """
+
+    module: str
+    tables: dict[str, str] = field(default_factory=dict)
+    constants: dict[str, str] = field(default_factory=dict)
+    imports: dict[str, list[str | None]] = field(default_factory=dict)
+    declarations: list[Declaration] = field(default_factory=list)
+    errors: list[str] = field(default_factory=list)
+
+    @classmethod
+    def from_dict(cls, data: dict) -> "FileExtract":
+        declarations = [
+            Declaration(
+                table=tuple(d["table"]),
+                columns=[tuple(c) for c in d["columns"]],
+                qualname=d["qualname"],
+                line=d["line"],
+                database=d.get("database"),
+                order_by=[(tuple(ref), desc) for ref, desc in d.get("order_by", [])],
+                condition=d.get("condition"),
+            )
+            for d in data["declarations"]
+        ]
+        return cls(**{**data, "declarations": declarations})
+
+
+def extract_file(path: Path, module: str, source: bytes | None = None) -> FileExtract:
+    """
+    Parse a single file and extract table symbols, imports and
+    @query_pattern declarations without importing it.
+    """
+    extract = FileExtract(module=module)
+    if source is None:
+        source = path.read_bytes()
+    try:
+        tree = ast.parse(source, filename=str(path))
+    except (SyntaxError, ValueError) as e:
+        extract.errors.append(f"{path}: {e}")
+        return extract
+
+    _Extractor(extract).visit_module(tree)
+    return extract
+
+
+class _Extractor:
+    def __init__(self, extract: FileExtract):
+        self.extract = extract
+        self.decorator_names: set[str] = set()
+        self.decorator_modules: set[str] = set()
+
+    def visit_module(self, tree: ast.Module):
+        for node in tree.body:
+            if isinstance(node, ast.Import):
+                self._visit_import(node)
+            elif isinstance(node, ast.ImportFrom):
+                self._visit_import_from(node)
+            elif isinstance(node, ast.Assign):
+                self._visit_assign(node)
+            elif isinstance(node, ast.ClassDef):
+                self._visit_class(node)
+            elif isinstance(node, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._visit_function(node, node.name)
+
+    def _visit_import(self, node: ast.Import):
+        for alias in node.names:
+            if alias.asname:
+                self.extract.imports[alias.asname] = [alias.name, None]
+                local = alias.asname
+            else:
+                head = alias.name.split(".", 1)[0]
+                self.extract.imports[head] = [head, None]
+                local = alias.name
+            if alias.name in DECORATOR_MODULES:
+                self.decorator_modules.add(local)
+
+    def _visit_import_from(self, node: ast.ImportFrom):
+        module = self._absolute_module(node)
+        for alias in node.names:
+            local = alias.asname or alias.name
+            self.extract.imports[local] = [module, alias.name]
+            if module in DECORATOR_MODULES and alias.name == DECORATOR_NAME:
+                self.decorator_names.add(local)
+
+    def _absolute_module(self, node: ast.ImportFrom) -> str:
+        if not node.level:
+            return node.module or ""
+        package = self.extract.module.split(".")[: -node.level]
+        if node.module:
+            package.append(node.module)
+        return ".".join(package)
+
+    def _visit_assign(self, node: ast.Assign):
+        for target in node.targets:
+            if not isinstance(target, ast.Name):
+                continue
+            if isinstance(node.value, ast.Constant) and isinstance(
+                node.value.value, str
+            ):
+                self.extract.constants[target.id] = node.value.value
+            table = _table_call_name(node.value)
+            if table is not None:
+                self.extract.tables[target.id] = table
+
+    def _visit_class(self, node: ast.ClassDef):
+        table = _class_table_name(node, self.extract.module)
+        if table is not None:
+            self.extract.tables[node.name] = table
+
+        # Source order, like the registry fills up when the class body runs.
+        for item in node.body:
+            if isinstance(item, (ast.FunctionDef, ast.AsyncFunctionDef)):
+                self._visit_function(item, f"{node.name}.{item.name}")
+
+    def _visit_function(self, node: ast.FunctionDef | ast.AsyncFunctionDef, qualname):
+        # Decorators apply bottom-up, so the innermost one registers first.
+        for decorator in reversed(node.decorator_list):
+            if not self._is_query_pattern(decorator):
+                continue
+            declaration = self._parse_declaration(decorator, qualname)
+            if declaration is not None:
+                self.extract.declarations.append(declaration)
+
+    def _is_query_pattern(self, node: ast.expr) -> bool:
+        if not isinstance(node, ast.Call):
+            return False
+        func = node.func
+        if isinstance(func, ast.Name):
+            return func.id in self.decorator_names
+        if isinstance(func, ast.Attribute) and func.attr == DECORATOR_NAME:
+            chain = _attr_chain(func.value)
+            return chain is not None and ".".join(chain) in self.decorator_modules
+        return False
+
+    def _parse_declaration(self, node: ast.Call, qualname: str) -> Declaration | None:
+        kwargs = {kw.arg: kw.value for kw in node.keywords if kw.arg}
+        location = f"{self.extract.module}:{node.lineno}"
+
+        table = _parse_ref(kwargs.get("table"))
+        if table is None:
+            self.extract.errors.append(f"{location}: cannot resolve table statically")
+            return None
+
+        columns_node = kwargs.get("columns")
+        if not isinstance(columns_node, (ast.List, ast.Tuple, ast.Set)):
+            self.extract.errors.append(
+                f"{location}: columns must be a literal list or tuple"
+            )
+            return None
+
+        columns = [_parse_ref(elt) for elt in columns_node.elts]
+        if any(c is None for c in columns):
+            self.extract.errors.append(f"{location}: cannot resolve columns statically")
+            return None
+
+        order_by: list[OrderRef] = []
+        if "order_by" in kwargs:
+            order_node = kwargs["order_by"]
+            if not isinstance(order_node, (ast.List, ast.Tuple)):
+                self.extract.errors.append(
+                    f"{location}: order_by must be a literal list or tuple"
+                )
+                return None
+            parsed = [_parse_order(elt) for elt in order_node.elts]
+            if any(item is None for item in parsed):
+                self.extract.errors.append(
+                    f"{location}: cannot resolve order_by statically"
+                )
+                return None
+            order_by = parsed
+        if not columns and not order_by:
+            self.extract.errors.append(f"{location}: cannot resolve columns statically")
+            return None
+
+        condition = _string_literal(kwargs.get("condition"))
+        if "condition" in kwargs and condition is None:
+            self.extract.errors.append(
+                f"{location}: condition must be a string literal"
+            )
+            return None
+
+        database = _string_literal(kwargs.get("database"))
+        if "database" in kwargs and database is None:
+            self.extract.errors.append(f"{location}: database must be a string literal")
+            return None
+
+        return Declaration(
+            table=table,
+            columns=columns,
+            qualname=qualname,
+            line=node.lineno,
+            database=database,
+            order_by=order_by,
+            condition=condition,
+        )
+
+
+def _attr_chain(node: ast.expr) -> list[str] | None:
+    parts = []
+    while isinstance(node, ast.Attribute):
+        parts.append(node.attr)
+        node = node.value
+    if not isinstance(node, ast.Name):
+        return None
+    parts.append(node.id)
+    return parts[::-1]
+
+
+def _parse_ref(node: ast.expr | None) -> Ref | None:
+    if node is None:
+        return None
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return ("lit", node.value)
+
+    # Django: Model._meta.get_field("name")
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr == "get_field"
+        and len(node.args) == 1
+        and isinstance(node.args[0], ast.Constant)
+        and isinstance(node.args[0].value, str)
+    ):
+        return ("lit", node.args[0].value)
+
+    chain = _attr_chain(node)
+    if chain is None:
+        return None
+    return ("ref", chain)
+
+
+def _parse_order(node: ast.expr) -> OrderRef | None:
+    """
+    "-column" / column references, `column.desc()` / `.asc()` and
+    `F("column").desc()`.
+    """
+    if (
+        isinstance(node, ast.Call)
+        and isinstance(node.func, ast.Attribute)
+        and node.func.attr in ("asc", "desc")
+        and not node.args
+    ):
+        inner = node.func.value
+        # Django: F("created_at").desc()
+        if (
+            isinstance(inner, ast.Call)
+            and isinstance(inner.func, ast.Name)
+            and inner.func.id == "F"
+            and len(inner.args) == 1
+        ):
+            name = _string_literal(inner.args[0])
+            ref = ("lit", name) if name is not None else None
+        else:
+            ref = _parse_ref(inner)
+        return (ref, node.func.attr == "desc") if ref is not None else None
+
+    ref = _parse_ref(node)
+    return (ref, False) if ref is not None else None
+
+
+def _string_literal(node: ast.expr | None) -> str | None:
+    if isinstance(node, ast.Constant) and isinstance(node.value, str):
+        return node.value
+    return None
+
+
+def _table_call_name(node: ast.expr) -> str | None:
+    """
+    Return the (schema-qualified) table name of a
+    `Table("name", metadata, ..., schema="...")` call.
+    """
+    if not isinstance(node, ast.Call) or not node.args:
+        return None
+    func = node.func
+    func_name = (
+        func.attr if isinstance(func, ast.Attribute) else getattr(func, "id", "")
+    )
+    name = _string_literal(node.args[0])
+    if func_name != "Table" or name is None:
+        return None
+    schema = next(
+        (_string_literal(kw.value) for kw in node.keywords if kw.arg == "schema"),
+        None,
+    )
+    return qualify_table(name, schema)
+
+
+def _table_args_schema(node: ast.expr) -> str | None:
+    """
+    The schema of `__table_args__ = {"schema": ...}`, or of the dict that
+    ends a `__table_args__` tuple.
+    """
+    if isinstance(node, ast.Tuple) and node.elts:
+        node = node.elts[-1]
+    if not isinstance(node, ast.Dict):
+        return None
+    for key, value in zip(node.keys, node.values):
+        if _string_literal(key) == "schema":
+            return _string_literal(value)
+    return None
+
+
+def _class_table_name(node: ast.ClassDef, module: str) -> str | None:
+    is_django_model = False
+    for base in node.bases:
+        chain = _attr_chain(base)
+        if chain and chain[-1] == "Model":
+            is_django_model = True
+
+    app_label = None
+    tablename = None
+    schema = None
+    for item in node.body:
+        if isinstance(item, ast.Assign):
+            for target in item.targets:
+                if not isinstance(target, ast.Name):
+                    continue
+                # SQLAlchemy ORM
+                if target.id == "__tablename__" and isinstance(
+                    item.value, ast.Constant
+                ):
+                    tablename = str(item.value.value)
+                if target.id == "__table_args__":
+                    schema = _table_args_schema(item.value)
+                # SQLAlchemy ORM with an explicit Core table
+                if target.id == "__table__":
+                    table = _table_call_name(item.value)
+                    if table is not None:
+                        return table
+
+        # Django Meta.db_table / Meta.app_label
+        if isinstance(item, ast.ClassDef) and item.name == "Meta":
+            for meta_item in item.body:
+                if not isinstance(meta_item, ast.Assign):
+                    continue
+                if not isinstance(meta_item.value, ast.Constant):
+                    continue
+                for target in meta_item.targets:
+                    if not isinstance(target, ast.Name):
+                        continue
+                    if target.id == "db_table":
+                        return str(meta_item.value.value)
+                    if target.id == "app_label":
+                        app_label = str(meta_item.value.value)
+
+    if tablename is not None:
+        return qualify_table(tablename, schema)
+    if is_django_model:
+        # Django's default: "<app_label>_<model name>", where the app label is
+        # the package that holds the models module (or models package, as in
+        # app/models/user.py).
+        if app_label is None:
+            parts = module.split(".")
+            if "models" in parts[1:]:
+                parts = parts[: len(parts) - 1 - parts[::-1].index("models")]
+            elif len(parts) > 1:
+                parts = parts[:-1]
+            app_label = parts[-1]
+        return f"{app_label}_{node.name.lower()}"
+    return None
+
+
+class StaticCollector:
+    """
+    Resolve declarations from parsed files into QueryPatterns.
+
+    `extracts` must cover every module that defines tables referenced by
+    declarations (ORM models, Core tables), not only the modules to scan.
+    """
+
+    MAX_IMPORT_DEPTH = 8
+
+    def __init__(self, extracts: Iterable[FileExtract] | Mapping[str, FileExtract]):
+        # A mapping may load extracts lazily (see BaseRunner's static collector).
+        self.extracts: Mapping[str, FileExtract] = (
+            extracts
+            if isinstance(extracts, Mapping)
+            else {e.module: e for e in extracts}
+        )
+        self.errors: list[str] = []
+        # pattern -> [{"module", "qualname", "line"}] of collected modules
+        self.locations: dict[QueryPattern, list[dict[str, Any]]] = {}
+
+    def collect(
+        self, modules: Iterable[str]
+    ) -> tuple[list[QueryPattern], OrderedDict[QueryPattern, int]]:
+        """
+        Return (patterns, counts) in the same shape as
+        BaseRunner._collect_query_patterns.
+        """
+        counts: OrderedDict[QueryPattern, int] = OrderedDict()
+
+        for module in modules:
+            extract = self.extracts.get(module)
+            if extract is None:
+                continue
+            self.errors.extend(extract.errors)
+            # The registry keeps one declaration per (pattern, qualname).
+            seen: set[tuple[QueryPattern, str]] = set()
+            for declaration in extract.declarations:
+                pattern = self._resolve_declaration(extract, declaration)
+                if pattern is None or (pattern, declaration.qualname) in seen:
+                    continue
+                seen.add((pattern, declaration.qualname))
+                counts[pattern] = counts.get(pattern, 0) + 1
+                self.locations.setdefault(pattern, []).append(
+                    {
+                        "module": module,
+                        "qualname": declaration.qualname,
+                        "line": declaration.line,
+                    }
+                )
+
+        return list(counts.keys()), counts
+
+    def _resolve_declaration(
+        self, extract: FileExtract, declaration: Declaration
+    ) -> QueryPattern | None:
+        table = self._resolve_table(extract, declaration.table)
+        if table is None:
+            self.errors.append(
+                f"{extract.module}:{declaration.line}: "
+                f"cannot resolve table {_format_ref(declaration.table)}"
+            )
+            return None
+
+        columns = tuple(_resolve_column(ref) for ref in declaration.columns)
+        order_by = tuple(
+            f"-{_resolve_column(ref)}" if desc else _resolve_column(ref)
+            for ref, desc in declaration.order_by
+        )
+        return QueryPattern(
+            table=qualify_table(table, database=declaration.database),
+            columns=columns,
+            order_by=order_by,
+            condition=declaration.condition,
+        )
+
+    def _resolve_table(self, extract: FileExtract, ref: Ref) -> str | None:
+        kind, value = ref
+        if kind == "lit":
+            return value
+
+        chain = list(value)
+        # User.__table__ refers to the same table as User.
+        if len(chain) > 1 and chain[-1] == "__table__":
+            chain = chain[:-1]
+        # users.name and User.__tablename__ are the bare name, without schema.
+        if len(chain) > 1 and chain[-1] in ("__tablename__", "name"):
+            table = self._resolve_symbol(extract, chain[:-1], depth=0)
+            return split_schema(table)[1] if table is not None else None
+        if len(chain) > 2 and chain[-2:] == ["_meta", "db_table"]:
+            chain = chain[:-2]
+        return self._resolve_symbol(extract, chain, depth=0)
+
+    def _resolve_symbol(
+        self, extract: FileExtract, chain: list[str], depth: int
+    ) -> str | None:
+        if depth > self.MAX_IMPORT_DEPTH:
+            return None
+
+        head, rest = chain[0], chain[1:]
+        if not rest:
+            if head in extract.tables:
+                return extract.tables[head]
+            if head in extract.constants:
+                return extract.constants[head]
+
+        if head not in extract.imports:
+            return None
+
+        module, name = extract.imports[head]
+        if name is None:
+            # `import pkg.models as m` -> m.User
+            target = self._find_module(module, rest)
+            if target is None:
+                return None
+            target_extract, remaining = target
+            return self._resolve_symbol(target_extract, remaining, depth + 1)
+
+        target_extract = self.extracts.get(module)
+        if target_extract is not None:
+            resolved = self._resolve_symbol(target_extract, [name, *rest], depth + 1)
+            if resolved is not None:
+                return resolved
+
+        # `from pkg import models` -> models.User
+        submodule = self.extracts.get(f"{module}.{name}")
+        if submodule is not None and rest:
+            return self._resolve_symbol(submodule, rest, depth + 1)
+        return None
+
+    def _find_module(
+        self, module: str, rest: list[str]
+    ) -> tuple[FileExtract, list[str]] | None:
+        # Prefer the longest dotted prefix that names a known module.
+        for i in range(len(rest), -1, -1):
+            name = ".".join([module, *rest[:i]])
+            if name in self.extracts and rest[i:]:
+                return self.extracts[name], rest[i:]
+        return None
+
+
+def _resolve_column(ref: Ref) -> str:
+    kind, value = ref
+    if kind == "lit":
+        return value
+    # User.email, users.c.email, User.__table__.c.email -> "email"
+    return value[-1]
+
+
+def _format_ref(ref: Ref) -> str:
+    kind, value = ref
+    return repr(value) if kind == "lit" else ".".join(value)
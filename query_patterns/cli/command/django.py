@@ -1,14 +1,19 @@
 import click
 
-from query_patterns.cli.runner.django import DjangoRunner
-
 
 @click.command(name="django")
 @click.option(
     "--source",
-    type=click.Choice(["schema", "db"], case_sensitive=False),
+    type=click.Choice(["schema", "db", "snapshot"], case_sensitive=False),
     default="schema",
-    help="Where to collect indexes from: Django model schema or actual DB.",
+    help="Where to collect indexes from: Django model schema, actual DB "
+    "or a snapshot file.",
+)
+@click.option(
+    "--snapshot-file",
+    type=click.Path(dir_okay=False),
+    help="Index snapshot written by `query-patterns snapshot` "
+    "(required if --source=snapshot).",
 )
 @click.option(
     "--module",
@@ -21,8 +26,148 @@ from query_patterns.cli.runner.django import DjangoRunner
     help="Django settings module path (e.g. config.settings). "
     "If omitted, DJANGO_SETTINGS_MODULE must be set.",
 )
+@click.option(
+    "--database",
+    "databases",
+    multiple=True,
+    help="Also read indexes of this DATABASES alias (repeatable). Aliases "
+    "named by database-qualified patterns (alias:table) are read automatically.",
+)
+@click.option(
+    "--fleet-database",
+    "fleet_databases",
+    multiple=True,
+    metavar="GLOB",
+    help="Check patterns against every DATABASES alias matching this glob "
+    "(repeatable, e.g. 'tenant_*') and report index drift between them.",
+)
+@click.option(
+    "--fleet-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    help="Databases read concurrently with --fleet-database. A timed-out database "
+    "keeps its slot until its connection returns.",
+)
+@click.option(
+    "--target-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=60.0,
+    metavar="SECONDS",
+    help="With --fleet-database, report a database as timed out after this "
+    "many seconds.",
+)
+@click.option(
+    "--collector",
+    type=click.Choice(["import", "static"], case_sensitive=False),
+    default="import",
+    help="How to collect @query_pattern declarations: import modules, "
+    "or parse source files statically without importing them.",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Reuse static extraction results for unchanged files "
+    "(stored in .query-patterns-cache/).",
+)
+@click.option(
+    "--since",
+    metavar="GIT_REF",
+    help="Only check patterns declared in .py files changed since this git "
+    "ref (including uncommitted and untracked files).",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes used to import modules.",
+)
+@click.option(
+    "--db-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Concurrent connections for per-table introspection with --source=db "
+    "(used when the database has no bulk catalog query).",
+)
+@click.option(
+    "--report",
+    type=click.Choice(["patterns", "unused"], case_sensitive=False),
+    default="patterns",
+    help="patterns: check declared patterns against indexes. "
+    "unused: list indexes on pattern tables that no pattern needs, "
+    "and indexes made redundant by a wider one.",
+)
+@click.option(
+    "--verify-plans",
+    is_flag=True,
+    help="EXPLAIN a probe query for every indexed pattern and flag sequential "
+    "scans (PostgreSQL and SQLite). Plans are cached per schema in "
+    ".query-patterns-cache/.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(
+        ["text", "json", "ndjson", "sarif", "junit"], case_sensitive=False
+    ),
+    default="text",
+    help="Output format for --report=patterns. With machine formats, progress "
+    "messages go to stderr.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running: re-check the modules of edited files and print "
+    "pattern status changes.",
+)
 @click.option(
     "--quiet", "-q", is_flag=True, help="Show errors only (suppress normal output)."
 )
-def django_cmd(module, settings, source, quiet):
-    DjangoRunner(module=module, settings=settings, source=source, quiet=quiet).run()
+def django_cmd(
+    module,
+    settings,
+    source,
+    snapshot_file,
+    databases,
+    fleet_databases,
+    fleet_workers,
+    target_timeout,
+    collector,
+    cache,
+    since,
+    jobs,
+    db_workers,
+    report,
+    verify_plans,
+    output_format,
+    watch,
+    quiet,
+):
+    # Runners (and through them the ORMs) are imported only when the command runs.
+    from query_patterns.cli.runner.django import DjangoRunner
+
+    runner = DjangoRunner(
+        module=module,
+        settings=settings,
+        source=source,
+        quiet=quiet,
+        collector=collector,
+        cache=cache,
+        since=since,
+        jobs=jobs,
+        db_workers=db_workers,
+        snapshot_file=snapshot_file,
+        report=report,
+        verify_plans=verify_plans,
+        output_format=output_format,
+        databases=databases,
+        fleet_databases=fleet_databases,
+        fleet_workers=fleet_workers,
+        target_timeout=target_timeout,
+    )
+    if watch:
+        runner.watch()
+    elif fleet_databases:
+        runner.fleet()
+    else:
+        runner.run()
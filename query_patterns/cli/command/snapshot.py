@@ -0,0 +1,79 @@
+import click
+
+
+@click.group(name="snapshot")
+def snapshot_cmd():
+    """Dump actual database indexes to a snapshot file."""
+
+
+@snapshot_cmd.command(name="sqlalchemy")
+@click.option("--engine-url", required=True, help="Database URL to introspect.")
+@click.option(
+    "--schema",
+    "schemas",
+    multiple=True,
+    help="Also dump indexes of this schema (repeatable).",
+)
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Snapshot file to write.",
+)
+@click.option(
+    "--db-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Concurrent connections for per-table introspection.",
+)
+def snapshot_sqlalchemy_cmd(engine_url, schemas, output, db_workers):
+    from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+
+    SQLAlchemyRunner(
+        module=(),
+        source="db",
+        metadata=None,
+        engine_url=engine_url,
+        quiet=False,
+        db_workers=db_workers,
+        schemas=schemas,
+    ).snapshot(output)
+
+
+@snapshot_cmd.command(name="django")
+@click.option(
+    "--settings",
+    help="Django settings module path (e.g. config.settings). "
+    "If omitted, DJANGO_SETTINGS_MODULE must be set.",
+)
+@click.option(
+    "--database",
+    "databases",
+    multiple=True,
+    help="Also dump indexes of this DATABASES alias (repeatable).",
+)
+@click.option(
+    "--output",
+    "-o",
+    required=True,
+    type=click.Path(dir_okay=False),
+    help="Snapshot file to write.",
+)
+@click.option(
+    "--db-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Concurrent connections for per-table introspection.",
+)
+def snapshot_django_cmd(settings, databases, output, db_workers):
+    from query_patterns.cli.runner.django import DjangoRunner
+
+    DjangoRunner(
+        module=(),
+        settings=settings,
+        source="db",
+        quiet=False,
+        db_workers=db_workers,
+        databases=databases,
+    ).snapshot(output)
@@ -1,7 +1,5 @@
 import click
 
-from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
-
 
 @click.command(name="sqlalchemy")
 @click.option(
@@ -11,9 +9,10 @@ from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
 )
 @click.option(
     "--source",
-    type=click.Choice(["schema", "db"], case_sensitive=False),
+    type=click.Choice(["schema", "db", "snapshot"], case_sensitive=False),
     default="schema",
-    help="Where to collect indexes from: ORM schema or actual database",
+    help="Where to collect indexes from: ORM schema, actual database "
+    "or a snapshot file",
 )
 @click.option(
     "--metadata",
@@ -24,14 +23,155 @@ from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
     "--engine-url",
     help="Database URL (required if --source=db)",
 )
+@click.option(
+    "--engine-url-file",
+    type=click.Path(exists=True, dir_okay=False),
+    help="Check patterns against every database listed in this file, one "
+    '"URL" or "NAME URL" per line, and report index drift between them.',
+)
+@click.option(
+    "--fleet-workers",
+    type=click.IntRange(min=1),
+    default=8,
+    help="Databases read concurrently with --engine-url-file. A timed-out database "
+    "keeps its slot until its connection returns.",
+)
+@click.option(
+    "--target-timeout",
+    type=click.FloatRange(min=0, min_open=True),
+    default=60.0,
+    metavar="SECONDS",
+    help="With --engine-url-file, report a database as timed out after this "
+    "many seconds.",
+)
+@click.option(
+    "--snapshot-file",
+    type=click.Path(dir_okay=False),
+    help="Index snapshot written by `query-patterns snapshot` "
+    "(required if --source=snapshot)",
+)
+@click.option(
+    "--schema",
+    "schemas",
+    multiple=True,
+    help="Also read indexes of this schema with --source=db (repeatable). "
+    "Schemas named by schema-qualified patterns (schema.table) are read "
+    "automatically.",
+)
+@click.option(
+    "--collector",
+    type=click.Choice(["import", "static"], case_sensitive=False),
+    default="import",
+    help="How to collect @query_pattern declarations: import modules, "
+    "or parse source files statically without importing them.",
+)
+@click.option(
+    "--cache",
+    is_flag=True,
+    help="Reuse static extraction results for unchanged files "
+    "(stored in .query-patterns-cache/).",
+)
+@click.option(
+    "--since",
+    metavar="GIT_REF",
+    help="Only check patterns declared in .py files changed since this git "
+    "ref (including uncommitted and untracked files).",
+)
+@click.option(
+    "--jobs",
+    "-j",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Number of worker processes used to import modules.",
+)
+@click.option(
+    "--db-workers",
+    type=click.IntRange(min=1),
+    default=1,
+    help="Concurrent connections for per-table introspection with --source=db "
+    "(used when the database has no bulk catalog query).",
+)
+@click.option(
+    "--report",
+    type=click.Choice(["patterns", "unused"], case_sensitive=False),
+    default="patterns",
+    help="patterns: check declared patterns against indexes. "
+    "unused: list indexes on pattern tables that no pattern needs, "
+    "and indexes made redundant by a wider one.",
+)
+@click.option(
+    "--verify-plans",
+    is_flag=True,
+    help="EXPLAIN a probe query for every indexed pattern and flag sequential "
+    "scans (PostgreSQL and SQLite). Plans are cached per schema in "
+    ".query-patterns-cache/.",
+)
+@click.option(
+    "--format",
+    "output_format",
+    type=click.Choice(
+        ["text", "json", "ndjson", "sarif", "junit"], case_sensitive=False
+    ),
+    default="text",
+    help="Output format for --report=patterns. With machine formats, progress "
+    "messages go to stderr.",
+)
+@click.option(
+    "--watch",
+    is_flag=True,
+    help="Keep running: re-check the modules of edited files and print "
+    "pattern status changes.",
+)
 @click.option(
     "--quiet", "-q", is_flag=True, help="Show errors only (suppress normal output)."
 )
-def sqlalchemy_cmd(module, metadata, source, engine_url, quiet):
-    SQLAlchemyRunner(
+def sqlalchemy_cmd(
+    module,
+    metadata,
+    source,
+    engine_url,
+    engine_url_file,
+    fleet_workers,
+    target_timeout,
+    snapshot_file,
+    schemas,
+    collector,
+    cache,
+    since,
+    jobs,
+    db_workers,
+    report,
+    verify_plans,
+    output_format,
+    watch,
+    quiet,
+):
+    # Runners (and through them the ORMs) are imported only when the command runs.
+    from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+
+    runner = SQLAlchemyRunner(
         module=module,
         metadata=metadata,
         source=source,
         engine_url=engine_url,
         quiet=quiet,
-    ).run()
+        collector=collector,
+        cache=cache,
+        since=since,
+        jobs=jobs,
+        db_workers=db_workers,
+        snapshot_file=snapshot_file,
+        report=report,
+        verify_plans=verify_plans,
+        output_format=output_format,
+        schemas=schemas,
+        engine_url_file=engine_url_file,
+        fleet_workers=fleet_workers,
+        target_timeout=target_timeout,
+    )
+    if watch:
+        runner.watch()
+    elif engine_url_file:
+        runner.fleet()
+    else:
+        runner.run()
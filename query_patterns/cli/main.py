@@ -1,12 +1,42 @@
+import importlib
+
 import click
-from .command.sqlalchemy import sqlalchemy_cmd
-from .command.django import django_cmd
 
 
-@click.group()
-def main():
-    pass
+class LazyGroup(click.Group):
+    """
+    A group whose subcommands are imported only when they are invoked (or
+    listed in --help), so one subcommand doesn't pay for another's ORM.
+    """
+
+    def __init__(self, *args, lazy_subcommands: dict[str, str] | None = None, **kwargs):
+        super().__init__(*args, **kwargs)
+        # command name -> "module.path:attribute"
+        self.lazy_subcommands = lazy_subcommands or {}
+
+    def list_commands(self, ctx):
+        return sorted([*super().list_commands(ctx), *self.lazy_subcommands])
 
+    def get_command(self, ctx, cmd_name):
+        if cmd_name in self.lazy_subcommands:
+            return self._load(cmd_name)
+        return super().get_command(ctx, cmd_name)
 
-main.add_command(sqlalchemy_cmd)
-main.add_command(django_cmd)
+    def _load(self, cmd_name: str) -> click.Command:
+        module_name, attribute = self.lazy_subcommands[cmd_name].split(":")
+        command = getattr(importlib.import_module(module_name), attribute)
+        if not isinstance(command, click.Command):
+            raise TypeError(f"{module_name}:{attribute} is not a click command")
+        return command
+
+
+@click.group(
+    cls=LazyGroup,
+    lazy_subcommands={
+        "sqlalchemy": "query_patterns.cli.command.sqlalchemy:sqlalchemy_cmd",
+        "django": "query_patterns.cli.command.django:django_cmd",
+        "snapshot": "query_patterns.cli.command.snapshot:snapshot_cmd",
+    },
+)
+def main():
+    pass
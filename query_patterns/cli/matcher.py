@@ -0,0 +1,251 @@
+from typing import Iterable, Literal
+
+from query_patterns.cli.runner.types import (
+    IndexColumns,
+    IndexDefinition,
+    IndexRecord,
+    as_definition,
+    normalize_sql,
+)
+
+
+MatchStatus = Literal["ok", "ok-prefix", "ok-reordered", "sort", "missing"]
+
+
+class _Node:
+    __slots__ = ("children", "index", "shortest")
+
+    def __init__(self):
+        self.children: dict[str, _Node] = {}
+        # Index whose columns end exactly at this node.
+        self.index: IndexColumns | None = None
+        # Shortest index passing through (or ending at) this node.
+        self.shortest: IndexColumns | None = None
+
+
+class IndexMatcher:
+    """
+    Match query patterns against indexes the way a B-tree can serve them.
+
+    Indexes are kept in a column-prefix trie per table, plus a map from the
+    unordered set of every index prefix to that index. Either lookup costs
+    O(len(pattern columns)), no matter how many indexes a table has.
+
+    Declared columns are equality lookups, so an index whose leading columns
+    are the same set in a different order can serve the pattern too.
+
+    Only full B-tree indexes go in the trie. Partial indexes serve patterns
+    whose condition is their predicate, and are matched by a nested matcher
+    per predicate; other access methods (hash, GIN, ...) only serve equality
+    on exactly their columns.
+    """
+
+    def __init__(self, indexes: Iterable[IndexRecord]):
+        self.indexes: list[IndexDefinition] = sorted(
+            {_normalized(as_definition(record)) for record in indexes},
+            key=lambda d: (d, repr(d)),
+        )
+        self._tries: dict[str, _Node] = {}
+        self._prefix_sets: dict[str, dict[frozenset[str], IndexColumns]] = {}
+        # table -> full B-tree indexes, for ORDER BY checks
+        self._btree: dict[str, list[IndexDefinition]] = {}
+        # table -> columns of other access methods
+        self._others: dict[str, list[IndexColumns]] = {}
+        # (table, normalized predicate) -> partial indexes
+        partial: dict[tuple[str, str], list[IndexDefinition]] = {}
+
+        # Sorted so that the shortest (then lexicographically first) index is
+        # reported when several can serve the same pattern.
+        for definition in sorted(self.indexes, key=lambda d: (len(d.columns), d)):
+            table, columns = definition
+            if definition.predicate is not None:
+                partial.setdefault(
+                    (table, normalize_sql(definition.predicate)), []
+                ).append(definition.replace(predicate=None))
+            elif not definition.btree:
+                self._others.setdefault(table, []).append(columns)
+            else:
+                self._btree.setdefault(table, []).append(definition)
+                self._add(table, columns)
+
+        self._partial = {
+            key: IndexMatcher(definitions) for key, definitions in partial.items()
+        }
+
+    def _add(self, table: str, columns: IndexColumns):
+        node = self._tries.setdefault(table, _Node())
+        prefix_sets = self._prefix_sets.setdefault(table, {})
+
+        for i, column in enumerate(columns):
+            node = node.children.setdefault(column, _Node())
+            if node.shortest is None:
+                node.shortest = columns
+            prefix_sets.setdefault(frozenset(columns[: i + 1]), columns)
+
+        if node.index is None:
+            node.index = columns
+
+    def match(
+        self,
+        table: str,
+        columns: IndexColumns,
+        order_by: tuple[str, ...] = (),
+        condition: str | None = None,
+    ) -> tuple[MatchStatus, IndexColumns | None]:
+        """
+        Return (status, index) for a pattern:
+
+        - ok: an index on exactly these columns
+        - ok-prefix: the columns are a leading prefix of a wider index
+        - ok-reordered: an index leads with the same columns in another order
+        - sort: an index serves the lookup, but not the `order_by` ("-column"
+          for descending) that follows it; rows are sorted after the scan
+        - missing: no index can serve the pattern (index is None)
+
+        With a `condition`, partial indexes whose predicate is that condition
+        are considered too.
+        """
+        columns = tuple(_normalize_column(column) for column in columns)
+        result = self._match_full(table, columns, order_by)
+        if result[0] in ("sort", "missing") and condition is not None:
+            partial = self._partial.get((table, normalize_sql(condition)))
+            if partial is not None:
+                partial_result = partial._match_full(table, columns, order_by)
+                if partial_result[0] != "missing":
+                    return partial_result
+        return result
+
+    def _match_full(
+        self, table: str, columns: IndexColumns, order_by: tuple[str, ...]
+    ) -> tuple[MatchStatus, IndexColumns | None]:
+        if order_by:
+            return self._match_ordered(table, columns, order_by)
+
+        status, index = self._match_lookup(table, columns)
+        if status == "missing" and columns:
+            column_set = set(columns)
+            for other in self._others.get(table, ()):
+                if set(other) == column_set:
+                    return "ok", other
+        return status, index
+
+    def _match_ordered(
+        self, table: str, columns: IndexColumns, order_by: tuple[str, ...]
+    ) -> tuple[MatchStatus, IndexColumns | None]:
+        """
+        An index serves `WHERE columns = ... ORDER BY order_by` when it leads
+        with the equality columns (in any order), continues with the order
+        columns, and their directions all match or are all reversed (a
+        backward scan).
+        """
+        order = [
+            (_normalize_column(item[1:]), True)
+            if item.startswith("-")
+            else (_normalize_column(item), False)
+            for item in order_by
+        ]
+        order_columns = tuple(name for name, _ in order)
+        wanted = tuple(descending for _, descending in order)
+        k, m = len(columns), len(order)
+        column_set = set(columns)
+
+        best: tuple[tuple[int, int], MatchStatus, IndexColumns] | None = None
+        for definition in self._btree.get(table, ()):
+            index = definition.columns
+            if len(index) < k + m or index[k : k + m] != order_columns:
+                continue
+            if set(index[:k]) != column_set:
+                continue
+            directions = tuple(
+                order == "desc" for order in definition.sort_orders()[k : k + m]
+            )
+            reversed_ = tuple(not descending for descending in directions)
+            if wanted not in (directions, reversed_):
+                continue
+            if index[:k] != columns:
+                status: MatchStatus = "ok-reordered"
+            elif len(index) == k + m:
+                status = "ok"
+            else:
+                status = "ok-prefix"
+            rank = (("ok", "ok-prefix", "ok-reordered").index(status), len(index))
+            if best is None or rank < best[0]:
+                best = (rank, status, index)
+
+        if best is not None:
+            return best[1], best[2]
+        if not columns:
+            return "missing", None
+        status, index = self._match_lookup(table, columns)
+        return ("sort", index) if status != "missing" else ("missing", None)
+
+    def _match_lookup(
+        self, table: str, columns: IndexColumns
+    ) -> tuple[MatchStatus, IndexColumns | None]:
+        node = self._tries.get(table)
+        if node is None:
+            return "missing", None
+
+        for column in columns:
+            node = node.children.get(column)
+            if node is None:
+                break
+        else:
+            if node.index is not None:
+                return "ok", node.index
+            return "ok-prefix", node.shortest
+
+        column_set = frozenset(columns)
+        if len(column_set) == len(columns):
+            index = self._prefix_sets[table].get(column_set)
+            if index is not None:
+                return "ok-reordered", index
+
+        return "missing", None
+
+    def redundant(self) -> list[tuple[str, IndexColumns, IndexColumns]]:
+        """
+        Return (table, index, covering index) for every full B-tree index that
+        is a strict leftmost prefix of another one on the same table, sorted
+        the same way on the shared columns (or exactly the other way round,
+        for a backward scan); the covering index can serve every lookup and
+        ORDER BY the redundant one can. Unique indexes enforce a constraint
+        and are never redundant.
+        """
+        result = set()
+        for table, definitions in self._btree.items():
+            for definition in definitions:
+                if definition.unique:
+                    continue
+                size = len(definition.columns)
+                orders = definition.sort_orders()
+                covering = [
+                    other.columns
+                    for other in definitions
+                    if len(other.columns) > size
+                    and other.columns[:size] == definition.columns
+                    and _same_direction(orders, other.sort_orders()[:size])
+                ]
+                if covering:
+                    shortest = min(
+                        covering, key=lambda columns: (len(columns), columns)
+                    )
+                    result.add((table, definition.columns, shortest))
+        return sorted(result)
+
+
+def _same_direction(orders: tuple[str, ...], other: tuple[str, ...]) -> bool:
+    flipped = tuple("desc" if order == "asc" else "asc" for order in other)
+    return orders in (other, flipped)
+
+
+def _normalize_column(column: str) -> str:
+    # Expression key parts ("lower(email)") are compared as normalized SQL.
+    return normalize_sql(column) if "(" in column else column
+
+
+def _normalized(definition: IndexDefinition) -> IndexDefinition:
+    columns = tuple(_normalize_column(column) for column in definition.columns)
+    if columns == definition.columns:
+        return definition
+    return definition.replace(columns=columns)
@@ -0,0 +1,309 @@
+import json
+import tempfile
+from dataclasses import dataclass, field
+from typing import Any
+from xml.sax.saxutils import escape, quoteattr
+
+import click
+
+from query_patterns.cli.runner.plans import Plan
+from query_patterns.cli.runner.types import IndexColumns, OutputFormat
+from query_patterns.pattern import QueryPattern
+
+
+@dataclass(frozen=True)
+class PatternResult:
+    status: str
+    pattern: QueryPattern
+    usage: int
+    index: IndexColumns | None = None
+    plan: Plan | None = None
+    # Declaring functions: {"module", "qualname", "file", "line"}
+    locations: tuple[dict[str, Any], ...] = field(default=())
+
+    @property
+    def failed(self) -> bool:
+        return self.status in ("missing", "sort", "seq-scan")
+
+    def to_dict(self) -> dict[str, Any]:
+        data: dict[str, Any] = {
+            "table": self.pattern.table,
+            "columns": list(self.pattern.columns),
+        }
+        if self.pattern.order_by:
+            data["order_by"] = list(self.pattern.order_by)
+        if self.pattern.condition is not None:
+            data["condition"] = self.pattern.condition
+        data |= {
+            "status": self.status,
+            "usage": self.usage,
+            "index": list(self.index) if self.index is not None else None,
+        }
+        if self.plan is not None:
+            data["plan"] = {"scan": self.plan.scan, "index": self.plan.index}
+        data["locations"] = list(self.locations)
+        return data
+
+
+class ResultWriter:
+    """
+    Writes pattern results to stdout one at a time, as they are produced.
+    """
+
+    def __init__(self, quiet: bool = False):
+        self.quiet = quiet
+        self.total = 0
+        self.failures = 0
+
+    def start(self):
+        pass
+
+    def write(self, result: PatternResult):
+        self.total += 1
+        if result.failed:
+            self.failures += 1
+        self._write(result)
+
+    def _write(self, result: PatternResult):
+        raise NotImplementedError
+
+    def finish(self):
+        pass
+
+
+class TextWriter(ResultWriter):
+    def _write(self, result: PatternResult):
+        pattern = result.pattern
+        key = pattern.describe()
+        usage_suffix = f"[usage={result.usage}]"
+
+        if result.status == "missing":
+            click.echo(click.style(f"[MISSING] {key} {usage_suffix}", fg="red"))
+            self._write_locations(result)
+        elif result.status == "sort":
+            click.echo(
+                click.style(
+                    f"[SORT] {key} {usage_suffix} [index={result.index}]",
+                    fg="yellow",
+                )
+            )
+            self._write_locations(result)
+        elif result.status == "seq-scan":
+            click.echo(
+                click.style(
+                    f"[SEQ-SCAN] {key} {usage_suffix} [index={result.index}]", fg="red"
+                )
+            )
+            self._write_locations(result)
+        elif not self.quiet:
+            line = f"[{result.status.upper()}] {key} {usage_suffix}"
+            if result.status != "ok":
+                line += f" [index={result.index}]"
+            if result.plan is not None:
+                line += f" [plan={result.plan.index or result.plan.scan}]"
+            click.echo(click.style(line, fg="green"))
+
+    @staticmethod
+    def _write_locations(result: PatternResult):
+        for location in result.locations:
+            click.echo(f"    at {format_location(location)}")
+
+
+def _pattern_name(pattern: QueryPattern) -> str:
+    """
+    `table(col, ...)`, followed by the order and condition when set.
+    """
+    name = f"{pattern.table}({', '.join(pattern.columns)})"
+    if pattern.order_by:
+        name += f" ORDER BY {', '.join(pattern.order_by)}"
+    if pattern.condition is not None:
+        name += f" WHERE {pattern.condition}"
+    return name
+
+
+def format_location(location: dict[str, Any]) -> str:
+    """
+    `file:line (module.qualname)`, or just the qualified name without a file.
+    """
+    name = f"{location['module']}.{location['qualname']}"
+    if not location.get("file"):
+        return name
+    return f"{location['file']}:{location['line']} ({name})"
+
+
+def dumps(data: Any) -> str:
+    """
+    Compact JSON shared by every machine-readable writer.
+    """
+    return json.dumps(data, separators=(",", ":"))
+
+
+class JsonWriter(ResultWriter):
+    """
+    {"results": [...], "summary": {...}}, written incrementally.
+    """
+
+    def start(self):
+        click.echo('{"results":[', nl=False)
+
+    def _write(self, result: PatternResult):
+        prefix = "," if self.total > 1 else ""
+        click.echo(prefix + dumps(result.to_dict()), nl=False)
+
+    def finish(self):
+        summary = {"total": self.total, "failures": self.failures}
+        click.echo(f'],"summary":{dumps(summary)}}}')
+
+
+class NdjsonWriter(ResultWriter):
+    """
+    One JSON object per result, then a {"summary": {...}} line.
+    """
+
+    def _write(self, result: PatternResult):
+        click.echo(dumps(result.to_dict()))
+
+    def finish(self):
+        click.echo(dumps({"summary": {"total": self.total, "failures": self.failures}}))
+
+
+SARIF_RULES = {
+    "missing": (
+        "missing-index",
+        "error",
+        "No index can serve a declared query pattern",
+    ),
+    "sort": (
+        "sort-required",
+        "warning",
+        "An index serves the lookup of a declared query pattern but not its ORDER BY",
+    ),
+    "seq-scan": (
+        "sequential-scan",
+        "warning",
+        "The planner reads a declared query pattern with a sequential scan",
+    ),
+}
+
+
+def _tool_version() -> str:
+    from importlib.metadata import PackageNotFoundError, version
+
+    try:
+        return version("query-patterns")
+    except PackageNotFoundError:
+        return "unknown"
+
+
+class SarifWriter(ResultWriter):
+    """
+    SARIF 2.1.0 with one result per failing pattern; passing patterns are
+    only counted.
+    """
+
+    def __init__(self, quiet: bool = False):
+        super().__init__(quiet)
+        self._written = 0
+
+    def start(self):
+        driver = {
+            "name": "query-patterns",
+            "version": _tool_version(),
+            "rules": [
+                {"id": rule_id, "shortDescription": {"text": text}}
+                for rule_id, _, text in SARIF_RULES.values()
+            ],
+        }
+        click.echo(
+            '{"$schema":"https://json.schemastore.org/sarif-2.1.0.json",'
+            '"version":"2.1.0",'
+            f'"runs":[{{"tool":{{"driver":{dumps(driver)}}},"results":[',
+            nl=False,
+        )
+
+    def _write(self, result: PatternResult):
+        rule = SARIF_RULES.get(result.status)
+        if rule is None:
+            return
+        rule_id, level, _ = rule
+        item = {
+            "ruleId": rule_id,
+            "level": level,
+            "message": {
+                "text": f"{_pattern_name(result.pattern)} [usage={result.usage}]"
+            },
+            "locations": [self._location(loc) for loc in result.locations],
+            "properties": result.to_dict(),
+        }
+        prefix = "," if self._written else ""
+        self._written += 1
+        click.echo(prefix + dumps(item), nl=False)
+
+    @staticmethod
+    def _location(location: dict[str, Any]) -> dict[str, Any]:
+        name = f"{location['module']}.{location['qualname']}"
+        sarif_location: dict[str, Any] = {}
+        if location.get("file"):
+            sarif_location["physicalLocation"] = {
+                "artifactLocation": {"uri": location["file"]},
+                "region": {"startLine": location["line"]},
+            }
+        sarif_location["logicalLocations"] = [
+            {"fullyQualifiedName": name, "kind": "function"}
+        ]
+        return sarif_location
+
+    def finish(self):
+        click.echo("]}]}")
+
+
+class JUnitWriter(ResultWriter):
+    """
+    One <testcase> per pattern. The <testsuite> header needs the totals, so
+    test cases are spooled to a temporary file (not kept in memory) and
+    copied out at the end.
+    """
+
+    def start(self):
+        self._spool = tempfile.TemporaryFile("w+", encoding="utf-8")
+
+    def _write(self, result: PatternResult):
+        pattern = result.pattern
+        name = _pattern_name(pattern)
+        self._spool.write(
+            f"<testcase classname={quoteattr(pattern.table)} name={quoteattr(name)}"
+        )
+        if not result.failed:
+            self._spool.write("/>\n")
+            return
+        message = f"{result.status} [usage={result.usage}]"
+        details = "\n".join(format_location(loc) for loc in result.locations)
+        self._spool.write(
+            f"><failure type={quoteattr(result.status)} message={quoteattr(message)}>"
+            f"{escape(details)}</failure></testcase>\n"
+        )
+
+    def finish(self):
+        click.echo('<?xml version="1.0" encoding="UTF-8"?>')
+        click.echo(
+            f'<testsuite name="query-patterns" tests="{self.total}" '
+            f'failures="{self.failures}">'
+        )
+        self._spool.seek(0)
+        for line in self._spool:
+            click.echo(line, nl=False)
+        self._spool.close()
+        click.echo("</testsuite>")
+
+
+WRITERS: dict[str, type[ResultWriter]] = {
+    "text": TextWriter,
+    "json": JsonWriter,
+    "ndjson": NdjsonWriter,
+    "sarif": SarifWriter,
+    "junit": JUnitWriter,
+}
+
+
+def get_writer(output_format: OutputFormat, quiet: bool = False) -> ResultWriter:
+    return WRITERS[output_format](quiet)
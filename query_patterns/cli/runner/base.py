@@ -1,16 +1,47 @@
 import importlib
-import inspect
+import subprocess
 import sys
 from collections import OrderedDict
+from concurrent.futures import ThreadPoolExecutor
 from pathlib import Path
 from types import ModuleType
-from typing import List, Iterable
+from typing import TYPE_CHECKING, Any, Callable, List, Iterable, Iterator, Mapping
 
 import click
 
-from query_patterns.cli.runner.types import IndexSet
+from query_patterns.cli.collector.cache import ExtractCache, DEFAULT_CACHE_DIR
+from query_patterns.cli.collector.parallel import collect_in_processes
+from query_patterns.cli.collector.static import (
+    FileExtract,
+    StaticCollector,
+    extract_file,
+)
+from query_patterns.cli.matcher import IndexMatcher, MatchStatus
+from query_patterns.cli.output import PatternResult, get_writer
+from query_patterns.cli.runner.plans import (
+    Plan,
+    load_plan_cache,
+    pattern_key,
+    save_plan_cache,
+    schema_hash,
+    supports_plans,
+)
+from query_patterns.cli.runner.types import (
+    IndexSet,
+    IndexColumns,
+    IndexRecord,
+    CollectorKind,
+    OutputFormat,
+    PatternSource,
+    ReportKind,
+)
+from query_patterns.cli.snapshot import SnapshotError, dump_snapshot, load_snapshot
+from query_patterns import registry
 from query_patterns.pattern import QueryPattern
-from query_patterns.utils import get_patterns
+from query_patterns.utils import iter_module_patterns
+
+if TYPE_CHECKING:
+    from query_patterns.cli.runner.fleet import FleetTarget
 
 
 EXCLUDE_DIRS = {
@@ -23,67 +54,343 @@ EXCLUDE_DIRS = {
 }
 
 
+class NoPatternsFound(click.ClickException):
+    def __init__(self):
+        super().__init__("No @query_pattern declarations found.")
+
+
+def _add_cwd_to_sys_path():
+    cwd = str(Path.cwd())
+    if cwd not in sys.path:
+        sys.path.insert(0, cwd)
+
+
 class BaseRunner:
     module: tuple[str, ...] = ()
+    collector: CollectorKind = "import"
+    cache: bool = False
+    jobs: int = 1
+    db_workers: int = 1
+    source: PatternSource = "schema"
+    snapshot_file: str | None = None
+    report: ReportKind = "patterns"
+    since: str | None = None
+    verify_plans: bool = False
+    output_format: OutputFormat = "text"
+    # Fleet mode: databases read concurrently, and seconds allowed per database.
+    fleet_workers: int = 8
+    target_timeout: float | None = 60.0
     quiet: bool
+    # Modules imported in this process, whose declarations are in the registry.
+    _scanned_modules: tuple[str, ...] = ()
+    # Declaring locations reported by static / multi-process collection.
+    _locations: dict[QueryPattern, list[dict[str, Any]]] | None = None
 
     def run(self):
-        self._load_env()
-        modules = self._import_modules()
-        patterns, counts = self._collect_query_patterns(modules)
+        if self.output_format != "text" and self.report != "patterns":
+            raise click.ClickException(
+                f"--format={self.output_format} is only supported with "
+                "--report=patterns"
+            )
+        # Declarations must be recorded even if the environment disables them.
+        registry.set_enabled(True)
+        self._setup_env()
+        patterns, counts = self._collect_checked_patterns()
+        # Only tables referenced by declared patterns need to be introspected.
+        tables = {p.table for p in patterns}
+        indexes = self._collect_indexes(tables)
+        results = self._iter_analyzed_patterns(patterns, indexes)
+        if self.report == "unused":
+            results = list(results)
+            sizes = self._collect_index_sizes(tables)
+            self._print_unused_indexes(results, indexes, tables, sizes)
+            return
+
+        plans = None
+        if self.verify_plans:
+            results = list(results)
+            plans = self._verify_plans(results, indexes)
+        self._print_results(results, counts, plans)
+
+    def fleet(self):
+        """
+        Check patterns against every database of a fleet (see
+        `_fleet_targets`) and report which databases miss which index.
+        """
+        for unsupported, option in (
+            (self.report != "patterns", f"--report={self.report}"),
+            (self.verify_plans, "--verify-plans"),
+            (
+                self.output_format not in ("text", "json"),
+                f"--format={self.output_format}",
+            ),
+        ):
+            if unsupported:
+                raise click.ClickException(
+                    f"{self._fleet_option()} cannot be combined with {option}"
+                )
+
+        from query_patterns.cli.runner.fleet import FleetSession
+
+        registry.set_enabled(True)
+        self._setup_env()
+        FleetSession(self).run()
+
+    def _fleet_option(self) -> str | None:
+        """
+        The command-line option that selected fleet mode, if any.
+        """
+        return None
+
+    def _fleet_targets(self) -> list["FleetTarget"]:
+        raise NotImplementedError
+
+    def watch(self):
+        """
+        Check patterns, then keep the environment and indexes loaded and
+        re-check modules as their files change.
+        """
+        for unsupported, option in (
+            (self.report != "patterns", f"--report={self.report}"),
+            (self.verify_plans, "--verify-plans"),
+            (self.output_format != "text", f"--format={self.output_format}"),
+            (self.since, "--since"),
+            (self._fleet_option(), self._fleet_option()),
+        ):
+            if unsupported:
+                raise click.ClickException(f"--watch cannot be combined with {option}")
+        if self.jobs > 1:
+            # Modules are reloaded in this process, so they are imported here.
+            click.echo("[WARN] --jobs is ignored with --watch", err=True)
+            self.jobs = 1
+
+        from query_patterns.cli.runner.watch import WatchSession
+
+        registry.set_enabled(True)
+        self._setup_env()
+        WatchSession(self).run()
+
+    def _info(self, message: str):
+        """
+        Progress messages go to stderr when stdout carries a machine format.
+        """
+        click.echo(message, err=self.output_format != "text")
+
+    def snapshot(self, output: str):
+        """
+        Collect indexes from the configured source and write them to a
+        snapshot file that can later be used with --source=snapshot.
+        """
+        self._setup_env()
         indexes = self._collect_indexes_by_source()
-        results = self._analyze_patterns(patterns, indexes)
-        self._print_results(results, counts)
+        dump_snapshot(indexes, Path(output), self._snapshot_metadata())
+        click.echo(f"Wrote {len(indexes)} indexes to {output}")
+
+    def _setup_env(self):
+        """
+        Put cwd on sys.path, since project modules, --metadata and --settings
+        are imported from it whatever the collector, then load the ORM
+        environment.
+        """
+        _add_cwd_to_sys_path()
+        self._load_env()
 
     def _load_env(self):
         raise NotImplementedError()
 
-    def _import_modules(self) -> list[ModuleType]:
-        if self.module:
-            click.echo(f"Import module from {', '.join(self.module)}...")
+    def _snapshot_metadata(self) -> dict[str, str]:
+        return {"source": self.source}
+
+    def _collect_patterns(
+        self,
+    ) -> tuple[list[QueryPattern], OrderedDict[QueryPattern, int]]:
+        changed = self._changed_modules() if self.since else None
+        if changed is not None and not changed:
+            raise NoPatternsFound()
+
+        if self.collector == "static":
+            return self._collect_query_patterns_statically(changed)
+
+        if self.cache:
+            click.echo("[WARN] --cache is only used with --collector=static", err=True)
+
+        if self.jobs > 1:
+            return self._collect_query_patterns_in_processes(changed)
+
+        modules = self._import_modules(changed)
+        self._scanned_modules = tuple(m.__name__ for m in modules)
+        return self._collect_query_patterns(modules)
+
+    def _collect_checked_patterns(
+        self,
+    ) -> tuple[list[QueryPattern], OrderedDict[QueryPattern, int]]:
+        try:
+            return self._collect_patterns()
+        except NoPatternsFound:
+            if not self.since:
+                raise
+            # Nothing declared in the changed files is a pass, not an error.
+            self._info(f"No @query_pattern declarations changed since {self.since}.")
+            return [], OrderedDict()
+
+    def _changed_modules(self) -> list[str]:
+        """
+        Modules of .py files changed since the --since ref (committed or not,
+        plus untracked files), limited to --module when it is given.
+        """
+        cwd = Path.cwd()
+        commands = [
+            ["git", "diff", "--name-only", "--relative", "--diff-filter=d"]
+            + [self.since, "--", "*.py"],
+            ["git", "ls-files", "--others", "--exclude-standard", "--", "*.py"],
+        ]
+        paths: list[str] = []
+        for command in commands:
+            try:
+                result = subprocess.run(
+                    command, cwd=cwd, capture_output=True, text=True, check=True
+                )
+            except FileNotFoundError:
+                raise click.ClickException("--since requires git on PATH")
+            except subprocess.CalledProcessError as e:
+                raise click.ClickException(
+                    f"{' '.join(command[:2])} failed: {e.stderr.strip()}"
+                )
+            paths.extend(result.stdout.splitlines())
+
+        modules = []
+        for path in dict.fromkeys(paths):
+            module_name = self._module_name(cwd, cwd / path)
+            if module_name is None:
+                continue
+            if self.module and not any(
+                module_name == m or module_name.startswith(f"{m}.") for m in self.module
+            ):
+                continue
+            modules.append(module_name)
+
+        self._info(f"{len(modules)} changed module(s) since {self.since}.")
+        return modules
+
+    def _import_modules(self, only: list[str] | None = None) -> list[ModuleType]:
+        if only is not None:
+            self._info(f"Import {len(only)} changed module(s)...")
+            modules = self._import_module_names(only)
+        elif self.module:
+            self._info(f"Import module from {', '.join(self.module)}...")
             modules = self._import_module_from_cwd(self.module)
         else:
-            click.echo("Auto-discovering project modules...")
+            self._info("Auto-discovering project modules...")
             modules = self._discover_modules_from_cwd()
 
         if not modules:
             raise click.ClickException("No modules found to scan.")
         return modules
 
+    def _collect_query_patterns_in_processes(
+        self, only: list[str] | None = None
+    ) -> tuple[list[QueryPattern], OrderedDict[QueryPattern, int]]:
+        """
+        Import modules in worker processes; only (table, columns) tuples are
+        sent back to this process.
+        """
+        cwd = Path.cwd()
+        if only is not None:
+            self._info(
+                f"Import {len(only)} changed module(s) with {self.jobs} workers..."
+            )
+            module_names = only
+        elif self.module:
+            self._info(
+                f"Import module from {', '.join(self.module)} "
+                f"with {self.jobs} workers..."
+            )
+            module_names = list(self.module)
+        else:
+            self._info(f"Auto-discovering project modules with {self.jobs} workers...")
+            module_names = [name for _, name in self._iter_source_files(cwd)]
+
+        if not module_names:
+            raise click.ClickException("No modules found to scan.")
+
+        self._locations = {}
+        patterns, counts = collect_in_processes(
+            module_names,
+            jobs=self.jobs,
+            cwd=str(cwd),
+            load_env=self._load_env,
+            strict=bool(self.module) and only is None,
+            locations=self._locations,
+        )
+        if not patterns:
+            raise NoPatternsFound()
+        return patterns, counts
+
     @staticmethod
     def _import_module_from_cwd(module: tuple[str, ...]) -> List[ModuleType]:
-        cwd = Path.cwd()
-        if cwd not in sys.path:
-            sys.path.insert(0, str(cwd))
+        _add_cwd_to_sys_path()
         return [importlib.import_module(m) for m in module]
 
     @staticmethod
-    def _discover_modules_from_cwd() -> List[ModuleType]:
+    def _module_name(root: Path, py: Path, include_private: bool = False) -> str | None:
         """
-        Discover Python modules in cwd without importing the same file twice.
+        Module name of a Python file under root, or None for files that are
+        not scanned (excluded directories, private files, the root package).
         """
-        cwd = Path.cwd()
-        modules: list[ModuleType] = []
-        visited_files: set[str] = set()
+        if py.suffix != ".py":
+            return None
+        if any(part in EXCLUDE_DIRS for part in py.parts):
+            return None
+        if not include_private and py.name.startswith("_"):
+            return None
 
-        if str(cwd) not in sys.path:
-            sys.path.insert(0, str(cwd))
+        rel_parts = py.with_suffix("").relative_to(root).parts
+        if rel_parts[-1] == "__init__":
+            rel_parts = rel_parts[:-1]
+        if not rel_parts:
+            return None
+        return ".".join(rel_parts)
 
-        for py in cwd.rglob("*.py"):
-            if any(part in EXCLUDE_DIRS for part in py.parts):
-                continue
+    @classmethod
+    def _iter_source_files(
+        cls, root: Path, include_private: bool = False
+    ) -> Iterator[tuple[Path, str]]:
+        """
+        Yield (path, module_name) for Python files under root, skipping
+        excluded directories and files already seen through a symlink.
+        """
+        visited_files: set[str] = set()
 
-            if py.name.startswith("_"):
+        for py in root.rglob("*.py"):
+            module_name = cls._module_name(root, py, include_private)
+            if module_name is None:
                 continue
 
             abs_path = str(py.resolve())
             if abs_path in visited_files:
                 continue
             visited_files.add(abs_path)
+            yield py, module_name
 
-            rel_parts = py.with_suffix("").relative_to(cwd).parts
-            module_name = ".".join(rel_parts)
+    @classmethod
+    def _discover_modules_from_cwd(cls) -> List[ModuleType]:
+        """
+        Discover Python modules in cwd without importing the same file twice.
+        """
+        cwd = Path.cwd()
+        return cls._import_module_names(
+            [module_name for _, module_name in cls._iter_source_files(cwd)]
+        )
+
+    @staticmethod
+    def _import_module_names(module_names: Iterable[str]) -> List[ModuleType]:
+        """
+        Import modules by name from cwd, skipping those that fail to import.
+        """
+        modules: list[ModuleType] = []
+        _add_cwd_to_sys_path()
 
+        for module_name in module_names:
             if module_name in sys.modules:
                 modules.append(sys.modules[module_name])
                 continue
@@ -108,45 +415,381 @@ class BaseRunner:
         counts: OrderedDict[QueryPattern, int] = OrderedDict()
 
         for module in modules:
-            for _, obj in vars(module).items():
-                if inspect.isfunction(obj):
-                    for p in get_patterns(obj):
-                        counts[p] = counts.get(p, 0) + 1
-                elif inspect.isclass(obj):
-                    for _, fn in inspect.getmembers(obj, inspect.isfunction):
-                        for p in get_patterns(fn):
-                            counts[p] = counts.get(p, 0) + 1
+            for p in iter_module_patterns(module):
+                counts[p] = counts.get(p, 0) + 1
 
         patterns = list(counts.keys())
         if not patterns:
-            raise click.ClickException("No @query_pattern declarations found.")
+            raise NoPatternsFound()
         return patterns, counts
 
-    def _collect_indexes_by_source(self) -> IndexSet:
+    def _collect_query_patterns_statically(
+        self, only: list[str] | None = None
+    ) -> tuple[list[QueryPattern], OrderedDict[QueryPattern, int]]:
+        """
+        Collect patterns by parsing source files instead of importing them.
+
+        Only the requested modules (or all discovered ones) are scanned; other
+        files are parsed on demand, when a scanned module imports a table
+        from them.
+        """
+        cwd = Path.cwd()
+        self._info("Collecting patterns statically (modules are not imported)...")
+
+        files = list(self._iter_source_files(cwd, include_private=True))
+        paths = {module_name: path for path, module_name in files}
+        cache = None
+        if self.cache:
+            cache = ExtractCache(cwd / DEFAULT_CACHE_DIR)
+            cache.load()
+            extracts = _LazyExtracts(paths, cache.get)
+        else:
+            extracts = _LazyExtracts(paths, extract_file)
+
+        if only is not None:
+            targets = [m for m in only if m in paths]
+        elif self.module:
+            known = {module_name for _, module_name in files}
+            unknown = [m for m in self.module if m not in known]
+            if unknown:
+                raise click.ClickException(
+                    f"Module not found under {cwd}: {', '.join(unknown)}"
+                )
+            targets = list(self.module)
+        else:
+            targets = [
+                module_name
+                for path, module_name in files
+                if not path.name.startswith("_")
+            ]
+
+        collector = StaticCollector(extracts)
+        patterns, counts = collector.collect(targets)
+        if cache is not None:
+            cache.save()
+            self._info(f"Cache: {cache.hits} unchanged, {cache.misses} parsed.")
+        for pattern_locations in collector.locations.values():
+            for location in pattern_locations:
+                location["file"] = str(paths[location["module"]])
+        self._locations = collector.locations
+        for error in collector.errors:
+            click.echo(f"[WARN] {error}", err=True)
+
+        if not patterns:
+            raise NoPatternsFound()
+        return patterns, counts
+
+    def _collect_indexes(self, tables: set[str] | None = None) -> IndexSet:
+        if self.source != "snapshot":
+            return self._collect_indexes_by_source(tables)
+
+        if not self.snapshot_file:
+            raise click.ClickException(
+                "--snapshot-file is required when --source=snapshot"
+            )
+        self._info(f"Loading indexes from snapshot: {self.snapshot_file}")
+        try:
+            return load_snapshot(Path(self.snapshot_file))
+        except SnapshotError as e:
+            raise click.ClickException(str(e))
+
+    def _collect_index_sizes(
+        self, tables: set[str] | None = None
+    ) -> dict[IndexRecord, int] | None:
+        """
+        Return index sizes in bytes, or None when the source can't provide them.
+        """
+        return None
+
+    def _collect_indexes_by_source(self, tables: set[str] | None = None) -> IndexSet:
+        """
+        Collect indexes from the configured source. With `tables`, sources
+        that support it only read indexes of those tables.
+        """
+        raise NotImplementedError
+
+    def _plan_dialect(self) -> str:
+        """
+        Dialect name of the database used for --verify-plans.
+        """
         raise NotImplementedError
 
+    def _explain_patterns(
+        self, patterns: list[QueryPattern]
+    ) -> dict[QueryPattern, Plan]:
+        """
+        EXPLAIN one probe query per pattern, on up to `db_workers` connections.
+        """
+        raise NotImplementedError
+
+    def _verify_plans(self, results, indexes: IndexSet) -> dict[QueryPattern, Plan]:
+        """
+        Return the plan of every pattern that has an index.
+
+        Plans are cached per schema hash in the cache directory, so unchanged
+        catalogs are not explained again.
+        """
+        dialect = self._plan_dialect()
+        if not supports_plans(dialect):
+            click.echo(
+                f"[WARN] --verify-plans is not supported for {dialect}", err=True
+            )
+            return {}
+
+        patterns = [pattern for status, pattern, _ in results if status != "missing"]
+        cache_dir = Path.cwd() / DEFAULT_CACHE_DIR
+        digest = schema_hash(dialect, indexes)
+        cached = load_plan_cache(cache_dir, digest)
+
+        plans: dict[QueryPattern, Plan] = {}
+        pending = []
+        for pattern in patterns:
+            plan = cached.get(pattern_key(pattern))
+            if plan is None:
+                pending.append(pattern)
+            else:
+                plans[pattern] = plan
+
+        if pending:
+            self._info(f"Explaining {len(pending)} pattern(s) ({len(plans)} cached)...")
+            plans.update(self._explain_patterns(pending))
+            cached.update(
+                (pattern_key(pattern), plan) for pattern, plan in plans.items()
+            )
+            save_plan_cache(cache_dir, digest, cached)
+        return plans
+
+    @staticmethod
+    def _map_shards(items: list, workers: int, fn: Callable[[list], Any]) -> list:
+        """
+        Split items round-robin into `workers` shards and run `fn` on each
+        shard in a thread pool. Returns the shard results in shard order.
+        """
+        if workers <= 1 or len(items) <= 1:
+            return [fn(items)]
+
+        shards = [items[i::workers] for i in range(workers)]
+        with ThreadPoolExecutor(max_workers=workers) as executor:
+            return list(executor.map(fn, shards))
+
     @staticmethod
+    def _split_workers(workers: int, targets: int) -> tuple[int, int]:
+        """
+        Share `workers` connections between `targets` read concurrently and
+        the table shards within each target: returns (target threads, workers
+        per target), so at most `workers` connections are open at a time.
+        """
+        outer = max(1, min(workers, targets))
+        return outer, max(1, workers // outer)
+
+    @classmethod
+    def _collect_indexes_concurrently(
+        cls,
+        table_names: list[str],
+        workers: int,
+        collect_tables: Callable[[list[str]], IndexSet],
+    ) -> IndexSet:
+        """
+        Split tables into `workers` shards and introspect them on a thread
+        pool. `collect_tables` should hold one connection for its whole shard,
+        so at most `workers` connections are open at a time.
+        """
+        indexes: IndexSet = set()
+        for shard_indexes in cls._map_shards(table_names, workers, collect_tables):
+            indexes |= shard_indexes
+        return indexes
+
+    @staticmethod
+    def _iter_analyzed_patterns(
+        patterns: Iterable[QueryPattern],
+        indexes: set[tuple[str, tuple[str, ...]]],
+    ) -> Iterator[tuple[MatchStatus, QueryPattern, IndexColumns | None]]:
+        """
+        Compare declared QueryPatterns with actual indexes, one at a time.
+
+        Yields (status, pattern, index) where index holds the columns of the
+        index that serves the pattern (None when missing).
+        """
+        matcher = IndexMatcher(indexes)
+        for pattern in patterns:
+            status, index = matcher.match(
+                pattern.table, pattern.columns, pattern.order_by, pattern.condition
+            )
+            yield status, pattern, index
+
+    @classmethod
     def _analyze_patterns(
+        cls,
         patterns: Iterable[QueryPattern],
         indexes: set[tuple[str, tuple[str, ...]]],
+    ) -> list[tuple[MatchStatus, QueryPattern, IndexColumns | None]]:
+        return list(cls._iter_analyzed_patterns(patterns, indexes))
+
+    def _pattern_locations(self) -> dict[QueryPattern, list[dict[str, Any]]]:
+        """
+        Declaring locations per pattern: from the collector when it reported
+        them, otherwise from the registry entries of the scanned modules.
+        File paths under cwd are made relative.
+        """
+        if self._locations is not None:
+            locations = self._locations
+        else:
+            locations = {}
+            declarations = registry.registry.iter_declarations(self._scanned_modules)
+            for pattern, declaration in declarations:
+                locations.setdefault(pattern, []).append(
+                    {
+                        "module": declaration.module,
+                        "qualname": declaration.qualname,
+                        "file": declaration.file,
+                        "line": declaration.line,
+                    }
+                )
+
+        cwd = Path.cwd()
+        for pattern_locations in locations.values():
+            for location in pattern_locations:
+                location["file"] = _display_path(location["file"], cwd)
+        return locations
+
+    def _print_results(
+        self,
+        results: Iterable[tuple[MatchStatus, QueryPattern, IndexColumns | None]],
+        counts: OrderedDict[QueryPattern, int],
+        plans: dict[QueryPattern, Plan] | None = None,
     ):
         """
-        Compare declared QueryPatterns with actual indexes.
+        Stream results to the writer for --format as they are produced.
         """
-        results = []
-        for pattern in patterns:
-            key = (pattern.table, pattern.columns)
-            status = "ok" if key in indexes else "missing"
-            results.append((status, pattern))
-        return results
-
-    def _print_results(self, results, counts: OrderedDict[QueryPattern, int]):
-        for status, pattern in results:
-            key = f"{pattern.table}{pattern.columns}"
-
-            usage_suffix = f"[usage={counts.get(pattern, 1)}]"
-            if status == "missing":
-                click.echo(click.style(f"[MISSING] {key} {usage_suffix}", fg="red"))
-            else:
-                if not self.quiet:
-                    click.echo(click.style(f"[OK] {key} {usage_suffix}", fg="green"))
+        writer = get_writer(self.output_format, quiet=self.quiet)
+        locations = self._pattern_locations()
+
+        writer.start()
+        for status, pattern, index in results:
+            plan = plans.get(pattern) if plans is not None else None
+            if status != "missing" and plan is not None:
+                if plan.scan == "seq":
+                    status = "seq-scan"
+                elif plan.scan == "sort":
+                    status = "sort"
+            writer.write(
+                PatternResult(
+                    status=status,
+                    pattern=pattern,
+                    usage=counts.get(pattern, 1),
+                    index=index,
+                    plan=plan,
+                    locations=tuple(locations.get(pattern, ())),
+                )
+            )
+        writer.finish()
+
+    def _print_unused_indexes(
+        self,
+        results,
+        indexes: IndexSet,
+        tables: set[str],
+        sizes: dict[IndexRecord, int] | None,
+    ):
+        """
+        Report indexes on pattern tables that no declared pattern needs, and
+        indexes that are a leftmost prefix of a wider index on the same table.
+        Primary keys and unique indexes are never reported.
+        """
+        used = {(pattern.table, index) for _, pattern, index in results if index}
+        matcher = IndexMatcher(record for record in indexes if record[0] in tables)
+
+        # (table, columns) -> (unused, covering index if redundant)
+        removable: dict[IndexRecord, tuple[bool, IndexColumns | None]] = {}
+        for definition in matcher.indexes:
+            record = (definition.table, definition.columns)
+            # Primary keys and unique indexes enforce a constraint.
+            if record not in used and not definition.unique:
+                removable[record] = (True, None)
+        for table, columns, covering in matcher.redundant():
+            unused, _ = removable.get((table, columns), (False, None))
+            removable[(table, columns)] = (unused, covering)
+
+        for (table, columns), (unused, covering) in sorted(removable.items()):
+            tags = []
+            if unused:
+                tags.append("[UNUSED]")
+            if covering:
+                tags.append("[REDUNDANT]")
+            line = f"{' '.join(tags)} {table}{columns}"
+            if covering:
+                line += f" [covered-by={covering}]"
+            if sizes:
+                line += f" [size={_format_size(sizes.get((table, columns)))}]"
+            click.echo(click.style(line, fg="yellow"))
+
+        if not removable:
+            if not self.quiet:
+                click.echo(click.style("No unused or redundant indexes.", fg="green"))
+            return
+
+        per_table: dict[str, int] = {}
+        for table, _ in removable:
+            per_table[table] = per_table.get(table, 0) + 1
+        writes = ", ".join(f"{n} on {table}" for table, n in sorted(per_table.items()))
+        summary = (
+            f"{len(removable)} removable index(es); dropping them saves "
+            f"index writes per INSERT: {writes}"
+        )
+        if sizes:
+            total = sum(sizes.get(record, 0) for record in removable)
+            summary += f"; ~{_format_size(total)} of storage"
+        click.echo(summary)
+
+
+class _LazyExtracts(Mapping[str, FileExtract]):
+    """
+    module name -> FileExtract, parsing (or reading from the cache) each file
+    the first time it is looked up.
+    """
+
+    def __init__(
+        self, paths: dict[str, Path], load: Callable[[Path, str], FileExtract]
+    ):
+        self.paths = paths
+        self.load = load
+        self.loaded: dict[str, FileExtract] = {}
+
+    def __getitem__(self, module: str) -> FileExtract:
+        extract = self.loaded.get(module)
+        if extract is None:
+            extract = self.loaded[module] = self.load(self.paths[module], module)
+        return extract
+
+    def __contains__(self, module) -> bool:
+        return module in self.paths
+
+    def __iter__(self) -> Iterator[str]:
+        return iter(self.paths)
+
+    def __len__(self) -> int:
+        return len(self.paths)
+
+
+def _display_path(file: str, cwd: Path) -> str:
+    if not file:
+        return file
+    path = Path(file)
+    if path.is_absolute():
+        try:
+            return path.relative_to(cwd).as_posix()
+        except ValueError:
+            pass
+    return path.as_posix()
+
+
+def _format_size(size: float | None) -> str:
+    if size is None:
+        return "unknown"
+    if size < 1024:
+        return f"{size:.0f} B"
+    for unit in ("kB", "MB", "GB"):
+        size /= 1024
+        if size < 1024:
+            break
+    return f"{size:.1f} {unit}"
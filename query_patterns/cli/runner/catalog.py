@@ -0,0 +1,314 @@
+from typing import Callable, Iterable
+
+from query_patterns.tables import qualify_table
+from query_patterns.cli.runner.types import (
+    IndexDefinition,
+    IndexRecord,
+    IndexSet,
+)
+
+
+# (table_name, index_name, column_name, descending, predicate, unique, method,
+# kind) ordered by table, index and column position. column_name is the SQL text of
+# an expression column, or None when the catalog can't report it. Rows may
+# stop after column_name; the other fields then take their defaults.
+IndexRow = tuple
+# Runs (sql, params) and returns all rows.
+Fetch = Callable[[str, list[str]], Iterable[IndexRow]]
+
+
+# One round trip for every index in the current schema, including those behind
+# primary keys and unique constraints. Key columns only (INCLUDE columns of covering indexes are skipped);
+# expression columns are reported as their SQL text.
+POSTGRESQL_INDEXES_SQL = """
+SELECT t.relname, i.relname,
+    COALESCE(a.attname, pg_get_indexdef(ix.indexrelid, k.ord::int, true)),
+    (ix.indoption[k.ord - 1] & 1) = 1,
+    pg_get_expr(ix.indpred, ix.indrelid),
+    ix.indisunique,
+    am.amname,
+    CASE
+        WHEN ix.indisprimary THEN 'primary'
+        WHEN EXISTS (
+            SELECT 1 FROM pg_catalog.pg_constraint c
+            WHERE c.conindid = ix.indexrelid AND c.contype = 'u'
+        ) THEN 'unique'
+        ELSE 'index'
+    END
+FROM pg_catalog.pg_index ix
+JOIN pg_catalog.pg_class t ON t.oid = ix.indrelid
+JOIN pg_catalog.pg_class i ON i.oid = ix.indexrelid
+JOIN pg_catalog.pg_am am ON am.oid = i.relam
+JOIN pg_catalog.pg_namespace n ON n.oid = t.relnamespace
+CROSS JOIN LATERAL unnest(ix.indkey::int2[]) WITH ORDINALITY AS k(attnum, ord)
+LEFT JOIN pg_catalog.pg_attribute a
+    ON a.attrelid = t.oid AND a.attnum = k.attnum AND k.attnum > 0
+WHERE n.nspname = current_schema()
+    AND t.relkind IN ('r', 'm', 'p')
+    AND k.ord <= ix.indnkeyatts
+    {table_filter}
+ORDER BY t.relname, i.relname, k.ord
+"""
+
+
+# MySQL / MariaDB: one information_schema query for the current database.
+# A unique constraint is a unique index there, so both are reported as
+# "unique". MySQL has no partial indexes; functional key parts (COLUMN_NAME is NULL)
+# are dropped, as MariaDB has no EXPRESSION column to read them from.
+MYSQL_INDEXES_SQL = """
+SELECT TABLE_NAME, INDEX_NAME, COLUMN_NAME,
+    COLLATION = 'D', NULL, NON_UNIQUE = 0, INDEX_TYPE,
+    CASE
+        WHEN INDEX_NAME = 'PRIMARY' THEN 'primary'
+        WHEN NON_UNIQUE = 0 THEN 'unique'
+        ELSE 'index'
+    END
+FROM information_schema.STATISTICS
+WHERE TABLE_SCHEMA = DATABASE()
+    {table_filter}
+ORDER BY TABLE_NAME, INDEX_NAME, SEQ_IN_INDEX
+"""
+
+# SQLite: pragma table-valued functions (SQLite >= 3.16) joined in one
+# statement. pragma_index_list reports the origin of an index: CREATE INDEX
+# ('c'), UNIQUE constraint ('u') or PRIMARY KEY ('pk'). An INTEGER PRIMARY KEY
+# has no index of its own (it is the rowid B-tree) and is read from
+# pragma_table_info instead. The predicate of a partial index is cut from its
+# CREATE INDEX statement after the first WHERE surrounded by whitespace (tabs
+# and line breaks are turned into spaces first, keeping every position).
+SQLITE_INDEXES_SQL = """
+WITH t AS (
+    SELECT name FROM sqlite_master
+    WHERE type = 'table'
+        {table_filter}
+), m AS (
+    SELECT name, sql,
+        instr(
+            replace(replace(replace(
+                upper(sql) || ' ', char(9), ' '), char(10), ' '), char(13), ' '),
+            ' WHERE '
+        ) AS where_at
+    FROM sqlite_master
+    WHERE type = 'index'
+)
+SELECT tbl, idx, col, descending, predicate, is_unique, method, kind
+FROM (
+    SELECT t.name AS tbl, il.name AS idx, ii.name AS col,
+        ii."desc" AS descending,
+        CASE WHEN il.partial AND im.where_at > 0
+            THEN trim(
+                substr(im.sql, im.where_at + 7),
+                ' ' || char(9) || char(10) || char(13)
+            )
+        END AS predicate,
+        il."unique" AS is_unique,
+        NULL AS method,
+        CASE il.origin
+            WHEN 'pk' THEN 'primary'
+            WHEN 'u' THEN 'unique'
+            ELSE 'index'
+        END AS kind,
+        ii.seqno AS seq
+    FROM t
+    JOIN pragma_index_list(t.name) AS il
+    JOIN pragma_index_xinfo(il.name) AS ii
+    JOIN m AS im ON im.name = il.name
+    WHERE ii.key = 1
+    UNION ALL
+    SELECT t.name, '', ti.name, 0, NULL, 1, NULL, 'primary', 0
+    FROM t
+    JOIN pragma_table_info(t.name) AS ti
+    WHERE ti.pk = 1
+        AND upper(ti.type) = 'INTEGER'
+        AND (SELECT count(*) FROM pragma_table_info(t.name) WHERE pk > 0) = 1
+        AND NOT EXISTS (
+            SELECT 1 FROM pragma_index_list(t.name) WHERE origin = 'pk'
+        )
+)
+ORDER BY tbl, idx, seq
+"""
+
+# dialect -> (query template, table name column used to filter tables,
+# default schema expression replaced by a bind to read another schema; None
+# when the query can only read the default schema)
+BULK_INDEX_QUERIES: dict[str, tuple[str, str, str | None]] = {
+    "postgresql": (POSTGRESQL_INDEXES_SQL, "t.relname", "current_schema()"),
+    "mysql": (MYSQL_INDEXES_SQL, "TABLE_NAME", "DATABASE()"),
+    "mariadb": (MYSQL_INDEXES_SQL, "TABLE_NAME", "DATABASE()"),
+    "sqlite": (SQLITE_INDEXES_SQL, "name", None),
+}
+
+
+# (table_name, index_name, size in bytes)
+POSTGRESQL_INDEX_SIZES_SQL = """
+SELECT t.relname, i.relname, pg_relation_size(i.oid)
+FROM pg_catalog.pg_index ix
+JOIN pg_catalog.pg_class t ON t.oid = ix.indrelid
+JOIN pg_catalog.pg_class i ON i.oid = ix.indexrelid
+JOIN pg_catalog.pg_namespace n ON n.oid = t.relnamespace
+WHERE n.nspname = current_schema()
+    {table_filter}
+"""
+
+# InnoDB persistent statistics; `size` is in pages.
+MYSQL_INDEX_SIZES_SQL = """
+SELECT table_name, index_name, stat_value * @@innodb_page_size
+FROM mysql.innodb_index_stats
+WHERE database_name = DATABASE()
+    AND stat_name = 'size'
+    {table_filter}
+"""
+
+# Requires SQLite built with the dbstat virtual table.
+SQLITE_INDEX_SIZES_SQL = """
+SELECT m.tbl_name, m.name, SUM(s.pgsize)
+FROM sqlite_master AS m
+JOIN dbstat AS s ON s.name = m.name
+WHERE m.type = 'index'
+    {table_filter}
+GROUP BY m.tbl_name, m.name
+"""
+
+INDEX_SIZE_QUERIES: dict[str, tuple[str, str, str | None]] = {
+    "postgresql": (POSTGRESQL_INDEX_SIZES_SQL, "t.relname", "current_schema()"),
+    "mysql": (MYSQL_INDEX_SIZES_SQL, "table_name", "DATABASE()"),
+    "mariadb": (MYSQL_INDEX_SIZES_SQL, "table_name", "DATABASE()"),
+    "sqlite": (SQLITE_INDEX_SIZES_SQL, "m.tbl_name", None),
+}
+
+
+def _group_index_rows(
+    rows: Iterable[IndexRow], schema: str | None = None
+) -> dict[tuple[str, str], IndexDefinition]:
+    """
+    Group ordered index rows by (table, index name).
+
+    Indexes with a column the catalog can't name are dropped.
+    """
+    keys: dict[tuple[str, str], list[tuple[str | None, bool]]] = {}
+    properties: dict[tuple[str, str], tuple] = {}
+    for table, index, column, *rest in rows:
+        descending, predicate, unique, method, kind = (
+            *rest,
+            *(None, None, False, None, "index")[len(rest) :],
+        )
+        keys.setdefault((table, index), []).append((column, bool(descending)))
+        properties[(table, index)] = (predicate, unique, method, kind)
+
+    definitions = {}
+    for (table, index), parts in keys.items():
+        if any(column is None for column, _ in parts):
+            continue
+        predicate, unique, method, kind = properties[(table, index)]
+        definitions[(table, index)] = IndexDefinition(
+            qualify_table(table, schema),
+            tuple(column for column, _ in parts),
+            orders=tuple("desc" if descending else "asc" for _, descending in parts),
+            predicate=predicate,
+            unique=bool(unique),
+            method=method,
+            kind=kind or "index",
+        )
+    return definitions
+
+
+def build_index_set(rows: Iterable[IndexRow], schema: str | None = None) -> IndexSet:
+    """
+    Group ordered index rows into an IndexSet of IndexDefinitions. Tables are
+    qualified with `schema` when it is given.
+    """
+    return set(_group_index_rows(rows, schema).values())
+
+
+def build_bulk_query(
+    dialect: str,
+    tables: Iterable[str] | None = None,
+    placeholder: str = "%s",
+    queries: dict[str, tuple[str, str, str | None]] = BULK_INDEX_QUERIES,
+    schema: str | None = None,
+) -> tuple[str, list[str]] | None:
+    """
+    Return (sql, params) for the dialect's bulk index query, or None when
+    the dialect has none (or can't read `schema`).
+
+    When `tables` is given, only those tables are read. `placeholder` is the
+    bind marker of the executing API; `{i}` in it is replaced by the parameter
+    position (e.g. ":t{i}" for SQLAlchemy text()).
+    """
+    entry = queries.get(dialect)
+    if entry is None:
+        return None
+
+    template, table_column, schema_expression = entry
+    params: list[str] = []
+    if schema is not None:
+        if schema_expression is None:
+            return None
+        # The schema is compared before the table filter in every query.
+        template = template.replace(schema_expression, placeholder.format(i=0))
+        params.append(schema)
+
+    if tables is None:
+        return template.format(table_filter=""), params
+
+    names = sorted(tables)
+    binds = ", ".join(
+        placeholder.format(i=i) for i in range(len(params), len(params) + len(names))
+    )
+    table_filter = f"AND {table_column} IN ({binds})"
+    return template.format(table_filter=table_filter), params + names
+
+
+def collect_indexes_in_bulk(
+    dialect: str,
+    fetch: Fetch,
+    tables: Iterable[str] | None = None,
+    placeholder: str = "%s",
+    schema: str | None = None,
+) -> IndexSet | None:
+    """
+    Collect every index (or every index of `tables`) of the default schema,
+    or of `schema`, with a single catalog query.
+
+    `dialect` is a SQLAlchemy dialect name or Django connection vendor.
+    Returns None when the dialect has no bulk query, so the caller can fall
+    back to per-table introspection.
+    """
+    if tables is not None and not tables:
+        return set() if dialect in BULK_INDEX_QUERIES else None
+
+    query = build_bulk_query(dialect, tables, placeholder, schema=schema)
+    if query is None:
+        return None
+    return build_index_set(fetch(*query), schema)
+
+
+def collect_index_sizes_in_bulk(
+    dialect: str,
+    fetch: Fetch,
+    tables: Iterable[str] | None = None,
+    placeholder: str = "%s",
+    schema: str | None = None,
+) -> dict[IndexRecord, int] | None:
+    """
+    Return on-disk size in bytes per index, or None when the database can't
+    report index sizes.
+    """
+    columns_query = build_bulk_query(dialect, tables, placeholder, schema=schema)
+    sizes_query = build_bulk_query(
+        dialect, tables, placeholder, INDEX_SIZE_QUERIES, schema
+    )
+    if columns_query is None or sizes_query is None:
+        return None
+
+    definitions = _group_index_rows(fetch(*columns_query), schema)
+    sizes: dict[IndexRecord, int] = {}
+    for table, index, size in fetch(*sizes_query):
+        definition = definitions.get((table, index))
+        if definition is None or size is None:
+            continue
+        # Sizes are keyed by (table, columns) alone.
+        record = (definition.table, definition.columns)
+        # Identical column lists on one table: keep the larger one.
+        sizes[record] = max(sizes.get(record, 0), int(size))
+    return sizes
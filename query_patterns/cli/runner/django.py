@@ -1,22 +1,87 @@
+import fnmatch
+import functools
 import os
+import threading
+from typing import TYPE_CHECKING, Iterable, Iterator
 
 import click
 
 from query_patterns.cli.runner.base import BaseRunner
-from query_patterns.cli.runner.types import IndexSet, TableName, PatternSource
+from query_patterns.cli.runner.catalog import (
+    collect_index_sizes_in_bulk,
+    collect_indexes_in_bulk,
+)
+from query_patterns.cli.runner.plans import Plan, explain_pattern
+from query_patterns.tables import group_tables, qualify_table, split_database
+from query_patterns.cli.runner.types import (
+    IndexDefinition,
+    IndexSet,
+    TableName,
+    PatternSource,
+    CollectorKind,
+    ReportKind,
+    OutputFormat,
+    as_definition,
+    split_sort_order,
+)
+
+if TYPE_CHECKING:
+    from query_patterns.cli.runner.fleet import FleetTarget
+
+
+def _is_in_memory_db(connection) -> bool:
+    # An in-memory SQLite database exists only on the connection that created
+    # it: another thread's connection would see a different, empty database.
+    is_in_memory_db = getattr(connection, "is_in_memory_db", None)
+    return is_in_memory_db is not None and is_in_memory_db()
 
 
 class DjangoRunner(BaseRunner):
     settings: str | None
     source: PatternSource = "schema"
+    # DATABASES aliases read besides "default" (and those named by
+    # database-qualified patterns).
+    databases: tuple[str, ...] = ()
+    # Glob patterns of DATABASES aliases checked as a fleet.
+    fleet_databases: tuple[str, ...] = ()
 
     def __init__(
-        self, module: tuple[str, ...], settings: str, source: PatternSource, quiet: bool
+        self,
+        module: tuple[str, ...],
+        settings: str,
+        source: PatternSource,
+        quiet: bool,
+        collector: CollectorKind = "import",
+        cache: bool = False,
+        jobs: int = 1,
+        db_workers: int = 1,
+        snapshot_file: str | None = None,
+        report: ReportKind = "patterns",
+        since: str | None = None,
+        verify_plans: bool = False,
+        output_format: OutputFormat = "text",
+        databases: tuple[str, ...] = (),
+        fleet_databases: tuple[str, ...] = (),
+        fleet_workers: int = 8,
+        target_timeout: float | None = 60.0,
     ):
         self.module = module
         self.settings = settings
         self.source = source
         self.quiet = quiet
+        self.collector = collector
+        self.cache = cache
+        self.jobs = jobs
+        self.db_workers = db_workers
+        self.snapshot_file = snapshot_file
+        self.report = report
+        self.since = since
+        self.verify_plans = verify_plans
+        self.output_format = output_format
+        self.databases = databases
+        self.fleet_databases = fleet_databases
+        self.fleet_workers = fleet_workers
+        self.target_timeout = target_timeout
 
     def _load_env(self):
         try:
@@ -40,41 +105,274 @@ class DjangoRunner(BaseRunner):
 
         django.setup()
 
-    def _collect_indexes_by_source(self) -> IndexSet:
+    def _collect_indexes_by_source(self, tables: set[str] | None = None) -> IndexSet:
+        targets = self._database_tables(tables)
         if self.source == "schema":
-            click.echo("Collecting indexes from Django model schema...")
-            indexes = self._collect_django_indexes_from_schema()
+            self._info("Collecting indexes from Django model schema...")
+            indexes = self._collect_django_indexes_from_schema(
+                [alias for alias in targets if alias is not None]
+            )
         else:
-            click.echo("Collecting indexes from actual database...")
-            indexes = self._collect_django_indexes_from_db()
+            self._info("Collecting indexes from actual database...")
+            indexes = self._collect_django_indexes_from_databases(
+                self.db_workers, targets
+            )
         return indexes
 
+    def _database_tables(
+        self, tables: set[str] | None
+    ) -> dict[str | None, set[str] | None]:
+        """
+        DATABASES alias (None for "default") -> tables to read there.
+        """
+        from django.db import DEFAULT_DB_ALIAS, connections
+
+        targets = group_tables(tables, split_database, self.databases)
+        if DEFAULT_DB_ALIAS in targets:
+            default_tables = targets.pop(DEFAULT_DB_ALIAS)
+            if None in targets and default_tables is not None:
+                targets[None] |= default_tables
+            else:
+                targets[None] = default_tables
+        unknown = sorted(a for a in targets if a is not None and a not in connections)
+        if unknown:
+            raise click.ClickException(f"Unknown database alias: {', '.join(unknown)}")
+        return targets
+
+    def _fleet_option(self) -> str | None:
+        return "--fleet-database" if self.fleet_databases else None
+
+    def _fleet_targets(self) -> list["FleetTarget"]:
+        from django.db import connections
+
+        from query_patterns.cli.runner.fleet import FleetTarget
+
+        if self.source == "snapshot":
+            click.echo(
+                "[WARN] --fleet-database reads indexes from the databases; "
+                "--source is ignored",
+                err=True,
+            )
+
+        aliases = [
+            alias
+            for alias in connections
+            if any(fnmatch.fnmatchcase(alias, glob) for glob in self.fleet_databases)
+        ]
+        if not aliases:
+            raise click.ClickException(
+                "No DATABASES alias matches --fleet-database "
+                + ", ".join(self.fleet_databases)
+            )
+        return [
+            FleetTarget(
+                alias,
+                functools.partial(self._collect_fleet_target, alias),
+                local=_is_in_memory_db(connections[alias]),
+            )
+            for alias in aliases
+        ]
+
+    def _collect_fleet_target(self, alias: str, tables: set[str] | None) -> IndexSet:
+        from django.db import connections
+
+        try:
+            return self._collect_django_indexes_from_db(self.db_workers, tables, alias)
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connections[alias].close()
+
+    def _collect_index_sizes(self, tables: set[str] | None = None):
+        if self.source != "db":
+            return {}
+
+        from django.db import DEFAULT_DB_ALIAS, connections
+
+        sizes = {}
+        try:
+            for alias, alias_tables in self._database_tables(tables).items():
+                connection = connections[alias or DEFAULT_DB_ALIAS]
+                with connection.cursor() as cursor:
+
+                    def fetch(sql, params):
+                        cursor.execute(sql, params)
+                        return cursor.fetchall()
+
+                    alias_sizes = collect_index_sizes_in_bulk(
+                        connection.vendor, fetch, alias_tables
+                    )
+                if alias_sizes is None:
+                    return None
+                for (table, columns), size in alias_sizes.items():
+                    record = (TableName(qualify_table(table, database=alias)), columns)
+                    sizes[record] = size
+        except click.ClickException:
+            raise
+        except Exception as e:
+            click.echo(f"[WARN] Index sizes are not available: {e}", err=True)
+            return None
+        return sizes
+
+    def _plan_dialect(self) -> str:
+        from django.db import connection
+
+        return connection.vendor
+
+    def _explain_patterns(self, patterns):
+        from django.db import DEFAULT_DB_ALIAS, connections
+
+        by_alias: dict[str, list] = {}
+        for pattern in patterns:
+            alias = split_database(pattern.table)[0] or DEFAULT_DB_ALIAS
+            by_alias.setdefault(alias, []).append(pattern)
+
+        plans = {}
+        for alias, alias_patterns in by_alias.items():
+            workers = self.db_workers
+            if _is_in_memory_db(connections[alias]):
+                workers = 1
+            explain = functools.partial(self._explain_django_patterns, alias=alias)
+            for shard_plans in self._map_shards(alias_patterns, workers, explain):
+                plans.update(shard_plans)
+        return plans
+
+    @staticmethod
+    def _explain_django_patterns(patterns, alias: str = "default") -> dict:
+        from django.db import connections, transaction
+
+        connection = connections[alias]
+        plans = {}
+        try:
+            with connection.cursor() as cursor:
+
+                def run(sql, params):
+                    cursor.execute(sql, params)
+                    return cursor.fetchall() if cursor.description else []
+
+                for i, pattern in enumerate(patterns):
+                    try:
+                        with transaction.atomic(using=alias):
+                            plans[pattern] = explain_pattern(
+                                connection.vendor,
+                                split_database(pattern.table)[1],
+                                pattern.columns,
+                                run,
+                                name=f"query_patterns_probe_{i}",
+                                order_by=pattern.order_by,
+                                condition=pattern.condition,
+                            )
+                            transaction.set_rollback(True, using=alias)
+                    except Exception as e:
+                        click.echo(
+                            f"[WARN] Cannot explain {pattern.describe()}: {e}",
+                            err=True,
+                        )
+                        plans[pattern] = Plan("unknown")
+        finally:
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
+        return plans
+
+    def _snapshot_metadata(self) -> dict[str, str]:
+        metadata = super()._snapshot_metadata()
+        if self.source == "db":
+            from django.db import connection
+
+            metadata["dialect"] = connection.vendor
+        return metadata
+
     @staticmethod
-    def _collect_django_indexes_from_schema() -> IndexSet:
+    def _collect_django_indexes_from_schema(databases: Iterable[str] = ()) -> IndexSet:
         """
         Collect all indexes defined in Django model declarations (schema level).
 
         Returns:
-            IndexSet: a set of (table_name, (field1, field2, ...))
+            IndexSet: a set of IndexDefinitions (table_name, (column1, ...))
             NOTE:
-                - Only Django model-declared indexes (model.Meta.indexes) are included.
-                - Implicit PK indexes, unique constraints, and unique_together
-                  are not included unless explicitly declared as Index().
+                - Every index Django creates is included, with its kind:
+                  Meta.indexes, the primary key, unique fields,
+                  unique_together and UniqueConstraints, db_index=True
+                  fields and ForeignKey indexes.
+                - Auto-created many-to-many tables are included.
+                - Models are also recorded as "<alias>:<table>" for every alias
+                  in `databases` their routers allow them to migrate to.
         """
         indexes: IndexSet = set()
 
         from django.apps import apps
+        from django.db import router
 
-        for model in apps.get_models():
-            table = TableName(model._meta.db_table)
+        for model in apps.get_models(include_auto_created=True):
+            table = model._meta.db_table
+            tables = [TableName(table)] + [
+                TableName(qualify_table(table, database=alias))
+                for alias in databases
+                if router.allow_migrate_model(alias, model)
+            ]
 
-            for index in model._meta.indexes:
-                cols = tuple(index.fields)
-                indexes.add((table, cols))
+            for definition in _model_index_definitions(model):
+                indexes.update(definition.with_table(name) for name in tables)
         return indexes
 
-    @staticmethod
-    def _collect_django_indexes_from_db() -> IndexSet:
+    @classmethod
+    def _collect_django_indexes_from_databases(
+        cls,
+        workers: int = 1,
+        targets: dict[str | None, set[str] | None] | None = None,
+    ) -> IndexSet:
+        """
+        Read indexes of every DATABASES alias in `targets` (alias, None for
+        "default" -> tables to read), concurrently within the `workers`
+        connection budget. Tables of other aliases are recorded as
+        "<alias>:<table>".
+        """
+        from django.db import DEFAULT_DB_ALIAS, connections
+
+        if targets is None:
+            targets = {None: None}
+
+        def collect(shard) -> IndexSet:
+            indexes: IndexSet = set()
+            for alias, tables in shard:
+                alias_indexes = cls._collect_django_indexes_from_db(
+                    inner, tables, alias or DEFAULT_DB_ALIAS
+                )
+                indexes.update(
+                    as_definition(record).with_table(
+                        qualify_table(record[0], database=alias)
+                    )
+                    for record in alias_indexes
+                )
+            return indexes
+
+        def collect_and_close(shard) -> IndexSet:
+            try:
+                return collect(shard)
+            finally:
+                if threading.current_thread() is not threading.main_thread():
+                    for alias, _ in shard:
+                        connections[alias or DEFAULT_DB_ALIAS].close()
+
+        local = [
+            (alias, tables)
+            for alias, tables in targets.items()
+            if _is_in_memory_db(connections[alias or DEFAULT_DB_ALIAS])
+        ]
+        threaded = [target for target in targets.items() if target not in local]
+        outer, inner = cls._split_workers(workers, len(threaded))
+
+        indexes = collect(local)
+        for shard_indexes in cls._map_shards(threaded, outer, collect_and_close):
+            indexes |= shard_indexes
+        return indexes
+
+    @classmethod
+    def _collect_django_indexes_from_db(
+        cls,
+        workers: int = 1,
+        tables: set[str] | None = None,
+        alias: str = "default",
+    ) -> IndexSet:
         """
         Collect all actual indexes that exist in the database via Django's
         introspection system.
@@ -83,24 +381,197 @@ class DjangoRunner(BaseRunner):
             IndexSet: a set of (table_name, (field1, field2, ...))
                       representing actual DB-level indexes.
 
+            NOTE:
+                - Backends with a bulk catalog query (see runner.catalog) read
+                  every index in one round trip instead of one per table.
+                - Other backends are introspected table by table, on up to
+                  `workers` threads (each with its own Django connection).
+                - With `tables`, only indexes of those tables are read.
+                - `alias` picks the DATABASES entry; table names are not
+                  qualified with it.
         """
+        from django.db import connections
+
+        connection = connections[alias]
+        with connection.cursor() as cursor:
+
+            def fetch(sql, params):
+                cursor.execute(sql, params)
+                return cursor.fetchall()
+
+            bulk = collect_indexes_in_bulk(connection.vendor, fetch, tables)
+            if bulk is not None:
+                return bulk
+
+            table_names = connection.introspection.table_names(cursor)
+            if tables is not None:
+                table_names = [t for t in table_names if t in tables]
+
+        if _is_in_memory_db(connection):
+            workers = 1
+
+        return cls._collect_indexes_concurrently(
+            table_names,
+            workers,
+            functools.partial(cls._collect_django_indexes_for_tables, alias=alias),
+        )
+
+    @staticmethod
+    def _collect_django_indexes_for_tables(
+        table_names: list[str], alias: str = "default"
+    ) -> IndexSet:
         indexes: IndexSet = set()
 
-        from django.db import connection
+        from django.db import connections
 
-        with connection.cursor() as cursor:
-            for table_name in connection.introspection.table_names():
-                constraints = connection.introspection.get_constraints(
-                    cursor, table_name
-                )
+        connection = connections[alias]
+        try:
+            with connection.cursor() as cursor:
+                for table_name in table_names:
+                    constraints = connection.introspection.get_constraints(
+                        cursor, table_name
+                    )
 
-                for _, spec in constraints.items():
-                    # spec keys include:
-                    #   columns, primary_key, unique, index, check, foreign_key, ...
+                    for _, spec in constraints.items():
+                        # spec keys include:
+                        #   columns, primary_key, unique, index, check, foreign_key, ...
 
-                    # Keep ONLY real indexes (not PK)
-                    if spec.get("index") and not spec.get("primary_key"):
-                        cols = tuple(spec["columns"])
-                        indexes.add((TableName(table_name), cols))
+                        # Keep indexes and the constraints backed by one
+                        # (primary key, unique); not foreign keys or checks.
+                        if (
+                            spec.get("index")
+                            or spec.get("primary_key")
+                            or spec.get("unique")
+                        ):
+                            definition = _introspected_index_definition(
+                                table_name, spec
+                            )
+                            if definition is not None:
+                                indexes.add(definition)
+        finally:
+            # Worker threads get their own connection; don't leak it.
+            if threading.current_thread() is not threading.main_thread():
+                connection.close()
 
         return indexes
+
+
+def _model_index_definitions(model) -> Iterator[IndexDefinition]:
+    """
+    Every index Django creates for a model's table.
+    """
+    from django.db import models
+
+    opts = model._meta
+    table = opts.db_table
+    for index in opts.indexes:
+        yield _model_index_definition(model, index)
+
+    pk = opts.pk
+    if pk is not None:
+        # CompositePrimaryKey (Django 5.2+) has no column of its own.
+        columns = (pk.column,) if pk.column else tuple(f.column for f in pk.fields)
+        yield IndexDefinition(table, columns, kind="primary")
+
+    for field in opts.local_concrete_fields:
+        if field.primary_key:
+            continue
+        if field.unique:
+            yield IndexDefinition(table, (field.column,), unique=True, kind="unique")
+        elif field.db_index:
+            kind = "foreign-key" if field.is_relation else "db-index"
+            yield IndexDefinition(table, (field.column,), kind=kind)
+
+    for field_names in opts.unique_together:
+        yield IndexDefinition(
+            table,
+            tuple(opts.get_field(name).column for name in field_names),
+            unique=True,
+            kind="unique",
+        )
+    # Removed in Django 5.1.
+    for field_names in getattr(opts, "index_together", ()):
+        yield IndexDefinition(
+            table, tuple(opts.get_field(name).column for name in field_names)
+        )
+    for constraint in opts.constraints:
+        if isinstance(constraint, models.UniqueConstraint):
+            yield _model_index_definition(model, constraint).replace(
+                unique=True, kind="unique"
+            )
+
+
+def _model_index_definition(model, index) -> IndexDefinition:
+    """
+    Definition of a Meta.indexes entry (or UniqueConstraint): "-field" and
+    `.desc()` give the sort order, functional indexes and `condition` are
+    compiled to SQL with the default connection, and the index class
+    (GinIndex, HashIndex, ...) gives the access method.
+    """
+    from django.db import DEFAULT_DB_ALIAS, connections
+    from django.db.models.sql import Query
+
+    connection = connections[DEFAULT_DB_ALIAS]
+    columns, orders = [], []
+    if index.expressions:
+        query = Query(model, alias_cols=False)
+        compiler = query.get_compiler(connection=connection)
+        for expression in index.expressions:
+            sql, params = compiler.compile(expression.resolve_expression(query))
+            column, order = split_sort_order(sql % tuple(params))
+            columns.append(column)
+            orders.append(order)
+    else:
+        fields_orders = getattr(index, "fields_orders", None) or [
+            (name, "") for name in index.fields
+        ]
+        for name, order in fields_orders:
+            columns.append(model._meta.get_field(name).column)
+            orders.append("desc" if order == "DESC" else "asc")
+
+    predicate = None
+    if index.condition is not None:
+        try:
+            predicate = index._get_condition_sql(model, connection.schema_editor())
+        except Exception:
+            # Never equal to a declared condition: the index isn't used.
+            predicate = str(index.condition)
+
+    return IndexDefinition(
+        model._meta.db_table,
+        tuple(columns),
+        orders=tuple(orders),
+        predicate=predicate,
+        method=None if getattr(index, "suffix", "idx") == "idx" else index.suffix,
+    )
+
+
+def _introspected_index_definition(
+    table_name: str, spec: dict
+) -> IndexDefinition | None:
+    """
+    Definition of an index from introspection.get_constraints(), or None
+    for an expression index (its key parts have no column name).
+    """
+    columns = tuple(spec["columns"])
+    if not columns or None in columns:
+        return None
+    orders = spec.get("orders") or ()
+    method = spec.get("type")
+    if spec.get("primary_key"):
+        kind = "primary"
+    elif spec.get("unique") and not spec.get("index"):
+        kind = "unique"
+    else:
+        kind = "index"
+    return IndexDefinition(
+        table_name,
+        columns,
+        orders=tuple(
+            "desc" if (order or "").upper() == "DESC" else "asc" for order in orders
+        )
+        or None,
+        unique=bool(spec.get("unique")),
+        method=None if method in (None, "idx") else str(method),
+        kind=kind,
+    )
@@ -0,0 +1,402 @@
+import asyncio
+import queue
+import threading
+import time
+from collections import OrderedDict
+from dataclasses import dataclass
+from typing import Any, Awaitable, Callable, Literal
+
+import click
+
+from query_patterns.cli.matcher import IndexMatcher
+from query_patterns.cli.output import dumps, format_location
+from query_patterns.cli.runner.base import BaseRunner
+from query_patterns.cli.runner.types import IndexSet
+from query_patterns.pattern import QueryPattern
+from query_patterns.tables import split_database
+
+TargetStatus = Literal["ok", "error", "timeout"]
+# Row status: served on every reachable database, on some of them, or on none.
+DriftStatus = Literal["ok", "drift", "missing"]
+
+
+@dataclass(frozen=True)
+class FleetTarget:
+    """
+    One database of the fleet. `collect` (or the coroutine function
+    `acollect`, for async drivers) reads its indexes of the given tables
+    (None for all tables).
+    """
+
+    name: str
+    collect: Callable[[set[str] | None], IndexSet] | None = None
+    # Run on the calling thread, without a timeout (in-memory SQLite).
+    local: bool = False
+    acollect: Callable[[set[str] | None], Awaitable[IndexSet]] | None = None
+
+
+@dataclass(frozen=True)
+class TargetResult:
+    status: TargetStatus
+    indexes: IndexSet | None = None
+    error: str | None = None
+
+
+def collect_fleet(
+    targets: list[FleetTarget],
+    tables: set[str] | None,
+    workers: int,
+    timeout: float | None,
+) -> dict[str, TargetResult]:
+    """
+    Read indexes of every target, `workers` at a time. A target that raises
+    or runs longer than `timeout` seconds is reported instead of failing the
+    run.
+
+    Async targets share one event loop on a thread of their own, next to the
+    threads of the other targets; `workers` is split between both groups.
+    """
+    results: dict[str, TargetResult] = {}
+    for target in targets:
+        if target.local:
+            results[target.name] = _collect_target(target, tables)
+
+    async_targets = [target for target in targets if target.acollect is not None]
+    sync_targets = [
+        target for target in targets if not target.local and target.acollect is None
+    ]
+    async_workers, sync_workers = _split_workers(
+        workers, len(async_targets), len(sync_targets)
+    )
+
+    async_thread = None
+    if async_targets:
+        async_results: dict[str, TargetResult] = {}
+
+        def run_async():
+            async_results.update(
+                asyncio.run(
+                    _collect_async_targets(
+                        async_targets, tables, async_workers, timeout
+                    )
+                )
+            )
+
+        async_thread = threading.Thread(
+            target=run_async, name="query-patterns-fleet-async", daemon=True
+        )
+        async_thread.start()
+        if not sync_workers:
+            # A single worker: the groups take turns.
+            async_thread.join()
+            sync_workers = workers
+
+    results.update(_collect_sync_targets(sync_targets, tables, sync_workers, timeout))
+    if async_thread is not None:
+        async_thread.join()
+        results.update(async_results)
+
+    return {target.name: results[target.name] for target in targets}
+
+
+def _split_workers(workers: int, async_count: int, sync_count: int) -> tuple[int, int]:
+    """
+    Share `workers` between the async and the threaded targets, in proportion
+    to their number. Returns (async workers, thread workers); the threaded
+    share is 0 when both groups exist but there is only one worker.
+    """
+    if not async_count:
+        return 0, workers
+    if not sync_count:
+        return workers, 0
+    async_workers = max(1, workers * async_count // (async_count + sync_count))
+    async_workers = min(async_workers, async_count)
+    return async_workers, max(workers - async_workers, 0)
+
+
+def _collect_sync_targets(
+    targets: list[FleetTarget],
+    tables: set[str] | None,
+    workers: int,
+    timeout: float | None,
+) -> dict[str, TargetResult]:
+    """
+    Run each target on a daemon thread, `workers` at a time. A timed-out
+    thread can't be interrupted: it is abandoned, but keeps its slot (and its
+    connection) until it returns. Targets still waiting for a slot when only
+    abandoned threads hold them time out as well.
+    """
+    results: dict[str, TargetResult] = {}
+    pending = list(reversed(targets))
+    # name -> deadline
+    running: dict[str, float] = {}
+    abandoned: set[str] = set()
+    done: queue.SimpleQueue = queue.SimpleQueue()
+
+    def work(target: FleetTarget):
+        done.put((target.name, _collect_target(target, tables)))
+
+    while pending or running:
+        while pending and len(running) + len(abandoned) < workers:
+            target = pending.pop()
+            running[target.name] = (
+                time.monotonic() + timeout if timeout else float("inf")
+            )
+            threading.Thread(
+                target=work,
+                args=(target,),
+                name=f"query-patterns-fleet-{target.name}",
+                daemon=True,
+            ).start()
+
+        if running:
+            wait = min(running.values()) - time.monotonic()
+        else:
+            # Every slot is held by an abandoned thread.
+            wait = timeout if timeout else float("inf")
+        try:
+            name, result = done.get(
+                timeout=max(wait, 0) if wait != float("inf") else None
+            )
+        except queue.Empty:
+            if not running:
+                for target in pending:
+                    results[target.name] = TargetResult(
+                        "timeout",
+                        error=f"no free worker after {timeout:g}s: "
+                        f"{len(abandoned)} timed-out connection(s) still open",
+                    )
+                break
+            now = time.monotonic()
+            for name, deadline in list(running.items()):
+                if deadline <= now:
+                    del running[name]
+                    abandoned.add(name)
+                    results[name] = TargetResult(
+                        "timeout", error=f"timed out after {timeout:g}s"
+                    )
+            continue
+        # A late result of a timed-out target only frees its slot.
+        if name in abandoned:
+            abandoned.discard(name)
+        elif running.pop(name, None) is not None:
+            results[name] = result
+
+    return results
+
+
+async def _collect_async_targets(
+    targets: list[FleetTarget],
+    tables: set[str] | None,
+    workers: int,
+    timeout: float | None,
+) -> dict[str, TargetResult]:
+    slots = asyncio.Semaphore(workers)
+
+    async def collect(target: FleetTarget) -> TargetResult:
+        async with slots:
+            try:
+                indexes = await asyncio.wait_for(target.acollect(tables), timeout)
+            except asyncio.TimeoutError:
+                return TargetResult("timeout", error=f"timed out after {timeout:g}s")
+            except Exception as e:
+                return TargetResult("error", error=str(e).strip() or type(e).__name__)
+            return TargetResult("ok", indexes=indexes)
+
+    collected = await asyncio.gather(*(collect(target) for target in targets))
+    return {target.name: result for target, result in zip(targets, collected)}
+
+
+def _collect_target(target: FleetTarget, tables: set[str] | None) -> TargetResult:
+    try:
+        return TargetResult("ok", indexes=target.collect(tables))
+    except Exception as e:
+        return TargetResult("error", error=str(e).strip() or type(e).__name__)
+
+
+class FleetSession:
+    """
+    Checks one set of declared patterns against every database of a fleet
+    (tenant or shard databases sharing a schema) and reports the drift
+    matrix: pattern x database -> match status.
+    """
+
+    def __init__(self, runner: BaseRunner):
+        self.runner = runner
+
+    def run(self):
+        runner = self.runner
+        patterns, counts = runner._collect_checked_patterns()
+
+        # Every target is one database: patterns bound to another one don't
+        # belong to the fleet.
+        skipped = [p for p in patterns if split_database(p.table)[0] is not None]
+        if skipped:
+            click.echo(
+                "[WARN] Database-qualified patterns are not checked against "
+                "the fleet: " + ", ".join(p.describe() for p in skipped),
+                err=True,
+            )
+            patterns = [p for p in patterns if p not in skipped]
+
+        targets = runner._fleet_targets()
+        names = [target.name for target in targets]
+        duplicates = sorted({name for name in names if names.count(name) > 1})
+        if duplicates:
+            raise click.ClickException(
+                f"Duplicate database name(s): {', '.join(duplicates)}"
+            )
+
+        runner._info(
+            f"Collecting indexes from {len(targets)} database(s) "
+            f"with {runner.fleet_workers} workers..."
+        )
+        started = time.perf_counter()
+        target_results = collect_fleet(
+            targets,
+            {p.table for p in patterns},
+            runner.fleet_workers,
+            runner.target_timeout,
+        )
+        elapsed = time.perf_counter() - started
+        for name, result in target_results.items():
+            if result.status != "ok":
+                click.echo(f"[WARN] {name}: {result.error}", err=True)
+        if all(result.status != "ok" for result in target_results.values()):
+            raise click.ClickException("No database of the fleet could be read.")
+        runner._info(f"Read {len(targets)} database(s) in {elapsed:.1f}s.")
+
+        matrix = self._match(patterns, target_results)
+        locations = runner._pattern_locations()
+        if runner.output_format == "json":
+            self._write_json(matrix, counts, locations, target_results)
+        else:
+            self._write_text(matrix, counts, locations, target_results)
+
+    @staticmethod
+    def _match(
+        patterns: list[QueryPattern], target_results: dict[str, TargetResult]
+    ) -> OrderedDict[QueryPattern, dict[str, str]]:
+        """
+        pattern -> {database: match status}, with the target status for
+        databases that could not be read.
+        """
+        matchers = {
+            name: IndexMatcher(result.indexes)
+            for name, result in target_results.items()
+            if result.indexes is not None
+        }
+        matrix: OrderedDict[QueryPattern, dict[str, str]] = OrderedDict()
+        for pattern in patterns:
+            matrix[pattern] = {
+                name: (
+                    matchers[name].match(
+                        pattern.table,
+                        pattern.columns,
+                        pattern.order_by,
+                        pattern.condition,
+                    )[0]
+                    if name in matchers
+                    else result.status
+                )
+                for name, result in target_results.items()
+            }
+        return matrix
+
+    @staticmethod
+    def _drift(statuses: dict[str, str]) -> tuple[DriftStatus, list[str], int]:
+        """
+        (row status, databases missing an index, databases read)
+        """
+        read = [
+            name
+            for name, status in statuses.items()
+            if status not in ("error", "timeout")
+        ]
+        # An index that no longer serves the ORDER BY drifted too.
+        missing = [name for name in read if statuses[name] in ("missing", "sort")]
+        if not missing:
+            return "ok", missing, len(read)
+        if len(missing) == len(read):
+            return "missing", missing, len(read)
+        return "drift", missing, len(read)
+
+    def _write_text(
+        self,
+        matrix: OrderedDict[QueryPattern, dict[str, str]],
+        counts: dict[QueryPattern, int],
+        locations: dict[QueryPattern, list[dict[str, Any]]],
+        target_results: dict[str, TargetResult],
+    ):
+        quiet = self.runner.quiet
+        totals = {"ok": 0, "drift": 0, "missing": 0}
+        for pattern, statuses in matrix.items():
+            status, missing, read = self._drift(statuses)
+            totals[status] += 1
+            key = pattern.describe()
+            usage_suffix = f"[usage={counts.get(pattern, 1)}]"
+            if status == "ok":
+                if not quiet:
+                    click.echo(
+                        click.style(
+                            f"[OK] {key} {usage_suffix} [databases={read}]",
+                            fg="green",
+                        )
+                    )
+                continue
+
+            click.echo(
+                click.style(
+                    f"[{status.upper()}] {key} {usage_suffix} "
+                    f"[missing={len(missing)}/{read}]",
+                    fg="yellow" if status == "drift" else "red",
+                )
+            )
+            if status == "drift":
+                click.echo(f"    missing on: {', '.join(missing)}")
+            for location in locations.get(pattern, ()):
+                click.echo(f"    at {format_location(location)}")
+
+        for name, result in target_results.items():
+            if result.status != "ok":
+                click.echo(click.style(f"[{result.status.upper()}] {name}", fg="red"))
+
+        if not quiet:
+            unread = sum(r.status != "ok" for r in target_results.values())
+            click.echo(
+                f"{len(matrix)} pattern(s) on {len(target_results)} database(s)"
+                + (f" ({unread} not read)" if unread else "")
+                + f": {totals['ok']} ok, {totals['drift']} drifted, "
+                f"{totals['missing']} missing everywhere."
+            )
+
+    def _write_json(
+        self,
+        matrix: OrderedDict[QueryPattern, dict[str, str]],
+        counts: dict[QueryPattern, int],
+        locations: dict[QueryPattern, list[dict[str, Any]]],
+        target_results: dict[str, TargetResult],
+    ):
+        results = []
+        totals = {"ok": 0, "drift": 0, "missing": 0}
+        for pattern, statuses in matrix.items():
+            status, _, _ = self._drift(statuses)
+            totals[status] += 1
+            results.append(
+                {
+                    "table": pattern.table,
+                    "columns": list(pattern.columns),
+                    "status": status,
+                    "usage": counts.get(pattern, 1),
+                    "databases": statuses,
+                    "locations": list(locations.get(pattern, ())),
+                }
+            )
+        databases = [
+            {"name": name, "status": result.status, "error": result.error}
+            for name, result in target_results.items()
+        ]
+        summary = {"total": len(results), **totals}
+        click.echo(
+            dumps({"databases": databases, "results": results, "summary": summary})
+        )
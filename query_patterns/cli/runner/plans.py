@@ -0,0 +1,260 @@
+import hashlib
+import json
+import os
+import re
+from dataclasses import asdict, dataclass
+from pathlib import Path
+from typing import Any, Callable, Literal
+
+from query_patterns.cli.runner.types import IndexColumns, IndexSet, as_definition
+from query_patterns.pattern import QueryPattern
+from query_patterns.tables import split_schema
+
+
+PLAN_CACHE_FILE = "plans.json"
+PLAN_CACHE_VERSION = 2
+
+# "sort": rows are read through an index but sorted afterwards instead of
+# being returned in index order.
+ScanKind = Literal["index", "seq", "sort", "unknown"]
+# Runs (sql, params) and returns all rows (an empty list for statements
+# without a result set).
+Run = Callable[[str, list[Any]], list[tuple]]
+
+
+@dataclass(frozen=True)
+class Plan:
+    scan: ScanKind
+    index: str | None = None
+
+
+def supports_plans(dialect: str) -> bool:
+    return dialect in ("postgresql", "sqlite")
+
+
+def _quote(identifier: str) -> str:
+    return '"' + identifier.replace('"', '""') + '"'
+
+
+def _quote_table(table: str) -> str:
+    schema, name = split_schema(table)
+    return _quote(name) if schema is None else f"{_quote(schema)}.{_quote(name)}"
+
+
+def _order_by_clause(order_by: IndexColumns) -> str:
+    if not order_by:
+        return ""
+    terms = ", ".join(
+        f"{_quote(column[1:])} DESC" if column.startswith("-") else _quote(column)
+        for column in order_by
+    )
+    return f" ORDER BY {terms}"
+
+
+def _select(
+    table: str, where: str, order_by: IndexColumns, condition: str | None
+) -> str:
+    sql = f"SELECT * FROM {_quote_table(table)}"
+    if condition is not None:
+        where = f"{where} AND ({condition})" if where else f"({condition})"
+    if where:
+        sql += f" WHERE {where}"
+    return sql + _order_by_clause(order_by)
+
+
+def explain_pattern(
+    dialect: str,
+    table: str,
+    columns: IndexColumns,
+    run: Run,
+    placeholder: str = "%s",
+    name: str = "query_patterns_probe",
+    order_by: IndexColumns = (),
+    condition: str | None = None,
+) -> Plan:
+    """
+    Plan `SELECT * FROM table WHERE col = ? AND ... ORDER BY ...` for one
+    pattern and report whether the planner reads it through an index.
+    WHERE is left out for order-only patterns, and `-col` in `order_by`
+    sorts descending. A `condition` is added to WHERE, so partial indexes
+    on it can be chosen.
+
+    PostgreSQL plans a prepared statement as a generic plan (independent of
+    parameter values) with sequential scans disabled, so tables that are
+    empty in a local database still show whether an index *can* be used.
+    `placeholder` is the bind marker of the executing API; `{i}` in it is
+    replaced by the parameter position. The caller must run each call in a
+    transaction and roll it back afterwards.
+    """
+    if dialect == "postgresql":
+        return _explain_postgresql(table, columns, order_by, condition, run, name)
+    if dialect == "sqlite":
+        return _explain_sqlite(table, columns, order_by, condition, run, placeholder)
+    raise ValueError(f"Plan verification is not supported for {dialect}")
+
+
+def _explain_postgresql(
+    table: str,
+    columns: IndexColumns,
+    order_by: IndexColumns,
+    condition: str | None,
+    run: Run,
+    name: str,
+) -> Plan:
+    where = " AND ".join(
+        f"{_quote(column)} = ${i}" for i, column in enumerate(columns, start=1)
+    )
+    nulls = ", ".join("NULL" for _ in columns)
+    # SET LOCAL: the caller runs every probe in a transaction it rolls back.
+    run("SET LOCAL enable_seqscan = off", [])
+    run("SET LOCAL plan_cache_mode = force_generic_plan", [])
+    run(f"PREPARE {name} AS {_select(table, where, order_by, condition)}", [])
+    execute = f"EXECUTE {name}({nulls})" if columns else f"EXECUTE {name}"
+    rows = run(f"EXPLAIN (FORMAT JSON) {execute}", [])
+    # Prepared statements outlive the transaction.
+    run(f"DEALLOCATE {name}", [])
+
+    document = rows[0][0]
+    if isinstance(document, str):
+        document = json.loads(document)
+    return parse_postgresql_plan(document, table)
+
+
+def parse_postgresql_plan(document: list[dict], table: str) -> Plan:
+    """
+    Find how `table` is read in an EXPLAIN (FORMAT JSON) document. A Sort
+    node above an index scan means the index does not serve ORDER BY.
+
+    "Relation Name" is the bare table name; "Schema" is only present in
+    VERBOSE output, so it is compared when both sides have one.
+    """
+    schema, name = split_schema(table)
+    stack = [document[0]["Plan"]]
+    index_name = None
+    sorted_ = False
+    while stack:
+        node = stack.pop()
+        node_type = node.get("Node Type", "")
+        if (
+            node_type == "Seq Scan"
+            and node.get("Relation Name") == name
+            and (schema is None or node.get("Schema", schema) == schema)
+        ):
+            return Plan("seq")
+        if node_type == "Sort":
+            sorted_ = True
+        if "Index Name" in node and index_name is None:
+            index_name = node["Index Name"]
+        stack.extend(node.get("Plans", ()))
+
+    if index_name is not None:
+        return Plan("sort" if sorted_ else "index", index_name)
+    return Plan("unknown")
+
+
+def _explain_sqlite(
+    table: str,
+    columns: IndexColumns,
+    order_by: IndexColumns,
+    condition: str | None,
+    run: Run,
+    placeholder: str,
+) -> Plan:
+    where = " AND ".join(
+        f"{_quote(column)} = {placeholder.format(i=i)}"
+        for i, column in enumerate(columns)
+    )
+    rows = run(
+        f"EXPLAIN QUERY PLAN {_select(table, where, order_by, condition)}",
+        [None] * len(columns),
+    )
+    return parse_sqlite_plan([row[-1] for row in rows], ordered_scan=not columns)
+
+
+_SQLITE_STEP_RE = re.compile(
+    r"^(?P<op>SEARCH|SCAN)(?: TABLE)? \S+(?: AS \S+)?"
+    r"(?: USING (?P<automatic>AUTOMATIC )?(?:PARTIAL )?(?:COVERING )?INDEX"
+    r" (?P<index>\S+)| USING (?:INTEGER )?PRIMARY KEY)?"
+)
+
+
+def parse_sqlite_plan(details: list[str], ordered_scan: bool = False) -> Plan:
+    """
+    Classify EXPLAIN QUERY PLAN detail lines: SEARCH through an index is an
+    index lookup; SCAN, or a transient AUTOMATIC index, reads the whole table.
+    With `ordered_scan` (order-only patterns) a SCAN in index or rowid order
+    is the expected plan. A TEMP B-TREE for ORDER BY means the rows are
+    sorted after they are read.
+    """
+    sorted_ = any(
+        detail.startswith("USE TEMP B-TREE FOR") and "ORDER BY" in detail
+        for detail in details
+    )
+    for detail in details:
+        match = _SQLITE_STEP_RE.match(detail)
+        if match is None:
+            continue
+        if match.group("automatic"):
+            return Plan("seq")
+        index = match.group("index")
+        if match.group("op") == "SCAN" and not (
+            ordered_scan and (index or not sorted_)
+        ):
+            return Plan("seq")
+        return Plan("sort" if sorted_ else "index", index or "PRIMARY KEY")
+    return Plan("unknown")
+
+
+def pattern_key(pattern: QueryPattern) -> str:
+    """
+    Plan cache key: everything the probe query is built from.
+    """
+    key = f"{pattern.table}({','.join(pattern.columns)})"
+    if pattern.order_by:
+        key += f" order_by({','.join(pattern.order_by)})"
+    if pattern.condition is not None:
+        key += f" where({pattern.condition})"
+    return key
+
+
+def schema_hash(dialect: str, indexes: IndexSet) -> str:
+    """
+    Fingerprint of the index catalog plans were computed against; cached
+    plans are discarded as soon as any index changes.
+    """
+    entries = sorted(
+        json.dumps(
+            [record[0], list(record[1]), as_definition(record).to_dict()],
+            sort_keys=True,
+        )
+        for record in indexes
+    )
+    payload = json.dumps([dialect, entries], separators=(",", ":"))
+    return hashlib.sha256(payload.encode()).hexdigest()
+
+
+def load_plan_cache(directory: Path, digest: str) -> dict[str, Plan]:
+    try:
+        data = json.loads((directory / PLAN_CACHE_FILE).read_text())
+    except (OSError, ValueError):
+        return {}
+    if data.get("version") != PLAN_CACHE_VERSION or data.get("schema") != digest:
+        return {}
+    return {key: Plan(**value) for key, value in data.get("plans", {}).items()}
+
+
+def save_plan_cache(directory: Path, digest: str, plans: dict[str, Plan]):
+    directory.mkdir(parents=True, exist_ok=True)
+    path = directory / PLAN_CACHE_FILE
+    tmp = path.with_suffix(f".{os.getpid()}.tmp")
+    tmp.write_text(
+        json.dumps(
+            {
+                "version": PLAN_CACHE_VERSION,
+                "schema": digest,
+                "plans": {key: asdict(plan) for key, plan in sorted(plans.items())},
+            },
+            separators=(",", ":"),
+        )
+    )
+    tmp.replace(path)
@@ -1,21 +1,66 @@
+import asyncio
+import functools
 import importlib
-from typing import TYPE_CHECKING
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, TypeVar
 
 import click
-from sqlalchemy import inspect
 
 from query_patterns.cli.runner.base import BaseRunner
-from query_patterns.cli.runner.types import IndexSet, TableName, PatternSource
+from query_patterns.cli.runner.catalog import (
+    collect_index_sizes_in_bulk,
+    collect_indexes_in_bulk,
+)
+from query_patterns.cli.runner.plans import Plan, explain_pattern
+from query_patterns.tables import (
+    group_tables,
+    qualify_table,
+    split_database,
+    split_schema,
+)
+from query_patterns.cli.runner.types import (
+    IndexDefinition,
+    IndexSet,
+    TableName,
+    PatternSource,
+    CollectorKind,
+    ReportKind,
+    OutputFormat,
+    split_sort_order,
+)
 
 
 if TYPE_CHECKING:
-    from sqlalchemy import MetaData, Engine
+    from sqlalchemy import Connection, MetaData, Engine
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+    from query_patterns.cli.runner.fleet import FleetTarget
+
+T = TypeVar("T")
+
+
+def _is_async_url(url: str) -> bool:
+    """
+    Whether the URL names an async driver (asyncpg, aiosqlite, asyncmy, ...).
+    """
+    from sqlalchemy.engine import make_url
+
+    try:
+        return bool(make_url(url).get_dialect().is_async)
+    except Exception:
+        # Unknown dialects fail later, where the error is reported.
+        return False
 
 
 class SQLAlchemyRunner(BaseRunner):
     source: PatternSource = "schema"
     metadata: str | None
     engine_url: str | None
+    # Schemas read with --source=db besides the default one (and those named
+    # by schema-qualified patterns).
+    schemas: tuple[str, ...] = ()
+    # File with one database URL per line ("URL" or "NAME URL"): fleet mode.
+    engine_url_file: str | None = None
+    _engine: "Engine | None" = None
 
     def __init__(
         self,
@@ -24,12 +69,38 @@ class SQLAlchemyRunner(BaseRunner):
         metadata: str | None,
         engine_url: str | None,
         quiet: bool,
+        collector: CollectorKind = "import",
+        cache: bool = False,
+        jobs: int = 1,
+        db_workers: int = 1,
+        snapshot_file: str | None = None,
+        report: ReportKind = "patterns",
+        since: str | None = None,
+        verify_plans: bool = False,
+        output_format: OutputFormat = "text",
+        schemas: tuple[str, ...] = (),
+        engine_url_file: str | None = None,
+        fleet_workers: int = 8,
+        target_timeout: float | None = 60.0,
     ):
         self.module = module
         self.source = source
         self.metadata = metadata
         self.engine_url = engine_url
         self.quiet = quiet
+        self.collector = collector
+        self.cache = cache
+        self.jobs = jobs
+        self.db_workers = db_workers
+        self.snapshot_file = snapshot_file
+        self.report = report
+        self.since = since
+        self.verify_plans = verify_plans
+        self.output_format = output_format
+        self.schemas = schemas
+        self.engine_url_file = engine_url_file
+        self.fleet_workers = fleet_workers
+        self.target_timeout = target_timeout
 
     def _load_env(self):
         try:
@@ -39,7 +110,7 @@ class SQLAlchemyRunner(BaseRunner):
                 "SQLAlchemy support requires `pip install query-patterns[sqlalchemy]`"
             )
 
-    def _collect_indexes_by_source(self) -> IndexSet:
+    def _collect_indexes_by_source(self, tables: set[str] | None = None) -> IndexSet:
         if self.source == "schema":
             if not self.metadata:
                 raise click.ClickException(
@@ -54,7 +125,7 @@ class SQLAlchemyRunner(BaseRunner):
                     f"Failed to load MetaData: {self.metadata}\n{e}"
                 )
 
-            click.echo("Collecting indexes from SQLAlchemy schema...")
+            self._info("Collecting indexes from SQLAlchemy schema...")
             return self._collect_sqlalchemy_indexes_from_schema(meta)
         else:
             if self.metadata:
@@ -63,34 +134,504 @@ class SQLAlchemyRunner(BaseRunner):
                     err=True,
                 )
 
-            if not self.engine_url:
-                raise click.ClickException("--engine-url is required when --source=db")
+            self._info(f"Collecting indexes from database: {self.engine_url}")
+            tables = self._schema_tables(tables)
+            if self._is_async():
+                from query_patterns.cli.runner.sqlalchemy_async import (
+                    collect_indexes,
+                )
+
+                return self._run_async(
+                    lambda engine: collect_indexes(
+                        engine, self.db_workers, tables, self.schemas
+                    )
+                )
+            return self._collect_sqlalchemy_indexes_from_db(
+                self._get_engine(), self.db_workers, tables, self.schemas
+            )
+
+    @staticmethod
+    def _schema_tables(tables: set[str] | None) -> set[str] | None:
+        """
+        Drop database-qualified tables, which one engine can't read.
+        """
+        if tables is None:
+            return None
+        skipped = {t for t in tables if split_database(t)[0] is not None}
+        if skipped:
+            click.echo(
+                f"[WARN] Database-qualified tables are not read by the "
+                f"sqlalchemy command: {', '.join(sorted(skipped))}",
+                err=True,
+            )
+        return tables - skipped
+
+    def _fleet_option(self) -> str | None:
+        return "--engine-url-file" if self.engine_url_file else None
+
+    def _fleet_targets(self) -> list["FleetTarget"]:
+        from query_patterns.cli.runner.fleet import FleetTarget
+
+        if self.engine_url:
+            raise click.ClickException(
+                "--engine-url and --engine-url-file are mutually exclusive"
+            )
+        if self.source == "snapshot" or self.metadata:
+            click.echo(
+                "[WARN] --engine-url-file reads indexes from the databases; "
+                "--source and --metadata are ignored",
+                err=True,
+            )
+
+        targets = [
+            # Async drivers share one event loop instead of a thread each.
+            FleetTarget(
+                name, acollect=functools.partial(self._acollect_fleet_target, url)
+            )
+            if _is_async_url(url)
+            else FleetTarget(name, functools.partial(self._collect_fleet_target, url))
+            for name, url in self._read_engine_urls(self.engine_url_file)
+        ]
+        if not targets:
+            raise click.ClickException(f"No database URLs in {self.engine_url_file}")
+        return targets
+
+    @staticmethod
+    def _read_engine_urls(path: str) -> list[tuple[str, str]]:
+        """
+        (name, url) per line of an --engine-url-file. Lines are "URL" or
+        "NAME URL"; blank lines and lines starting with # are skipped. An
+        unnamed database is named after its URL without the password.
+        """
+        from sqlalchemy.engine import make_url
+
+        urls = []
+        with open(path, encoding="utf-8") as f:
+            for number, line in enumerate(f, 1):
+                line = line.strip()
+                if not line or line.startswith("#"):
+                    continue
+                name, _, url = line.rpartition(" ")
+                try:
+                    parsed = make_url(url)
+                except Exception:
+                    raise click.ClickException(f"{path}:{number}: invalid database URL")
+                name = name.strip() or parsed.render_as_string(hide_password=True)
+                urls.append((name, url))
+        return urls
+
+    def _collect_fleet_target(self, url: str, tables: set[str] | None) -> IndexSet:
+        """
+        Indexes of one fleet database, read on connections closed afterwards.
+        """
+        from sqlalchemy import create_engine
+        from sqlalchemy.pool import NullPool
+
+        engine = create_engine(url, poolclass=NullPool)
+        try:
+            return self._collect_sqlalchemy_indexes_from_db(
+                engine, self.db_workers, self._schema_tables(tables), self.schemas
+            )
+        finally:
+            engine.dispose()
+
+    async def _acollect_fleet_target(
+        self, url: str, tables: set[str] | None
+    ) -> IndexSet:
+        from sqlalchemy.pool import NullPool
+
+        from query_patterns.cli.runner.sqlalchemy_async import (
+            collect_indexes,
+            with_engine,
+        )
+
+        tables = self._schema_tables(tables)
+        return await with_engine(
+            url,
+            lambda engine: collect_indexes(
+                engine, self.db_workers, tables, self.schemas
+            ),
+            poolclass=NullPool,
+        )
+
+    def _is_async(self) -> bool:
+        return bool(self.engine_url) and _is_async_url(self.engine_url)
+
+    def _engine_kwargs(self) -> dict[str, Any]:
+        engine_kwargs = {}
+        if self.db_workers > 1 and not self.engine_url.startswith("sqlite"):
+            # One pooled connection per introspection worker.
+            engine_kwargs["pool_size"] = self.db_workers
+        return engine_kwargs
+
+    def _get_engine(self) -> "Engine":
+        if self._engine is not None:
+            return self._engine
+
+        if not self.engine_url:
+            raise click.ClickException("--engine-url is required when --source=db")
+
+        from sqlalchemy import create_engine
+
+        self._engine = create_engine(self.engine_url, **self._engine_kwargs())
+        return self._engine
+
+    def _run_async(self, fn: Callable[["AsyncEngine"], Awaitable[T]]) -> T:
+        """
+        Run `fn` with an AsyncEngine for --engine-url on a new event loop.
+        The engine is disposed afterwards: pooled connections can't outlive
+        the loop that opened them.
+        """
+        from query_patterns.cli.runner.sqlalchemy_async import with_engine
+
+        return asyncio.run(with_engine(self.engine_url, fn, **self._engine_kwargs()))
+
+    def _run_on_connections(
+        self, items: list, workers: int, fn: Callable[["Connection", list], T]
+    ) -> list[T]:
+        """
+        Split items into up to `workers` shards and call fn(connection, shard)
+        for each one on its own connection: on threads for sync drivers, on
+        one event loop (through run_sync) for async drivers.
+        """
+        if self._is_async():
+            from query_patterns.cli.runner.sqlalchemy_async import map_connections
+
+            return self._run_async(
+                lambda engine: map_connections(engine, items, workers, fn)
+            )
+
+        engine = self._get_engine()
+
+        def run_shard(shard: list) -> T:
+            with engine.connect() as conn:
+                return fn(conn, shard)
+
+        return self._map_shards(items, workers, run_shard)
+
+    def _dialect_name(self) -> str:
+        from sqlalchemy.engine import make_url
+
+        return make_url(self.engine_url).get_dialect().name
+
+    def _collect_index_sizes(self, tables: set[str] | None = None):
+        if self.source != "db":
+            return {}
+
+        from sqlalchemy import text
+
+        def collect_sizes(conn, targets) -> dict | None:
+            def fetch(sql, params):
+                bind = {f"t{i}": value for i, value in enumerate(params)}
+                return conn.execute(text(sql), bind).fetchall()
+
+            sizes = {}
+            for schema, schema_tables in targets:
+                schema_sizes = collect_index_sizes_in_bulk(
+                    conn.dialect.name,
+                    fetch,
+                    schema_tables,
+                    placeholder=":t{i}",
+                    schema=schema,
+                )
+                if schema_sizes is None:
+                    return None
+                sizes.update(schema_sizes)
+            return sizes
+
+        targets = group_tables(self._schema_tables(tables), split_schema, self.schemas)
+        try:
+            [sizes] = self._run_on_connections(list(targets.items()), 1, collect_sizes)
+        except Exception as e:
+            click.echo(f"[WARN] Index sizes are not available: {e}", err=True)
+            return None
+        return sizes
+
+    def _plan_dialect(self) -> str:
+        if not self.engine_url:
+            raise click.ClickException("--engine-url is required with --verify-plans")
+        return self._dialect_name()
+
+    def _explain_patterns(self, patterns):
+        from sqlalchemy import text
+
+        dialect = self._dialect_name()
+
+        def explain_shard(conn, shard) -> dict:
+            plans = {}
 
-            from sqlalchemy import create_engine
+            def run(sql, params):
+                bind = {f"t{i}": value for i, value in enumerate(params)}
+                result = conn.execute(text(sql), bind)
+                return result.fetchall() if result.returns_rows else []
 
-            engine = create_engine(self.engine_url)
+            for i, pattern in enumerate(shard):
+                try:
+                    plans[pattern] = explain_pattern(
+                        dialect,
+                        pattern.table,
+                        pattern.columns,
+                        run,
+                        placeholder=":t{i}",
+                        name=f"query_patterns_probe_{i}",
+                        order_by=pattern.order_by,
+                        condition=pattern.condition,
+                    )
+                except Exception as e:
+                    click.echo(
+                        f"[WARN] Cannot explain {pattern.describe()}: {e}",
+                        err=True,
+                    )
+                    plans[pattern] = Plan("unknown")
+                finally:
+                    conn.rollback()
+            return plans
 
-            click.echo(f"Collecting indexes from database: {self.engine_url}")
-            return self._collect_sqlalchemy_indexes_from_db(engine)
+        plans = {}
+        for shard_plans in self._run_on_connections(
+            patterns, self.db_workers, explain_shard
+        ):
+            plans.update(shard_plans)
+        return plans
+
+    def _snapshot_metadata(self) -> dict[str, str]:
+        metadata = super()._snapshot_metadata()
+        if self.source == "db" and self.engine_url:
+            from sqlalchemy.engine import make_url
+
+            metadata["dialect"] = make_url(self.engine_url).get_backend_name()
+        return metadata
 
     @staticmethod
     def _collect_sqlalchemy_indexes_from_schema(metadata: "MetaData") -> IndexSet:
+        """
+        Indexes of every MetaData table: Index objects (including those of
+        `Column(index=True)`), the primary key and unique constraints
+        (including `Column(unique=True)`), each recorded with its kind.
+        """
+        from sqlalchemy import PrimaryKeyConstraint, UniqueConstraint
+
         indexes: IndexSet = set()
 
         for table in metadata.tables.values():
+            name = TableName(qualify_table(table.name, table.schema))
             for index in table.indexes:
-                cols = tuple(index.columns.keys())
-                indexes.add((TableName(table.name), cols))
+                indexes.add(_schema_index_definition(name, index))
+            for constraint in table.constraints:
+                columns = tuple(constraint.columns.keys())
+                if not columns:
+                    continue
+                if isinstance(constraint, PrimaryKeyConstraint):
+                    indexes.add(IndexDefinition(name, columns, kind="primary"))
+                elif isinstance(constraint, UniqueConstraint):
+                    indexes.add(
+                        IndexDefinition(name, columns, unique=True, kind="unique")
+                    )
 
         return indexes
 
+    @classmethod
+    def _collect_sqlalchemy_indexes_from_db(
+        cls,
+        engine: "Engine",
+        workers: int = 1,
+        tables: set[str] | None = None,
+        schemas: Iterable[str] = (),
+    ) -> IndexSet:
+        """
+        Read indexes of the default schema, of `schemas` and of the schemas
+        named by schema-qualified `tables`; schemas are read concurrently,
+        sharing the `workers` connection budget.
+        """
+        targets = list(group_tables(tables, split_schema, schemas).items())
+        outer, inner = cls._split_workers(workers, len(targets))
+
+        def collect_targets(shard) -> IndexSet:
+            indexes: IndexSet = set()
+            for schema, schema_tables in shard:
+                indexes |= cls._collect_sqlalchemy_schema_indexes(
+                    engine, inner, schema_tables, schema
+                )
+            return indexes
+
+        indexes: IndexSet = set()
+        for shard_indexes in cls._map_shards(targets, outer, collect_targets):
+            indexes |= shard_indexes
+        return indexes
+
+    @classmethod
+    def _collect_sqlalchemy_schema_indexes(
+        cls,
+        engine: "Engine",
+        workers: int = 1,
+        tables: set[str] | None = None,
+        schema: str | None = None,
+    ) -> IndexSet:
+        with engine.connect() as conn:
+            indexes = cls._bulk_indexes(conn, tables, schema)
+        if indexes is not None:
+            return indexes
+
+        return cls._collect_sqlalchemy_indexes_per_table(
+            engine, workers, tables, schema
+        )
+
+    @classmethod
+    def _collect_sqlalchemy_indexes_per_table(
+        cls,
+        engine: "Engine",
+        workers: int = 1,
+        tables: set[str] | None = None,
+        schema: str | None = None,
+    ) -> IndexSet:
+        def collect_tables(table_names: list[str]) -> IndexSet:
+            with engine.connect() as conn:
+                return cls._inspect_indexes(conn, table_names, schema)
+
+        with engine.connect() as conn:
+            table_names = cls._table_names(conn, tables, schema)
+        return cls._collect_indexes_concurrently(table_names, workers, collect_tables)
+
+    # Connection-level steps, shared with the async backend (run_sync).
+
     @staticmethod
-    def _collect_sqlalchemy_indexes_from_db(engine: "Engine") -> IndexSet:
+    def _bulk_indexes(
+        conn: "Connection", tables: set[str] | None, schema: str | None
+    ) -> IndexSet | None:
+        """
+        Indexes from one catalog query, or None when the dialect has none.
+        """
+        from sqlalchemy import text
+
+        def fetch(sql, params):
+            bind = {f"t{i}": value for i, value in enumerate(params)}
+            return conn.execute(text(sql), bind).fetchall()
+
+        return collect_indexes_in_bulk(
+            conn.dialect.name, fetch, tables, placeholder=":t{i}", schema=schema
+        )
+
+    @staticmethod
+    def _table_names(
+        conn: "Connection", tables: set[str] | None, schema: str | None
+    ) -> list[str]:
+        from sqlalchemy import inspect
+
+        table_names = inspect(conn).get_table_names(schema=schema)
+        if tables is not None:
+            table_names = [t for t in table_names if t in tables]
+        return table_names
+
+    @staticmethod
+    def _inspect_indexes(
+        conn: "Connection", table_names: list[str], schema: str | None
+    ) -> IndexSet:
+        from sqlalchemy import inspect
+
         indexes: IndexSet = set()
-        inspector = inspect(engine)
+        inspector = inspect(conn)
+        for table_name in table_names:
+            name = TableName(qualify_table(table_name, schema))
+            for idx in inspector.get_indexes(table_name, schema=schema):
+                # Reported again by get_unique_constraints() below.
+                if idx.get("duplicates_constraint"):
+                    continue
+                definition = _reflected_index_definition(name, idx)
+                if definition is not None:
+                    indexes.add(definition)
 
-        for table_name in inspector.get_table_names():
-            for idx in inspector.get_indexes(table_name):
-                cols = tuple(idx["column_names"])
-                indexes.add((TableName(table_name), cols))
+            primary = inspector.get_pk_constraint(table_name, schema=schema)
+            if primary.get("constrained_columns"):
+                indexes.add(
+                    IndexDefinition(
+                        name, tuple(primary["constrained_columns"]), kind="primary"
+                    )
+                )
+            for unique in inspector.get_unique_constraints(table_name, schema=schema):
+                indexes.add(
+                    IndexDefinition(
+                        name, tuple(unique["column_names"]), unique=True, kind="unique"
+                    )
+                )
         return indexes
+
+
+def _schema_index_definition(table: TableName, index) -> IndexDefinition:
+    """
+    Definition of a MetaData Index. Expression key parts are compiled to SQL
+    the way CREATE INDEX renders them; `<dialect>_where` and
+    `<dialect>_using` give the predicate and access method.
+    """
+    from sqlalchemy.engine.default import DefaultDialect
+    from sqlalchemy.sql.expression import ColumnClause
+
+    dialect = DefaultDialect()
+    compiler = dialect.ddl_compiler(dialect, None).sql_compiler
+
+    def compile_sql(element) -> str:
+        if isinstance(element, str):
+            return element
+        return compiler.process(element, include_table=False, literal_binds=True)
+
+    columns, orders = [], []
+    for expression in index.expressions:
+        if isinstance(expression, ColumnClause):
+            columns.append(expression.name)
+            orders.append("asc")
+            continue
+        column, order = split_sort_order(compile_sql(expression))
+        columns.append(column)
+        orders.append(order)
+
+    predicate = method = None
+    for key, value in index.dialect_kwargs.items():
+        if value is None:
+            continue
+        if key.endswith("_where"):
+            predicate = compile_sql(value)
+        elif key.endswith("_using"):
+            method = value
+    return IndexDefinition(
+        table,
+        tuple(columns),
+        orders=tuple(orders),
+        predicate=predicate,
+        unique=index.unique,
+        method=method,
+    )
+
+
+def _reflected_index_definition(
+    table: TableName, idx: dict[str, Any]
+) -> IndexDefinition | None:
+    """
+    Definition of an index reported by Inspector.get_indexes(), or None when
+    it has an expression the dialect doesn't report.
+    """
+    expressions = idx.get("expressions") or ()
+    columns = tuple(
+        column if column is not None else (expressions[i] if expressions else None)
+        for i, column in enumerate(idx["column_names"])
+    )
+    if None in columns:
+        return None
+
+    sorting = idx.get("column_sorting") or {}
+    predicate = method = None
+    for key, value in (idx.get("dialect_options") or {}).items():
+        if value is None:
+            continue
+        if key.endswith("_where"):
+            predicate = str(value)
+        elif key.endswith("_using"):
+            method = value
+    return IndexDefinition(
+        table,
+        columns,
+        orders=tuple(
+            "desc" if "desc" in sorting.get(column, ()) else "asc" for column in columns
+        ),
+        predicate=predicate,
+        unique=bool(idx.get("unique")),
+        method=method,
+    )
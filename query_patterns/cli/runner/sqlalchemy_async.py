@@ -0,0 +1,122 @@
+"""
+Index collection through SQLAlchemy's asyncio extension, for async drivers
+(asyncpg, aiosqlite, asyncmy, ...).
+
+Schemas, table shards and fleet databases are read concurrently on one event
+loop instead of one thread each. Each step reuses the synchronous,
+connection-level code of SQLAlchemyRunner through `run_sync`, so both
+backends read exactly the same catalog.
+"""
+
+import asyncio
+from typing import TYPE_CHECKING, Any, Awaitable, Callable, Iterable, TypeVar
+
+import click
+
+from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+from query_patterns.cli.runner.types import IndexSet
+from query_patterns.tables import group_tables, split_schema
+
+if TYPE_CHECKING:
+    from sqlalchemy import Connection
+    from sqlalchemy.ext.asyncio import AsyncEngine
+
+T = TypeVar("T")
+
+
+async def with_engine(
+    url: str, fn: Callable[["AsyncEngine"], Awaitable[T]], **engine_kwargs: Any
+) -> T:
+    """
+    Await fn(engine) with a new AsyncEngine, disposed afterwards.
+    """
+    try:
+        import greenlet  # noqa: F401
+    except ImportError:
+        raise click.ClickException(
+            "Async drivers require `pip install query-patterns[asyncio]`"
+        )
+    from sqlalchemy.ext.asyncio import create_async_engine
+
+    engine = create_async_engine(url, **engine_kwargs)
+    try:
+        return await fn(engine)
+    finally:
+        await engine.dispose()
+
+
+async def map_connections(
+    engine: "AsyncEngine",
+    items: list,
+    workers: int,
+    fn: Callable[["Connection", list], T],
+    slots: asyncio.Semaphore | None = None,
+) -> list[T]:
+    """
+    Split items round-robin into up to `workers` shards and call
+    fn(connection, shard) for each one on its own connection, concurrently.
+    Returns the shard results in shard order. `slots`, when shared by other
+    callers, bounds the connections open across all of them.
+    """
+    if slots is None:
+        slots = asyncio.Semaphore(max(workers, 1))
+    if workers <= 1 or len(items) <= 1:
+        shards = [items]
+    else:
+        shards = [items[i::workers] for i in range(workers)]
+
+    async def run_shard(shard: list) -> T:
+        async with slots, engine.connect() as conn:
+            return await conn.run_sync(fn, shard)
+
+    return list(await asyncio.gather(*(run_shard(shard) for shard in shards)))
+
+
+async def collect_indexes(
+    engine: "AsyncEngine",
+    workers: int = 1,
+    tables: set[str] | None = None,
+    schemas: Iterable[str] = (),
+) -> IndexSet:
+    """
+    Async counterpart of SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db:
+    every schema is read concurrently, with at most `workers` connections
+    open across all of them.
+    """
+    targets = group_tables(tables, split_schema, schemas)
+    slots = asyncio.Semaphore(max(workers, 1))
+    indexes: IndexSet = set()
+    for schema_indexes in await asyncio.gather(
+        *(
+            _collect_schema_indexes(engine, workers, schema_tables, schema, slots)
+            for schema, schema_tables in targets.items()
+        )
+    ):
+        indexes |= schema_indexes
+    return indexes
+
+
+async def _collect_schema_indexes(
+    engine: "AsyncEngine",
+    workers: int,
+    tables: set[str] | None,
+    schema: str | None,
+    slots: asyncio.Semaphore,
+) -> IndexSet:
+    async with slots, engine.connect() as conn:
+        indexes = await conn.run_sync(SQLAlchemyRunner._bulk_indexes, tables, schema)
+        if indexes is not None:
+            return indexes
+        table_names = await conn.run_sync(SQLAlchemyRunner._table_names, tables, schema)
+
+    # No bulk catalog query: inspect tables on up to `workers` connections.
+    indexes = set()
+    for shard_indexes in await map_connections(
+        engine,
+        table_names,
+        workers,
+        lambda conn, shard: SQLAlchemyRunner._inspect_indexes(conn, shard, schema),
+        slots,
+    ):
+        indexes |= shard_indexes
+    return indexes
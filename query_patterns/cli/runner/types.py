@@ -1,7 +1,222 @@
+import re
 from typing import NewType, Literal
 
 TableName = NewType("TableName", str)
 IndexColumns = tuple[str, ...]
 IndexRecord = tuple[TableName, IndexColumns]
 IndexSet = set[IndexRecord]
-PatternSource = Literal["schema", "db"]
+PatternSource = Literal["schema", "db", "snapshot"]
+CollectorKind = Literal["import", "static"]
+ReportKind = Literal["patterns", "unused"]
+OutputFormat = Literal["text", "json", "ndjson", "sarif", "junit"]
+SortOrder = Literal["asc", "desc"]
+# What backs an index: a declared index, a primary key, a unique constraint
+# (or unique column / unique_together), a db_index=True field or the index
+# Django adds to a ForeignKey.
+IndexKind = Literal["index", "primary", "unique", "db-index", "foreign-key"]
+
+
+class IndexDefinition(tuple):
+    """
+    An IndexRecord that also carries what a column list can't express:
+
+    - orders: "asc" / "desc" per key column (None: all ascending)
+    - predicate: WHERE clause of a partial index
+    - unique
+    - method: access method other than B-tree ("hash", "gin", "gist",
+      "brin", ...; None for B-tree)
+    - kind: the structure behind the index (see IndexKind)
+
+    Expression key parts are kept in `columns` as their SQL text (e.g.
+    "lower(email)").
+
+    It unpacks, sorts and hashes like the (table, columns) tuple, and equals
+    it when every property has its default, so code that only needs table
+    and columns is unaffected.
+    """
+
+    def __new__(
+        cls,
+        table: str,
+        columns: IndexColumns,
+        *,
+        orders: tuple[SortOrder, ...] | None = None,
+        predicate: str | None = None,
+        unique: bool = False,
+        method: str | None = None,
+        kind: IndexKind = "index",
+    ):
+        self = super().__new__(cls, (TableName(table), tuple(columns)))
+        if orders is not None and all(order == "asc" for order in orders):
+            orders = None
+        self.orders = tuple(orders) if orders is not None else None
+        self.predicate = predicate or None
+        self.unique = bool(unique)
+        method = method.lower() if method else None
+        self.method = None if method == "btree" else method
+        self.kind = kind
+        if kind == "primary":
+            self.unique = True
+        return self
+
+    @property
+    def table(self) -> TableName:
+        return self[0]
+
+    @property
+    def columns(self) -> IndexColumns:
+        return self[1]
+
+    @property
+    def plain(self) -> bool:
+        """
+        True when the definition is fully described by (table, columns).
+        """
+        return self._properties() == (None, None, False, None, "index")
+
+    @property
+    def btree(self) -> bool:
+        return self.method is None
+
+    def replace(self, **changes) -> "IndexDefinition":
+        """
+        A copy with some fields (table, columns or properties) changed.
+        """
+        fields = {"table": self.table, "columns": self.columns}
+        fields.update(self._fields())
+        fields.update(changes)
+        return IndexDefinition(**fields)
+
+    def with_table(self, table: str) -> "IndexDefinition":
+        """
+        The same index recorded under another (e.g. qualified) table name.
+        """
+        return self.replace(table=table)
+
+    def sort_orders(self) -> tuple[SortOrder, ...]:
+        return self.orders or ("asc",) * len(self.columns)
+
+    def _properties(self) -> tuple:
+        return (self.orders, self.predicate, self.unique, self.method, self.kind)
+
+    def _fields(self) -> dict:
+        return {
+            "orders": self.orders,
+            "predicate": self.predicate,
+            "unique": self.unique,
+            "method": self.method,
+            "kind": self.kind,
+        }
+
+    def __eq__(self, other) -> bool:
+        if not isinstance(other, tuple):
+            return NotImplemented
+        if not tuple.__eq__(self, other):
+            return False
+        if isinstance(other, IndexDefinition):
+            return self._properties() == other._properties()
+        return self.plain
+
+    def __ne__(self, other) -> bool:
+        equal = self.__eq__(other)
+        return equal if equal is NotImplemented else not equal
+
+    __hash__ = tuple.__hash__
+
+    def __getnewargs_ex__(self):
+        return (self.table, self.columns), self._fields()
+
+    def to_dict(self) -> dict:
+        """
+        The non-default properties (columns excluded).
+        """
+        data: dict = {}
+        if self.orders is not None:
+            data["orders"] = list(self.orders)
+        if self.predicate is not None:
+            data["predicate"] = self.predicate
+        if self.unique:
+            data["unique"] = True
+        if self.method is not None:
+            data["method"] = self.method
+        if self.kind != "index":
+            data["kind"] = self.kind
+        return data
+
+    def __repr__(self) -> str:
+        properties = "".join(f", {k}={getattr(self, k)!r}" for k in self.to_dict())
+        return f"IndexDefinition({self.table!r}, {self.columns!r}{properties})"
+
+
+_ORDER_SUFFIX = re.compile(r"^(.*?)\s+(asc|desc)$", re.IGNORECASE | re.DOTALL)
+
+
+def split_sort_order(text: str) -> tuple[str, SortOrder]:
+    """
+    "created_at DESC" -> ("created_at", "desc"); "lower(email)" ->
+    ("lower(email)", "asc")
+    """
+    match = _ORDER_SUFFIX.match(text)
+    if match is None:
+        return text, "asc"
+    return match.group(1), match.group(2).lower()
+
+
+def as_definition(record: IndexRecord) -> IndexDefinition:
+    if isinstance(record, IndexDefinition):
+        return record
+    table, columns = record
+    return IndexDefinition(table, columns)
+
+
+_QUOTES = re.compile(r"[\"`\[\]]")
+_CASTS = re.compile(r"::[\w ]+?(?=[^\w ]|$)")
+_WRAPPED_NAME = re.compile(r"(?<![\w])\(([\w.]+)\)")
+# String literals, with '' as an escaped quote; kept verbatim.
+_LITERAL = re.compile(r"('(?:[^']|'')*')")
+
+
+def normalize_sql(text: str) -> str:
+    """
+    Canonical form of an index expression or predicate, for comparing SQL
+    written by hand with what catalogs report: identifier quotes, casts,
+    whitespace, case and redundant parentheses are dropped outside string
+    literals, e.g. `("Deleted_At" IS NULL)` and `deleted_at is null` are
+    equal but `status = 'A'` and `status = 'a'` are not.
+    """
+    parts = _LITERAL.split(text)
+    # Odd positions are the literals captured by the split.
+    parts[::2] = [_normalize_outside_literals(part) for part in parts[::2]]
+    text = "".join(parts)
+    while text.startswith("(") and text.endswith(")") and _wraps(text):
+        text = text[1:-1]
+    return text
+
+
+def _normalize_outside_literals(text: str) -> str:
+    text = _QUOTES.sub("", text.lower())
+    text = _CASTS.sub("", text)
+    text = "".join(text.split())
+    while True:
+        unwrapped = _WRAPPED_NAME.sub(r"\1", text)
+        if unwrapped == text:
+            return text
+        text = unwrapped
+
+
+def _wraps(text: str) -> bool:
+    # Whether the first parenthesis closes at the very end.
+    depth = 0
+    in_literal = False
+    for i, char in enumerate(text):
+        if char == "'":
+            in_literal = not in_literal
+        elif in_literal:
+            continue
+        elif char == "(":
+            depth += 1
+        elif char == ")":
+            depth -= 1
+            if depth == 0:
+                return i == len(text) - 1
+    return False
@@ -0,0 +1,331 @@
+import importlib
+import importlib.machinery
+import sys
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Iterable
+
+import click
+
+from query_patterns import registry
+from query_patterns.cli.collector.static import StaticCollector, extract_file
+from query_patterns.cli.matcher import IndexMatcher, MatchStatus
+from query_patterns.cli.output import PatternResult, TextWriter
+from query_patterns.cli.runner.base import (
+    EXCLUDE_DIRS,
+    BaseRunner,
+    NoPatternsFound,
+    _display_path,
+    _LazyExtracts,
+)
+from query_patterns.cli.runner.types import IndexColumns
+from query_patterns.cli.watcher import Watcher, open_watcher
+from query_patterns.pattern import QueryPattern
+
+# (pattern, {"module", "qualname", "file", "line"})
+DeclarationRow = tuple[QueryPattern, dict[str, Any]]
+
+
+class WatchSession:
+    """
+    Keeps a runner's environment, indexes and per-module declarations in
+    memory, and re-checks only the modules whose files change.
+
+    Indexes are collected once; restart the session after schema changes.
+    """
+
+    def __init__(self, runner: BaseRunner):
+        self.runner = runner
+        self.cwd = Path.cwd()
+        self.matcher: IndexMatcher | None = None
+        # module -> declarations, in scan order
+        self.declarations: dict[str, list[DeclarationRow]] = {}
+        self.statuses: dict[QueryPattern, tuple[MatchStatus, IndexColumns | None]] = {}
+        # Static re-scans: files are parsed on first use and kept.
+        self.extracts = _LazyExtracts(
+            {
+                module_name: path
+                for path, module_name in runner._iter_source_files(
+                    self.cwd, include_private=True
+                )
+            },
+            extract_file,
+        )
+
+    def run(self, watcher: Watcher | None = None):
+        # Start watching first, so edits made during the first scan are seen.
+        watcher = watcher or open_watcher(self.cwd, EXCLUDE_DIRS)
+        try:
+            self.start()
+            self.runner._info(
+                f"Watching {self.cwd} for changes ({watcher.kind}). "
+                "Press Ctrl+C to stop."
+            )
+            while True:
+                changed = watcher.wait()
+                if changed:
+                    self.apply(changed)
+        except KeyboardInterrupt:
+            pass
+        finally:
+            watcher.close()
+
+    def start(self):
+        """
+        Collect indexes and declarations once and print every result.
+        """
+        runner = self.runner
+        try:
+            runner._collect_patterns()
+        except NoPatternsFound:
+            runner._info("No @query_pattern declarations found yet.")
+        # Patterns may reference new tables later, so every index is kept.
+        self.matcher = IndexMatcher(runner._collect_indexes())
+
+        for pattern, pattern_locations in runner._pattern_locations().items():
+            for location in pattern_locations:
+                self.declarations.setdefault(location["module"], []).append(
+                    (pattern, location)
+                )
+
+        counts, locations = self._aggregate()
+        writer = TextWriter(quiet=runner.quiet)
+        for pattern in counts:
+            self._write(writer, pattern, counts, locations)
+
+    def apply(self, paths: Iterable[Path]) -> int:
+        """
+        Re-scan the modules of changed files and print the patterns whose
+        status changed; returns how many did.
+        """
+        started = time.perf_counter()
+        paths = list(paths)
+        targets: dict[str, Path] = {}
+        for path in paths:
+            module_name = self.runner._module_name(self.cwd, path, include_private=True)
+            if module_name is None:
+                continue
+            targets[module_name] = path
+            self._forget_extract(module_name, path)
+        # Modules that read tables or columns from a changed file are
+        # re-scanned after it, dependencies first.
+        for module_name in list(targets):
+            for importer in self._importers(module_name):
+                targets.setdefault(importer, self.extracts.paths[importer])
+
+        affected: dict[QueryPattern, None] = {}
+        for module_name, path in targets.items():
+            if path.name.startswith("_") or (
+                self.runner.module and module_name not in self.runner.module
+            ):
+                if (
+                    self.runner.collector == "import"
+                    and module_name in sys.modules
+                    and path.exists()
+                ):
+                    # Not scanned, but scanned modules may import from it.
+                    self._reexec(module_name, path)
+                continue
+            rows = self._rescan(module_name, path)
+            if rows is None:
+                continue
+            for pattern, _ in self.declarations.get(module_name, ()):
+                affected[pattern] = None
+            for pattern, _ in rows:
+                affected[pattern] = None
+            if rows:
+                self.declarations[module_name] = rows
+            else:
+                self.declarations.pop(module_name, None)
+
+        counts, locations = self._aggregate()
+        writer = TextWriter(quiet=self.runner.quiet)
+        changes = 0
+        for pattern in affected:
+            if pattern not in counts:
+                if self.statuses.pop(pattern, None) is not None:
+                    changes += 1
+                    if not self.runner.quiet:
+                        key = f"{pattern.table}{pattern.columns}"
+                        click.echo(click.style(f"[REMOVED] {key}", fg="yellow"))
+            elif self._write(writer, pattern, counts, locations):
+                changes += 1
+
+        elapsed = (time.perf_counter() - started) * 1000
+        self.runner._info(
+            f"{len(paths)} file(s) changed, {changes} status change(s) "
+            f"({elapsed:.0f} ms)."
+        )
+        return changes
+
+    def _write(
+        self,
+        writer: TextWriter,
+        pattern: QueryPattern,
+        counts: dict[QueryPattern, int],
+        locations: dict[QueryPattern, list[dict[str, Any]]],
+    ) -> bool:
+        """
+        Match a pattern and write its result if its status is new or changed.
+        """
+        status = self.matcher.match(
+            pattern.table, pattern.columns, pattern.order_by, pattern.condition
+        )
+        if self.statuses.get(pattern) == status:
+            return False
+        self.statuses[pattern] = status
+        writer.write(
+            PatternResult(
+                status=status[0],
+                pattern=pattern,
+                usage=counts[pattern],
+                index=status[1],
+                locations=tuple(locations[pattern]),
+            )
+        )
+        return True
+
+    def _aggregate(
+        self,
+    ) -> tuple[
+        OrderedDict[QueryPattern, int], dict[QueryPattern, list[dict[str, Any]]]
+    ]:
+        counts: OrderedDict[QueryPattern, int] = OrderedDict()
+        locations: dict[QueryPattern, list[dict[str, Any]]] = {}
+        for rows in self.declarations.values():
+            for pattern, location in rows:
+                counts[pattern] = counts.get(pattern, 0) + 1
+                locations.setdefault(pattern, []).append(location)
+        return counts, locations
+
+    def _rescan(self, module_name: str, path: Path) -> list[DeclarationRow] | None:
+        """
+        Declarations of one module after its file changed, or None to keep the
+        previous ones (the module failed to import).
+        """
+        if self.runner.collector == "static":
+            return self._rescan_statically(module_name, path)
+        return self._reimport(module_name, path)
+
+    def _importers(self, module_name: str) -> list[str]:
+        """
+        Declaring modules that import `module_name`, directly or through
+        other project modules, together with those intermediate modules;
+        every module comes after the modules it imports from.
+        """
+        importers: dict[str, None] = {}
+        for name in list(self.declarations):
+            chain = self._import_chain(name, module_name)
+            if chain:
+                importers.update((module, None) for module in reversed(chain))
+        importers.pop(module_name, None)
+        return list(importers)
+
+    def _import_chain(self, name: str, target: str) -> list[str] | None:
+        """
+        Project modules from `name` to the one importing `target` directly,
+        or None when `name` does not depend on `target`.
+        """
+        parents: dict[str, str | None] = {name: None}
+        queue = [name]
+        for current in queue:
+            if current not in self.extracts:
+                continue
+            imports = self.extracts[current].imports.values()
+            if any(
+                _imports_module(module, symbol, target) for module, symbol in imports
+            ):
+                chain = [current]
+                while parents[chain[-1]] is not None:
+                    chain.append(parents[chain[-1]])
+                return chain[::-1]
+            for module, symbol in imports:
+                for candidate in (module, f"{module}.{symbol}"):
+                    if candidate not in parents:
+                        parents[candidate] = current
+                        queue.append(candidate)
+        return None
+
+    def _forget_extract(self, module_name: str, path: Path):
+        self.extracts.loaded.pop(module_name, None)
+        if path.exists():
+            self.extracts.paths[module_name] = path
+        else:
+            self.extracts.paths.pop(module_name, None)
+
+    def _rescan_statically(self, module_name: str, path: Path) -> list[DeclarationRow]:
+        # A file that no longer parses declares nothing until it is fixed.
+        if not path.exists():
+            return []
+        collector = StaticCollector(self.extracts)
+        patterns, _ = collector.collect([module_name])
+        for error in collector.errors:
+            click.echo(f"[WARN] {error}", err=True)
+        file = _display_path(str(path), self.cwd)
+        return [
+            (pattern, {**location, "file": file})
+            for pattern in patterns
+            for location in collector.locations[pattern]
+        ]
+
+    def _reexec(self, module_name: str, path: Path) -> bool:
+        """
+        Import a module, or re-execute it in place (like importlib.reload())
+        from its current source. Returns False when it fails.
+        """
+        try:
+            module = sys.modules.get(module_name)
+            importlib.invalidate_caches()
+            if module is None:
+                importlib.import_module(module_name)
+            else:
+                _SourceLoader(module_name, str(path)).exec_module(module)
+        except Exception as e:
+            click.echo(f"[WARN] Failed to import {module_name}: {e}", err=True)
+            return False
+        return True
+
+    def _reimport(self, module_name: str, path: Path) -> list[DeclarationRow] | None:
+        registry.registry.discard_module(module_name)
+        if not path.exists():
+            sys.modules.pop(module_name, None)
+            return []
+
+        if not self._reexec(module_name, path):
+            return None
+
+        file = _display_path(str(path), self.cwd)
+        return [
+            (
+                pattern,
+                {
+                    "module": module_name,
+                    "qualname": declaration.qualname,
+                    "file": file,
+                    "line": declaration.line,
+                },
+            )
+            for pattern, declaration in registry.registry.iter_declarations(
+                [module_name]
+            )
+        ]
+
+
+def _imports_module(module: str, symbol: str | None, target: str) -> bool:
+    # `import pkg` may reach any submodule; `from pkg import x` reaches pkg
+    # and pkg.x.
+    if symbol is None:
+        return target == module or target.startswith(f"{module}.")
+    return target in (module, f"{module}.{symbol}")
+
+
+class _SourceLoader(importlib.machinery.SourceFileLoader):
+    """
+    Compiles the current source, without reading or writing __pycache__: the
+    cached bytecode is keyed on the source mtime in seconds and size, so a
+    quick edit that keeps the size would otherwise load stale code.
+    """
+
+    def get_code(self, fullname):
+        return self.source_to_code(self.get_data(self.path), self.path)
@@ -0,0 +1,130 @@
+import json
+from datetime import datetime, timezone
+from pathlib import Path
+from typing import get_args
+
+from query_patterns.cli.runner.types import (
+    IndexDefinition,
+    IndexKind,
+    IndexRecord,
+    IndexSet,
+    SortOrder,
+    TableName,
+    as_definition,
+)
+
+
+SNAPSHOT_FORMAT = "query-patterns-snapshot"
+# 2: an index is a column list, or {"columns": [...], ...} when it has
+# properties (orders, predicate, unique, method). Version 1 is still read.
+SNAPSHOT_VERSION = 2
+READABLE_VERSIONS = (1, 2)
+# Keys of an index object besides "columns".
+INDEX_PROPERTIES = frozenset({"orders", "predicate", "unique", "method", "kind"})
+
+
+class SnapshotError(ValueError):
+    pass
+
+
+def dump_snapshot(
+    indexes: IndexSet, path: Path, metadata: dict[str, str] | None = None
+) -> None:
+    """
+    Write an IndexSet as a compact, versioned JSON document.
+
+    Indexes are grouped by table and sorted, so snapshots of the same catalog
+    are byte-identical and diff cleanly.
+    """
+    tables: dict[str, list] = {}
+    for record in sorted(indexes, key=lambda r: (r, repr(r))):
+        table, columns = record
+        properties = as_definition(record).to_dict()
+        if properties:
+            tables.setdefault(table, []).append(
+                {"columns": list(columns), **properties}
+            )
+        else:
+            tables.setdefault(table, []).append(list(columns))
+
+    document = {
+        "format": SNAPSHOT_FORMAT,
+        "version": SNAPSHOT_VERSION,
+        "metadata": {
+            "created_at": datetime.now(timezone.utc).isoformat(timespec="seconds"),
+            **(metadata or {}),
+        },
+        "tables": tables,
+    }
+    path.write_text(json.dumps(document, separators=(",", ":")) + "\n")
+
+
+def load_snapshot(path: Path) -> IndexSet:
+    try:
+        document = json.loads(path.read_text())
+    except OSError as e:
+        raise SnapshotError(f"Cannot read snapshot {path}: {e}") from e
+    except ValueError as e:
+        raise SnapshotError(f"Invalid snapshot {path}: {e}") from e
+
+    if not isinstance(document, dict) or document.get("format") != SNAPSHOT_FORMAT:
+        raise SnapshotError(f"{path} is not a query-patterns snapshot")
+    if document.get("version") not in READABLE_VERSIONS:
+        raise SnapshotError(
+            f"Unsupported snapshot version {document.get('version')!r} in {path} "
+            f"(expected {SNAPSHOT_VERSION})"
+        )
+
+    tables = document.get("tables")
+    if not isinstance(tables, dict):
+        raise SnapshotError(f"Invalid snapshot {path}: 'tables' must be an object")
+
+    indexes: IndexSet = set()
+    for table, entries in tables.items():
+        if not isinstance(entries, list):
+            raise SnapshotError(
+                f"Invalid snapshot {path}: indexes of {table!r} must be a list"
+            )
+        for entry in entries:
+            indexes.add(_load_index(path, table, entry))
+    return indexes
+
+
+def _load_index(path: Path, table: str, entry) -> IndexRecord:
+    def invalid(reason: str) -> SnapshotError:
+        return SnapshotError(
+            f"Invalid snapshot {path}: index {entry!r} on {table}: {reason}"
+        )
+
+    if isinstance(entry, list):
+        if not _is_str_list(entry):
+            raise invalid("columns must be strings")
+        return (TableName(table), tuple(entry))
+    if not isinstance(entry, dict):
+        raise invalid("expected a column list or an object")
+
+    unknown = sorted(set(entry) - INDEX_PROPERTIES - {"columns"})
+    if unknown:
+        raise invalid(f"unknown key(s) {', '.join(unknown)}")
+    if not _is_str_list(entry.get("columns")):
+        raise invalid("'columns' must be a list of strings")
+    properties = {k: v for k, v in entry.items() if k != "columns"}
+    orders = properties.get("orders")
+    if orders is not None:
+        if not _is_str_list(orders) or not set(orders) <= set(get_args(SortOrder)):
+            raise invalid("'orders' must be a list of 'asc' / 'desc'")
+        if len(orders) != len(entry["columns"]):
+            raise invalid("'orders' must have one entry per column")
+        properties["orders"] = tuple(orders)
+    for key in ("predicate", "method"):
+        if not isinstance(properties.get(key), (str, type(None))):
+            raise invalid(f"'{key}' must be a string or null")
+    if not isinstance(properties.get("unique", False), bool):
+        raise invalid("'unique' must be true or false")
+    if properties.get("kind", "index") not in get_args(IndexKind):
+        raise invalid(f"'kind' must be one of {', '.join(get_args(IndexKind))}")
+    return IndexDefinition(table, entry["columns"], **properties)
+
+
+def _is_str_list(value) -> bool:
+    return isinstance(value, list) and all(isinstance(item, str) for item in value)
@@ -0,0 +1,211 @@
+"""
+File watchers for `--watch`: inotify through ctypes on Linux, mtime polling
+everywhere else.
+"""
+
+import ctypes
+import ctypes.util
+import os
+import select
+import struct
+import sys
+import time
+from pathlib import Path
+from typing import Iterable
+
+# Changes arriving within this many seconds of each other are reported together
+# (editors often write a file in several steps).
+DEBOUNCE = 0.05
+POLL_INTERVAL = 0.5
+
+IN_CLOSE_WRITE = 0x00000008
+IN_MOVED_FROM = 0x00000040
+IN_MOVED_TO = 0x00000080
+IN_CREATE = 0x00000100
+IN_DELETE = 0x00000200
+IN_Q_OVERFLOW = 0x00004000
+IN_IGNORED = 0x00008000
+IN_ISDIR = 0x40000000
+IN_NONBLOCK = os.O_NONBLOCK
+IN_CLOEXEC = 0o2000000
+
+WATCH_MASK = IN_CLOSE_WRITE | IN_MOVED_FROM | IN_MOVED_TO | IN_CREATE | IN_DELETE
+EVENT_HEADER = struct.Struct("iIII")
+
+
+class Watcher:
+    """
+    Reports .py files created, modified or deleted under a root directory.
+    """
+
+    kind = ""
+
+    def __init__(self, root: Path, exclude: Iterable[str] = ()):
+        self.root = root
+        self.exclude = set(exclude)
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        """
+        Block until files change (or `timeout` seconds pass) and return the
+        changed paths; an empty set means nothing changed.
+        """
+        raise NotImplementedError
+
+    def close(self):
+        pass
+
+    def _excluded(self, path: Path) -> bool:
+        return any(part in self.exclude for part in path.relative_to(self.root).parts)
+
+    def _iter_files(self):
+        for path in self.root.rglob("*.py"):
+            if not self._excluded(path):
+                yield path
+
+
+class PollingWatcher(Watcher):
+    kind = "polling"
+
+    def __init__(
+        self,
+        root: Path,
+        exclude: Iterable[str] = (),
+        interval: float = POLL_INTERVAL,
+    ):
+        super().__init__(root, exclude)
+        self.interval = interval
+        self.stats = self._scan()
+
+    def _scan(self) -> dict[Path, tuple[int, int]]:
+        stats = {}
+        for path in self._iter_files():
+            try:
+                st = path.stat()
+            except OSError:
+                continue
+            stats[path] = (st.st_mtime_ns, st.st_size)
+        return stats
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        deadline = None if timeout is None else time.monotonic() + timeout
+        while True:
+            stats = self._scan()
+            changed = {
+                path
+                for path in stats.keys() | self.stats.keys()
+                if stats.get(path) != self.stats.get(path)
+            }
+            self.stats = stats
+            if changed:
+                return changed
+            if deadline is not None:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    return set()
+                time.sleep(min(self.interval, remaining))
+            else:
+                time.sleep(self.interval)
+
+
+class InotifyWatcher(Watcher):
+    """
+    One inotify watch per directory; directories created later are watched
+    as they appear.
+    """
+
+    kind = "inotify"
+
+    def __init__(self, root: Path, exclude: Iterable[str] = ()):
+        super().__init__(root, exclude)
+        libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._add_watch = libc.inotify_add_watch
+        self._add_watch.argtypes = [ctypes.c_int, ctypes.c_char_p, ctypes.c_uint32]
+        self.fd = libc.inotify_init1(IN_NONBLOCK | IN_CLOEXEC)
+        if self.fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self.dirs: dict[int, Path] = {}
+        self._watch_tree(root)
+
+    def _watch_tree(self, root: Path) -> list[Path]:
+        """
+        Watch root and its subdirectories; returns the .py files already in
+        them (relevant for directories created while watching).
+        """
+        files = []
+        for dirpath, dirnames, filenames in os.walk(root):
+            dirnames[:] = [d for d in dirnames if d not in self.exclude]
+            wd = self._add_watch(self.fd, os.fsencode(dirpath), WATCH_MASK)
+            if wd < 0:
+                # The directory vanished, or the watch limit was reached.
+                continue
+            self.dirs[wd] = Path(dirpath)
+            files.extend(Path(dirpath, f) for f in filenames if f.endswith(".py"))
+        return files
+
+    def _read_events(self, timeout: float | None) -> set[Path] | None:
+        """
+        Changed paths from one batch of events, or None on queue overflow.
+        """
+        ready, _, _ = select.select([self.fd], [], [], timeout)
+        if not ready:
+            return set()
+        try:
+            data = os.read(self.fd, 64 * 1024)
+        except BlockingIOError:
+            return set()
+
+        changed: set[Path] = set()
+        offset = 0
+        while offset < len(data):
+            wd, mask, _, length = EVENT_HEADER.unpack_from(data, offset)
+            offset += EVENT_HEADER.size
+            name = os.fsdecode(data[offset : offset + length].rstrip(b"\0"))
+            offset += length
+
+            if mask & IN_Q_OVERFLOW:
+                return None
+            if mask & IN_IGNORED:
+                self.dirs.pop(wd, None)
+                continue
+            directory = self.dirs.get(wd)
+            if directory is None:
+                continue
+            path = directory / name
+            if mask & IN_ISDIR:
+                if mask & (IN_CREATE | IN_MOVED_TO) and name not in self.exclude:
+                    changed.update(self._watch_tree(path))
+            elif name.endswith(".py"):
+                changed.add(path)
+        return changed
+
+    def wait(self, timeout: float | None = None) -> set[Path]:
+        changed = self._read_events(timeout)
+        # Keep reading until the burst of events is over.
+        while changed:
+            more = self._read_events(DEBOUNCE)
+            if not more:
+                changed = changed if more is not None else None
+                break
+            changed |= more
+        if changed is None:
+            return self._overflow()
+        return changed
+
+    def _overflow(self) -> set[Path]:
+        # Events were dropped: report every file so nothing is missed.
+        return set(self._iter_files())
+
+    def close(self):
+        os.close(self.fd)
+
+
+def open_watcher(root: Path, exclude: Iterable[str] = ()) -> Watcher:
+    """
+    inotify where available, otherwise polling.
+    """
+    if sys.platform.startswith("linux"):
+        try:
+            return InotifyWatcher(root, exclude)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatcher(root, exclude)
@@ -1,16 +1,54 @@
 from typing import Iterable
 
+from query_patterns import registry, runtime
 from query_patterns.pattern import QueryPattern
-from query_patterns.types import TableLike, ColumnLike
+from query_patterns.tables import qualify_table
+from query_patterns.types import TableLike, ColumnLike, OrderLike
 
 
-def query_pattern(*, table: TableLike, columns: Iterable[ColumnLike]):
+def _noop(fn):
+    return fn
+
+
+def query_pattern(
+    *,
+    table: TableLike,
+    columns: Iterable[ColumnLike],
+    order_by: Iterable[OrderLike] = (),
+    condition: str | None = None,
+    database: str | None = None,
+):
+    """
+    Declare that the decorated function queries `table` filtering on
+    `columns` (equality lookups).
+
+    `order_by` lists the columns the query sorts on ("-column" for
+    descending), to check that an index returns rows already in that order
+    (e.g. `ORDER BY created_at DESC LIMIT 20`); `columns` may then be empty.
+    `condition` is SQL the query always filters on, which lets a partial
+    index with the same predicate serve the pattern. `database` names the
+    connection (e.g. a Django DATABASES alias) when it isn't the default one.
+    """
+    if not registry.is_enabled():
+        return _noop
+
     if table is None or table == "":
         raise ValueError("table must not be empty")
-    if columns is None or not columns:
+    columns = tuple(columns) if columns is not None else ()
+    order_by = tuple(order_by) if order_by is not None else ()
+    if not columns and not order_by:
         raise ValueError("columns must not be empty")
 
-    pattern = QueryPattern(table=table, columns=tuple(columns))
+    pattern = QueryPattern(
+        table=table, columns=columns, order_by=order_by, condition=condition
+    )
+    if database:
+        pattern = QueryPattern(
+            table=qualify_table(pattern.table, database=database),
+            columns=pattern.columns,
+            order_by=pattern.order_by,
+            condition=pattern.condition,
+        )
 
     def decorator(fn):
         patterns = getattr(fn, "__query_patterns__", None)
@@ -18,8 +56,23 @@ def query_pattern(*, table: TableLike, columns: Iterable[ColumnLike]):
             patterns = []
             setattr(fn, "__query_patterns__", patterns)
 
-        if pattern not in patterns:
+        # A new declaration can't be on fn yet; only a repeated one (stacked
+        # duplicates, or a function redefined under the same name) needs the
+        # list check.
+        # File and line come from the code object: no stack inspection.
+        code = getattr(getattr(fn, "__func__", fn), "__code__", None)
+        new = registry.registry.register(
+            pattern,
+            getattr(fn, "__module__", None) or "",
+            getattr(fn, "__qualname__", None) or repr(fn),
+            code.co_filename if code is not None else "",
+            code.co_firstlineno if code is not None else 0,
+        )
+        if new or pattern not in patterns:
             patterns.append(pattern)
+
+        if runtime.capture_enabled():
+            return runtime.wrap(fn)
         return fn
 
     return decorator
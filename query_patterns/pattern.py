@@ -1,57 +1,217 @@
-from dataclasses import dataclass
-from typing import Tuple
+from dataclasses import FrozenInstanceError
+from typing import Any, Callable, Iterable
 
-from query_patterns.types import TableLike, ColumnLike
+from query_patterns.tables import qualify_table
+from query_patterns.types import TableLike, ColumnLike, OrderLike
 
 
-@dataclass(frozen=True)
 class QueryPattern:
+    """
+    An immutable (table, columns) pair, optionally with the ORDER BY the
+    query needs served by the index (`order_by`, "-column" for descending)
+    and the WHERE condition it always filters on (`condition`, SQL text,
+    matched against partial index predicates).
+
+    Instances are interned: constructing the same pattern twice returns the
+    same object, so equal patterns share memory and usually compare by
+    identity. The hash is computed once.
+    """
+
+    __slots__ = ("table", "columns", "order_by", "condition", "_hash")
+
     table: str
-    columns: tuple[str]
+    columns: tuple[str, ...]
+    order_by: tuple[str, ...]
+    condition: str | None
+
+    def __new__(
+        cls,
+        table: TableLike,
+        columns: Iterable[ColumnLike],
+        order_by: Iterable[OrderLike] = (),
+        condition: str | None = None,
+    ):
+        table_name = _resolve(_TABLE_RESOLVERS, _probe_table, table)
+        column_names = tuple(
+            _resolve(_COLUMN_RESOLVERS, _probe_column, column) for column in columns
+        )
+        order_names = tuple(_order_name(item) for item in order_by)
+        condition = condition or None
+
+        # Plain patterns keep the (table, columns) key and hash.
+        if order_names or condition is not None:
+            key = (table_name, column_names, order_names, condition)
+        else:
+            key = (table_name, column_names)
+        pattern = _INTERNED.get(key)
+        if pattern is not None:
+            return pattern
+
+        pattern = object.__new__(cls)
+        object.__setattr__(pattern, "table", table_name)
+        object.__setattr__(pattern, "columns", column_names)
+        object.__setattr__(pattern, "order_by", order_names)
+        object.__setattr__(pattern, "condition", condition)
+        object.__setattr__(pattern, "_hash", hash(key))
+        # setdefault: if two threads race, both get the same instance.
+        return _INTERNED.setdefault(key, pattern)
+
+    def __setattr__(self, name, value):
+        raise FrozenInstanceError(f"cannot assign to field {name!r}")
+
+    def __delattr__(self, name):
+        raise FrozenInstanceError(f"cannot delete field {name!r}")
+
+    def __hash__(self) -> int:
+        return self._hash
+
+    def __eq__(self, other) -> bool:
+        if self is other:
+            return True
+        if not isinstance(other, QueryPattern):
+            return NotImplemented
+        return (
+            self.table == other.table
+            and self.columns == other.columns
+            and self.order_by == other.order_by
+            and self.condition == other.condition
+        )
+
+    def __repr__(self) -> str:
+        extra = ""
+        if self.order_by:
+            extra += f", order_by={self.order_by!r}"
+        if self.condition is not None:
+            extra += f", condition={self.condition!r}"
+        return f"QueryPattern(table={self.table!r}, columns={self.columns!r}{extra})"
+
+    def __reduce__(self):
+        # Unpickling goes through __new__ and is interned again.
+        return QueryPattern, (self.table, self.columns, self.order_by, self.condition)
+
+    def describe(self) -> str:
+        """
+        `table('col', ...)`, followed by the order and condition when set.
+        """
+        text = f"{self.table}{self.columns}"
+        if self.order_by:
+            text += f" order_by({', '.join(self.order_by)})"
+        if self.condition is not None:
+            text += f" where({self.condition})"
+        return text
+
+
+_INTERNED: dict[tuple, QueryPattern] = {}
+
+
+def _identity(value: str) -> str:
+    return value
+
+
+def _sqlalchemy_orm_table(table) -> str:
+    core_table = getattr(table, "__table__", None)
+    if core_table is not None:
+        return _sqlalchemy_core_table(core_table)
+    return table.__tablename__
+
+
+def _sqlalchemy_core_table(table) -> str:
+    # "schema.name" for tables outside the default schema
+    return qualify_table(table.name, table.schema)
+
+
+def _django_model_table(table) -> str:
+    return table._meta.db_table
+
+
+def _probe_table(table: TableLike) -> Callable[[Any], str]:
+    # SQLAlchemy ORM
+    if hasattr(table, "__tablename__"):
+        return _sqlalchemy_orm_table
+
+    # SQLAlchemy Core Table
+    if hasattr(table, "name") and hasattr(table, "columns"):
+        return _sqlalchemy_core_table
+
+    # Django Model
+    if hasattr(table, "_meta") and hasattr(table._meta, "db_table"):
+        return _django_model_table
+
+    # String
+    if isinstance(table, str):
+        return _identity
+
+    raise TypeError(f"Unsupported table type: {type(table)!r}")
+
+
+def _column_key(column) -> str:
+    return column.key
+
+
+def _column_name(column) -> str:
+    return column.name
+
+
+def _probe_column(column: ColumnLike) -> Callable[[Any], str]:
+    if isinstance(column, str):
+        return _identity
+
+    # SQLAlchemy ORM attribute
+    if hasattr(column, "key"):
+        return _column_key
 
-    def __init__(self, table: TableLike, columns: tuple[ColumnLike, ...]):
-        object.__setattr__(self, "table", self._extract_table_name(table))
-        object.__setattr__(self, "columns", self._extract_column_names(columns))
+    # SQLAlchemy Core Column (Table.c.id) or Django Field
+    if hasattr(column, "name"):
+        return _column_name
 
-    @staticmethod
-    def _extract_table_name(table: TableLike) -> str:
-        # SQLAlchemy ORM
-        if hasattr(table, "__tablename__"):
-            return table.__tablename__
+    raise TypeError(f"Unsupported column type: {type(column)!r}")
 
-        # SQLAlchemy Core Table
-        if hasattr(table, "name") and hasattr(table, "columns"):
-            return table.name
 
-        # Django Model
-        if hasattr(table, "_meta") and hasattr(table._meta, "db_table"):
-            return table._meta.db_table
+def _order_name(item: OrderLike) -> str:
+    """
+    "column" or "-column" (descending) for an ORDER BY item: a string, a
+    column, SQLAlchemy `column.desc()` / `.asc()` or Django
+    `F("column").desc()`.
+    """
+    if isinstance(item, str):
+        return item
 
-        # String
-        if isinstance(table, str):
-            return table
+    # Django OrderBy: F("created_at").desc()
+    if hasattr(item, "descending") and hasattr(item, "expression"):
+        name = _order_name(item.expression)
+        return f"-{name}" if item.descending else name
 
-        raise TypeError(f"Unsupported table type: {type(table)!r}")
+    # SQLAlchemy UnaryExpression: User.created_at.desc()
+    modifier = getattr(item, "modifier", None)
+    element = getattr(item, "element", None)
+    if modifier is not None and element is not None:
+        name = _order_name(element)
+        return f"-{name}" if getattr(modifier, "__name__", "") == "desc_op" else name
 
-    @staticmethod
-    def _extract_column_names(columns: Tuple[ColumnLike, ...]) -> tuple[str, ...]:
-        result = []
+    return _resolve(_COLUMN_RESOLVERS, _probe_column, item)
 
-        for col in columns:
-            if isinstance(col, str):
-                result.append(col)
-                continue
 
-            # SQLAlchemy ORM attribute
-            if hasattr(col, "key"):
-                result.append(col.key)
-                continue
+# type -> resolver, filled by the first probe of each type.
+_TABLE_RESOLVERS: dict[type, Callable[[Any], str]] = {str: _identity}
+_COLUMN_RESOLVERS: dict[type, Callable[[Any], str]] = {str: _identity}
 
-            # SQLAlchemy Core Column (Table.c.id) or Django Field
-            if hasattr(col, "name"):
-                result.append(col.name)
-                continue
 
-            raise TypeError(f"Unsupported column type: {type(col)!r}")
+def _resolve(
+    resolvers: dict[type, Callable[[Any], str]],
+    probe: Callable[[Any], Callable[[Any], str]],
+    value: Any,
+) -> str:
+    """
+    Resolve a name with the resolver cached for type(value).
 
-        return tuple(result)
+    Instances of one type normally share their attributes (ORM classes share a
+    metaclass, columns share a class); when one doesn't, it is probed again
+    without touching the cache.
+    """
+    resolver = resolvers.get(type(value))
+    if resolver is None:
+        resolver = resolvers.setdefault(type(value), probe(value))
+    try:
+        return resolver(value)
+    except AttributeError:
+        return probe(value)(value)
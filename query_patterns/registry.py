@@ -0,0 +1,133 @@
+"""
+Process-wide registry of @query_pattern declarations.
+
+Every decoration appends one compact record here, so collecting patterns is a
+scan over a list rather than a walk over every module's functions and classes.
+Set QUERY_PATTERNS_DISABLED=1 (or call set_enabled(False) before the modules
+are imported) to turn @query_pattern into a no-op.
+"""
+
+import os
+import sys
+from typing import Iterable, Iterator
+
+from query_patterns.pattern import QueryPattern
+
+
+class Declaration:
+    """
+    Where a pattern was declared. Module and file names are interned, so the
+    many declarations of one module share a single copy of each string.
+    """
+
+    __slots__ = ("pattern_id", "module", "qualname", "file", "line")
+
+    def __init__(
+        self,
+        pattern_id: int,
+        module: str,
+        qualname: str,
+        file: str = "",
+        line: int = 0,
+    ):
+        self.pattern_id = pattern_id
+        self.module = sys.intern(module)
+        self.qualname = qualname
+        self.file = sys.intern(file)
+        self.line = line
+
+    def __repr__(self):
+        return (
+            f"Declaration(pattern_id={self.pattern_id!r}, module={self.module!r}, "
+            f"qualname={self.qualname!r}, file={self.file!r}, line={self.line!r})"
+        )
+
+
+class PatternRegistry:
+    """
+    Interned patterns plus one Declaration per (pattern, module, qualname).
+
+    Pattern ids are positions in `patterns` and never change, so they can be
+    shared with other processes as plain integers.
+    """
+
+    def __init__(self):
+        self.patterns: list[QueryPattern] = []
+        # module name -> declarations in registration order
+        self.by_module: dict[str, list[Declaration]] = {}
+        self._ids: dict[QueryPattern, int] = {}
+        self._declared: set[tuple[int, str, str]] = set()
+
+    def intern(self, pattern: QueryPattern) -> int:
+        pattern_id = self._ids.get(pattern)
+        if pattern_id is None:
+            pattern_id = len(self.patterns)
+            self.patterns.append(pattern)
+            self._ids[pattern] = pattern_id
+        return pattern_id
+
+    def register(
+        self,
+        pattern: QueryPattern,
+        module: str,
+        qualname: str,
+        file: str = "",
+        line: int = 0,
+    ) -> bool:
+        """
+        Record a declaration; returns False when it was already registered.
+        """
+        pattern_id = self.intern(pattern)
+        key = (pattern_id, module, qualname)
+        if key in self._declared:
+            return False
+        self._declared.add(key)
+        declaration = Declaration(pattern_id, module, qualname, file, line)
+        self.by_module.setdefault(module, []).append(declaration)
+        return True
+
+    def has_module(self, module: str) -> bool:
+        return module in self.by_module
+
+    def iter_declarations(
+        self, modules: Iterable[str] | None = None
+    ) -> Iterator[tuple[QueryPattern, Declaration]]:
+        """
+        Yield (pattern, declaration) per module in registration order, for
+        every module or only for `modules` (in the given order).
+        """
+        names = self.by_module.keys() if modules is None else modules
+        for name in names:
+            for declaration in self.by_module.get(name, ()):
+                yield self.patterns[declaration.pattern_id], declaration
+
+    def discard_module(self, module: str):
+        """
+        Forget declarations made in a module, e.g. before reloading it.
+        """
+        for declaration in self.by_module.pop(module, ()):
+            self._declared.discard(
+                (declaration.pattern_id, declaration.module, declaration.qualname)
+            )
+
+    def clear(self):
+        self.patterns.clear()
+        self.by_module.clear()
+        self._ids.clear()
+        self._declared.clear()
+
+
+registry = PatternRegistry()
+_enabled = os.environ.get("QUERY_PATTERNS_DISABLED", "").lower() in ("", "0", "false")
+
+
+def set_enabled(enabled: bool):
+    """
+    Turn @query_pattern on or off for modules decorated from now on.
+    """
+    global _enabled
+    _enabled = enabled
+
+
+def is_enabled() -> bool:
+    return _enabled
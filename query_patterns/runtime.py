@@ -0,0 +1,372 @@
+"""
+Opt-in runtime capture of the SQL executed by @query_pattern functions.
+
+Capture must be enabled before the modules declaring patterns are imported
+(call enable_capture() early, or set QUERY_PATTERNS_CAPTURE=<sample rate>).
+Functions decorated while capture is disabled are left untouched, so there is
+no overhead at all unless it is turned on.
+"""
+
+import functools
+import contextvars
+import inspect
+import os
+import random
+import re
+import threading
+import warnings
+from dataclasses import dataclass
+from typing import Any, Callable, Iterable
+
+from query_patterns.pattern import QueryPattern
+from query_patterns.tables import split_database, split_schema
+
+
+DEFAULT_SAMPLE_RATE = 0.01
+DEFAULT_BUFFER_SIZE = 1024
+
+
+class _Config:
+    enabled = False
+    sample_rate = DEFAULT_SAMPLE_RATE
+    buffer_size = DEFAULT_BUFFER_SIZE
+
+
+_config = _Config()
+_local = threading.local()
+# (qualname, wrapper) of the innermost sampled call. A context variable, so
+# coroutines interleaved on one event loop each see their own frame.
+_current: contextvars.ContextVar[tuple[str, Callable] | None] = contextvars.ContextVar(
+    "query_patterns_current", default=None
+)
+# Every thread's ring buffer, registered once when the thread first records
+# and dropped by drain() once its thread has exited. The lock serializes
+# registration and drains, never recording.
+_buffers: list["_RingBuffer"] = []
+_buffers_lock = threading.Lock()
+
+
+@dataclass(frozen=True)
+class CapturedStatement:
+    function: str
+    patterns: tuple[QueryPattern, ...]
+    statement: str
+
+
+class _Ring:
+    __slots__ = ("items", "pos", "count")
+
+    def __init__(self, size: int):
+        self.items: list[CapturedStatement | None] = [None] * size
+        self.pos = 0
+        self.count = 0
+
+
+class _RingBuffer:
+    """
+    Fixed-size buffer written by its owning thread only, without a lock; once
+    full, the oldest entries are overwritten. drain() swaps in an empty ring
+    instead of clearing the one being written, so a statement recorded during
+    a drain lands in one of them (at worst in the ring just drained, and is
+    lost).
+    """
+
+    __slots__ = ("ring", "size", "thread")
+
+    def __init__(self, size: int):
+        self.ring = _Ring(size)
+        self.size = size
+        self.thread = threading.current_thread()
+
+    def append(self, item: CapturedStatement):
+        ring = self.ring
+        ring.items[ring.pos] = item
+        ring.pos = (ring.pos + 1) % self.size
+        ring.count += 1
+
+    def drain(self) -> list[CapturedStatement]:
+        ring, self.ring = self.ring, _Ring(self.size)
+        if ring.count < self.size:
+            items = ring.items[: ring.pos]
+        else:
+            items = ring.items[ring.pos :] + ring.items[: ring.pos]
+        return [item for item in items if item is not None]
+
+
+def enable_capture(
+    sample_rate: float = DEFAULT_SAMPLE_RATE, buffer_size: int = DEFAULT_BUFFER_SIZE
+):
+    """
+    Record SQL executed inside @query_pattern functions decorated from now on.
+
+    sample_rate is the fraction of calls that are recorded; buffer_size is the
+    number of statements kept per thread.
+    """
+    if not 0 < sample_rate <= 1:
+        raise ValueError("sample_rate must be in (0, 1]")
+    if buffer_size < 1:
+        raise ValueError("buffer_size must be positive")
+    _config.enabled = True
+    _config.sample_rate = sample_rate
+    _config.buffer_size = buffer_size
+
+
+def disable_capture():
+    """
+    Stop recording. Already wrapped functions keep a single flag check.
+    """
+    _config.enabled = False
+
+
+def capture_enabled() -> bool:
+    return _config.enabled
+
+
+def wrap(fn: Callable) -> Callable:
+    """
+    Wrap a decorated function so that sampled calls record their SQL.
+
+    The wrapper shares fn's __dict__, so patterns appended later by stacked
+    @query_pattern decorators are visible on both.
+    """
+    if getattr(fn, "__query_patterns_capture__", False):
+        return fn
+
+    qualname = f"{fn.__module__}.{fn.__qualname__}"
+
+    def enter() -> contextvars.Token | None:
+        if not _config.enabled or random.random() >= _config.sample_rate:
+            return None
+        return _current.set((qualname, wrapper))
+
+    if inspect.iscoroutinefunction(fn):
+
+        @functools.wraps(fn)
+        async def wrapper(*args, **kwargs):
+            token = enter()
+            if token is None:
+                return await fn(*args, **kwargs)
+            try:
+                return await fn(*args, **kwargs)
+            finally:
+                _current.reset(token)
+
+    else:
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            token = enter()
+            if token is None:
+                return fn(*args, **kwargs)
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                _current.reset(token)
+
+    wrapper.__dict__ = fn.__dict__
+    wrapper.__query_patterns_capture__ = True
+    return wrapper
+
+
+def record(statement: str):
+    """
+    Record a statement for the innermost sampled @query_pattern call of the
+    current thread or task; a no-op outside of one.
+    """
+    current = _current.get()
+    if current is None:
+        return
+
+    buffer = getattr(_local, "buffer", None)
+    if buffer is None:
+        buffer = _local.buffer = _RingBuffer(_config.buffer_size)
+        with _buffers_lock:
+            _buffers.append(buffer)
+
+    qualname, fn = current
+    patterns = tuple(getattr(fn, "__query_patterns__", ()))
+    buffer.append(CapturedStatement(qualname, patterns, statement))
+
+
+def drain() -> list[CapturedStatement]:
+    """
+    Return and clear the statements recorded by all threads. Buffers of
+    threads that have exited are released once drained.
+    """
+    captured = []
+    with _buffers_lock:
+        alive = []
+        for buffer in _buffers:
+            # Checked before draining: a thread that is dead now cannot
+            # record anything after its buffer is emptied.
+            if buffer.thread.is_alive():
+                alive.append(buffer)
+            captured.extend(buffer.drain())
+        _buffers[:] = alive
+    return captured
+
+
+def install_sqlalchemy(engine: Any = None):
+    """
+    Hook before_cursor_execute on an Engine (or on every Engine when omitted).
+    """
+    from sqlalchemy import event
+    from sqlalchemy.engine import Engine
+
+    target = engine if engine is not None else Engine
+    if not event.contains(target, "before_cursor_execute", _before_cursor_execute):
+        event.listen(target, "before_cursor_execute", _before_cursor_execute)
+
+
+def _before_cursor_execute(conn, cursor, statement, parameters, context, executemany):
+    record(statement)
+
+
+def install_django():
+    """
+    Add an execute wrapper to every current and future Django connection.
+    """
+    from django.db import connections
+    from django.db.backends.signals import connection_created
+
+    for connection in connections.all():
+        _add_django_wrapper(connection)
+    connection_created.connect(_on_connection_created, weak=False)
+
+
+def _on_connection_created(sender, connection, **kwargs):
+    _add_django_wrapper(connection)
+
+
+def _add_django_wrapper(connection):
+    if _django_execute_wrapper not in connection.execute_wrappers:
+        connection.execute_wrappers.append(_django_execute_wrapper)
+
+
+def _django_execute_wrapper(execute, sql, params, many, context):
+    record(sql)
+    return execute(sql, params, many, context)
+
+
+@dataclass(frozen=True)
+class ParsedStatement:
+    table: str
+    where: tuple[str, ...]
+    order_by: tuple[str, ...]
+
+
+_IDENT = r'[`"\[]?(\w+)[`"\]]?'
+_QUALIFIED = rf"(?:{_IDENT}\.)?{_IDENT}"
+_TABLE_RE = re.compile(rf"\b(?:FROM|UPDATE)\s+{_QUALIFIED}", re.IGNORECASE)
+_WHERE_RE = re.compile(
+    r"\bWHERE\b(.*?)(?:\bGROUP\s+BY\b|\bORDER\s+BY\b|\bLIMIT\b|\bOFFSET\b"
+    r"|\bFOR\s+UPDATE\b|\bRETURNING\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_ORDER_RE = re.compile(
+    r"\bORDER\s+BY\b(.*?)(?:\bLIMIT\b|\bOFFSET\b|\bFOR\s+UPDATE\b|$)",
+    re.IGNORECASE | re.DOTALL,
+)
+_PREDICATE_RE = re.compile(
+    rf"{_QUALIFIED}\s*(?:=|<>|!=|<=|>=|<|>|\bIN\b|\bIS\b|\bLIKE\b|\bBETWEEN\b)",
+    re.IGNORECASE,
+)
+
+
+def parse_statement(statement: str) -> ParsedStatement | None:
+    """
+    Extract (table, WHERE columns, ORDER BY columns) from a single-table
+    SELECT / UPDATE / DELETE. Returns None for anything else.
+    """
+    head = statement.lstrip().split(None, 1)[0].upper() if statement.strip() else ""
+    if head not in ("SELECT", "UPDATE", "DELETE"):
+        return None
+
+    table_match = _TABLE_RE.search(statement)
+    if table_match is None:
+        return None
+    table = table_match.group(2)
+
+    where: list[str] = []
+    where_match = _WHERE_RE.search(statement)
+    if where_match:
+        for match in _PREDICATE_RE.finditer(where_match.group(1)):
+            column = match.group(2)
+            if column not in where and not column.isdigit():
+                where.append(column)
+
+    order_by: list[str] = []
+    order_match = _ORDER_RE.search(statement)
+    if order_match:
+        for part in order_match.group(1).split(","):
+            tokens = part.strip().split()
+            if tokens:
+                order_by.append(tokens[0].split(".")[-1].strip('`"[]'))
+
+    return ParsedStatement(table, tuple(where), tuple(order_by))
+
+
+@dataclass(frozen=True)
+class Finding:
+    status: str  # "ok", "undeclared-table" or "column-drift"
+    function: str
+    statement: ParsedStatement
+    patterns: tuple[QueryPattern, ...]
+
+
+def verify(captured: Iterable[CapturedStatement]) -> list[Finding]:
+    """
+    Compare executed statements with the patterns declared on the function
+    that ran them.
+
+    A statement is covered when a declared pattern on its table only uses
+    columns (filter and order_by) the statement filters or sorts on.
+    """
+    findings = []
+    seen = set()
+    for item in captured:
+        parsed = parse_statement(item.statement)
+        if parsed is None or parsed.table == "sqlite_master":
+            continue
+        key = (item.function, parsed)
+        if key in seen:
+            continue
+        seen.add(key)
+
+        # Statements are matched on the bare table name, without qualifiers.
+        on_table = [p for p in item.patterns if _bare_table(p.table) == parsed.table]
+        used = set(parsed.where) | set(parsed.order_by)
+        if not on_table:
+            status = "undeclared-table"
+        elif any(_pattern_columns(p) <= used for p in on_table):
+            status = "ok"
+        else:
+            status = "column-drift"
+        findings.append(Finding(status, item.function, parsed, item.patterns))
+    return findings
+
+
+def _pattern_columns(pattern: QueryPattern) -> set[str]:
+    return set(pattern.columns) | {name.lstrip("-") for name in pattern.order_by}
+
+
+def _bare_table(table: str) -> str:
+    return split_schema(split_database(table)[1])[1]
+
+
+def _enable_from_environment():
+    value = os.environ.get("QUERY_PATTERNS_CAPTURE")
+    if not value:
+        return
+    try:
+        enable_capture(float(value))
+    except ValueError:
+        warnings.warn(
+            f"Ignoring QUERY_PATTERNS_CAPTURE={value!r}: "
+            "expected a sample rate in (0, 1]",
+            RuntimeWarning,
+            stacklevel=2,
+        )
+
+
+_enable_from_environment()
@@ -0,0 +1,63 @@
+"""
+Qualified table names: `[database:][schema.]table`.
+
+An unqualified name is a table in the default schema of the default
+database. A schema qualifier targets another schema (PostgreSQL schema,
+MySQL database, attached SQLite database); a database qualifier targets
+another connection (a Django DATABASES alias).
+"""
+
+from typing import Callable, Iterable
+
+
+def qualify_table(
+    table: str, schema: str | None = None, database: str | None = None
+) -> str:
+    if schema:
+        table = f"{schema}.{table}"
+    if database:
+        table = f"{database}:{table}"
+    return table
+
+
+def split_database(name: str) -> tuple[str | None, str]:
+    """
+    "replica:users" -> ("replica", "users"); "users" -> (None, "users")
+    """
+    database, sep, rest = name.partition(":")
+    return (database, rest) if sep else (None, name)
+
+
+def split_schema(name: str) -> tuple[str | None, str]:
+    """
+    "billing.invoices" -> ("billing", "invoices"); "users" -> (None, "users")
+    """
+    schema, sep, table = name.rpartition(".")
+    return (schema, table) if sep else (None, name)
+
+
+def group_tables(
+    tables: Iterable[str] | None,
+    split: Callable[[str], tuple[str | None, str]],
+    targets: Iterable[str] = (),
+) -> dict[str | None, set[str] | None]:
+    """
+    Map each target (schema or database, None for the default one) to the
+    unqualified names of its tables that need to be read.
+
+    Without `tables`, every table is read from the default target and from
+    `targets`. Otherwise the targets named by `tables` are read, and each of
+    `targets` is read for the unqualified tables too.
+    """
+    if tables is None:
+        return {target: None for target in (None, *targets)}
+
+    grouped: dict[str | None, set[str] | None] = {}
+    for name in tables:
+        target, table = split(name)
+        grouped.setdefault(target, set()).add(table)
+    unqualified = grouped.get(None)
+    if unqualified:
+        for target in targets:
+            grouped.setdefault(target, set()).update(unqualified)
+    return grouped
@@ -32,3 +32,7 @@ class NamedColumnLike(Protocol):
 
 
 ColumnLike: TypeAlias = str | ORMColumnLike | NamedColumnLike
+
+# A column, "-column" for descending, or an ORM ordering expression
+# (SQLAlchemy `column.desc()`, Django `F("column").desc()`).
+OrderLike: TypeAlias = ColumnLike | Any
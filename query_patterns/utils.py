@@ -1,7 +1,37 @@
-from typing import Any, Sequence
+import inspect
+from types import ModuleType
+from typing import Any, Iterator, Sequence
 
 from query_patterns.pattern import QueryPattern
+from query_patterns.registry import registry
 
 
 def get_patterns(obj: Any) -> Sequence[QueryPattern]:
     return getattr(obj, "__query_patterns__", [])
+
+
+def iter_module_patterns(module: ModuleType) -> Iterator[QueryPattern]:
+    """
+    Yield every pattern declared in a module, once per declaration.
+
+    Modules decorated through the registry are read from it directly; other
+    objects (e.g. modules imported while the registry was disabled) fall back
+    to walking their functions and class methods.
+    """
+    name = getattr(module, "__name__", None)
+    if isinstance(module, ModuleType) and registry.has_module(name):
+        for pattern, _ in registry.iter_declarations([name]):
+            yield pattern
+        return
+
+    # Functions and classes imported from other modules, and methods
+    # inherited from other classes, are declared elsewhere.
+    for _, obj in vars(module).items():
+        if isinstance(module, ModuleType) and getattr(obj, "__module__", name) != name:
+            continue
+        if inspect.isfunction(obj):
+            yield from get_patterns(obj)
+        elif inspect.isclass(obj):
+            for attr, fn in inspect.getmembers(obj, inspect.isfunction):
+                if attr in vars(obj):
+                    yield from get_patterns(fn)
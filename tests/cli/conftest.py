@@ -6,3 +6,41 @@ import pytest
 @pytest.fixture
 def random_app_label():
     return f"app_{secrets.token_hex(4)}"
+
+
+@pytest.fixture
+def sqlite_aliases(tmp_path, monkeypatch):
+    """
+    Add file-backed SQLite DATABASES aliases for the duration of a test.
+    """
+    from django.apps import apps
+    from django.conf import settings
+    from django.db import connections
+
+    if not settings.configured:
+        settings.configure(
+            INSTALLED_APPS=[],
+            DATABASES={
+                "default": {"ENGINE": "django.db.backends.sqlite3", "NAME": ":memory:"}
+            },
+        )
+    if not apps.ready:
+        apps.populate(settings.INSTALLED_APPS)
+    added = []
+
+    def add(*aliases):
+        databases = {"default": dict(connections.settings["default"])}
+        for alias in aliases:
+            databases[alias] = {
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": tmp_path / f"{alias}.db",
+            }
+        for alias, alias_settings in connections.configure_settings(databases).items():
+            if alias in aliases:
+                monkeypatch.setitem(connections.settings, alias, alias_settings)
+                added.append(alias)
+
+    yield add
+    for alias in added:
+        connections[alias].close()
+        del connections[alias]
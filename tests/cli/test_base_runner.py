@@ -1,4 +1,5 @@
 from query_patterns import query_pattern
+from query_patterns.cli.collector.parallel import collect_in_processes
 from query_patterns.cli.runner.base import BaseRunner
 from query_patterns.pattern import QueryPattern
 
@@ -20,7 +21,7 @@ def test_analyze_patterns():
     results = runner._analyze_patterns([pattern], indexes)
 
     # then
-    assert results == [("ok", pattern)]
+    assert results == [("ok", pattern, ("id", "email"))]
 
 
 def test_auto_discover(tmp_path, monkeypatch):
@@ -128,3 +129,33 @@ def test_collect_query_patterns_with_counts():
     assert p.table == "users"
     assert p.columns == ("id",)
     assert counts[p] == 2
+
+
+def test_collect_in_processes_matches_single_process(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given
+    pkg = tmp_path / random_app_label
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    for i in range(40):
+        (pkg / f"repo_{i:02}.py").write_text(
+            "from query_patterns import query_pattern\n"
+            "class Repo:\n"
+            f"    @query_pattern(table='t{i % 3}', columns=['a', 'b'])\n"
+            f"    @query_pattern(table='t{i % 5}', columns=['c'])\n"
+            "    def foo(self): pass\n"
+        )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    module_names = [f"{random_app_label}.repo_{i:02}" for i in range(40)]
+
+    # when
+    patterns, counts = collect_in_processes(module_names, jobs=2, cwd=str(tmp_path))
+
+    # then
+    runner = DummyRunner()
+    modules = runner._import_module_from_cwd(tuple(module_names))
+    expected_patterns, expected_counts = runner._collect_query_patterns(modules)
+    assert patterns == expected_patterns
+    assert list(counts.items()) == list(expected_counts.items())
@@ -0,0 +1,404 @@
+import sqlite3
+
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    String,
+    Table,
+    UniqueConstraint,
+    create_engine,
+    event,
+    func,
+)
+
+from query_patterns.cli.runner.catalog import (
+    POSTGRESQL_INDEXES_SQL,
+    build_index_set,
+    collect_indexes_in_bulk,
+)
+from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+from query_patterns.cli.runner.types import IndexDefinition
+
+
+def test_build_index_set_groups_rows_in_column_order():
+    # given
+    rows = [
+        ("orders", "ix_orders_org_created", "org_id"),
+        ("orders", "ix_orders_org_created", "created_at"),
+        ("orders", "ix_orders_status", "status"),
+        ("users", "ix_users_email", "email"),
+    ]
+
+    # when
+    indexes = build_index_set(rows)
+
+    # then
+    assert indexes == {
+        ("orders", ("org_id", "created_at")),
+        ("orders", ("status",)),
+        ("users", ("email",)),
+    }
+
+
+def test_build_index_set_drops_expression_indexes():
+    # given
+    rows = [
+        ("users", "ix_users_lower_email", None),
+        ("users", "ix_users_org_lower_name", "org_id"),
+        ("users", "ix_users_org_lower_name", None),
+    ]
+
+    # when
+    indexes = build_index_set(rows)
+
+    # then
+    assert indexes == set()
+
+
+def test_collect_indexes_in_bulk_postgresql_uses_one_query():
+    # given
+    queries = []
+
+    def fetch(sql, params):
+        queries.append((sql, params))
+        return [("users", "ix_users_email", "email")]
+
+    # when
+    indexes = collect_indexes_in_bulk("postgresql", fetch, tables={"users", "orgs"})
+
+    # then
+    assert len(queries) == 1
+    sql, params = queries[0]
+    assert sql.startswith(POSTGRESQL_INDEXES_SQL.split("{table_filter}")[0])
+    assert "AND t.relname IN (%s, %s)" in sql
+    assert params == ["orgs", "users"]
+    assert indexes == {("users", ("email",))}
+
+
+def test_collect_indexes_in_bulk_unsupported_dialect():
+    # given
+    def fetch(sql, params):
+        raise AssertionError("must not be called")
+
+    # when
+    indexes = collect_indexes_in_bulk("mssql", fetch)
+
+    # then
+    assert indexes is None
+
+
+def test_collect_indexes_in_bulk_sqlite_reads_constraints_and_skips_expressions(
+    tmp_path,
+):
+    # given
+    engine = create_engine(f"sqlite:///{tmp_path / 'catalog.db'}")
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("org_id", Integer),
+        Column("email", String),
+        Column("name", String),
+        UniqueConstraint("email"),
+        Index("ix_users_org_email", "org_id", "email"),
+        Index("ix_users_lower_name", func.lower(Column("name", String))),
+    )
+    Table(
+        "orders",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("user_id", Integer, index=True),
+    )
+    metadata.create_all(engine)
+
+    # when
+    with engine.connect() as conn:
+        indexes = collect_indexes_in_bulk(
+            "sqlite",
+            lambda sql, params: conn.exec_driver_sql(sql, tuple(params)).fetchall(),
+            placeholder="?",
+        )
+
+    # then
+    assert indexes == {
+        ("users", ("org_id", "email")),
+        ("orders", ("user_id",)),
+        IndexDefinition("users", ("id",), kind="primary"),
+        IndexDefinition("users", ("email",), unique=True, kind="unique"),
+        IndexDefinition("orders", ("id",), kind="primary"),
+    }
+
+
+def test_collect_indexes_in_bulk_mysql_against_local_stand_in():
+    # given: information_schema.STATISTICS emulated in SQLite
+    conn = sqlite3.connect(":memory:")
+    conn.create_function("DATABASE", 0, lambda: "app")
+    conn.execute("ATTACH DATABASE ':memory:' AS information_schema")
+    conn.execute(
+        "CREATE TABLE information_schema.STATISTICS ("
+        "TABLE_SCHEMA TEXT, TABLE_NAME TEXT, INDEX_NAME TEXT, "
+        "SEQ_IN_INDEX INTEGER, COLUMN_NAME TEXT, COLLATION TEXT, "
+        "NON_UNIQUE INTEGER, INDEX_TYPE TEXT)"
+    )
+    conn.executemany(
+        "INSERT INTO information_schema.STATISTICS VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+        [
+            ("app", "users", "PRIMARY", 1, "id", "A", 0, "BTREE"),
+            ("app", "users", "ix_org_email", 2, "email", "A", 1, "BTREE"),
+            ("app", "users", "ix_org_email", 1, "org_id", "A", 1, "BTREE"),
+            ("app", "users", "ix_lower_name", 1, None, "A", 1, "BTREE"),
+            ("other", "users", "ix_other", 1, "name", "A", 1, "BTREE"),
+        ],
+    )
+
+    # when
+    indexes = collect_indexes_in_bulk(
+        "mysql", lambda sql, params: conn.execute(sql, params).fetchall()
+    )
+
+    # then
+    assert indexes == {
+        ("users", ("org_id", "email")),
+        IndexDefinition("users", ("id",), kind="primary"),
+    }
+
+
+def test_sqlalchemy_runner_db_collector_uses_bulk_query(tmp_path):
+    # given
+    engine = create_engine(f"sqlite:///{tmp_path / 'bulk.db'}")
+    metadata = MetaData()
+    for i in range(5):
+        Table(
+            f"t{i}",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("a", Integer),
+            Column("b", Integer),
+            Index(f"ix_t{i}_a_b", "a", "b"),
+        )
+    metadata.create_all(engine)
+
+    # when
+    indexes = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(engine)
+
+    # then
+    assert indexes == {(f"t{i}", ("a", "b")) for i in range(5)} | {
+        IndexDefinition(f"t{i}", ("id",), kind="primary") for i in range(5)
+    }
+
+
+def test_sqlalchemy_runner_db_collector_reads_only_requested_tables(tmp_path):
+    # given
+    engine = create_engine(f"sqlite:///{tmp_path / 'filtered.db'}")
+    metadata = MetaData()
+    for i in range(5):
+        Table(
+            f"t{i}",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("a", Integer),
+            Index(f"ix_t{i}_a", "a"),
+        )
+    metadata.create_all(engine)
+
+    # when
+    bulk = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(
+        engine, tables={"t1", "t3", "missing"}
+    )
+    per_table = SQLAlchemyRunner._collect_sqlalchemy_indexes_per_table(
+        engine, workers=2, tables={"t1", "t3", "missing"}
+    )
+
+    # then
+    assert (
+        bulk
+        == per_table
+        == {
+            ("t1", ("a",)),
+            ("t3", ("a",)),
+            IndexDefinition("t1", ("id",), kind="primary"),
+            IndexDefinition("t3", ("id",), kind="primary"),
+        }
+    )
+
+
+def test_collect_indexes_in_bulk_postgresql_binds_schema():
+    # given
+    queries = []
+
+    def fetch(sql, params):
+        queries.append((sql, params))
+        return [("invoices", "ix_invoices_number", "number")]
+
+    # when
+    indexes = collect_indexes_in_bulk(
+        "postgresql", fetch, tables={"invoices"}, schema="billing"
+    )
+
+    # then
+    sql, params = queries[0]
+    assert "current_schema()" not in sql
+    assert params == ["billing", "invoices"]
+    assert indexes == {("billing.invoices", ("number",))}
+
+
+def test_sqlalchemy_runner_db_collector_reads_attached_schemas(tmp_path):
+    # given: an attached SQLite database stands in for a second schema
+    engine = create_engine(f"sqlite:///{tmp_path / 'main.db'}")
+
+    @event.listens_for(engine, "connect")
+    def attach(dbapi_connection, _):
+        dbapi_connection.execute(
+            f"ATTACH DATABASE '{tmp_path / 'billing.db'}' AS billing"
+        )
+
+    metadata = MetaData()
+    Table("users", metadata, Column("email", String, index=True))
+    Table(
+        "invoices",
+        metadata,
+        Column("number", String, index=True),
+        schema="billing",
+    )
+    metadata.create_all(engine)
+
+    # when
+    by_table = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(
+        engine, tables={"users", "billing.invoices"}
+    )
+    by_schema = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(
+        engine, workers=2, schemas=["billing"]
+    )
+    extra_schema = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(
+        engine, tables={"users", "invoices"}, schemas=["billing"]
+    )
+
+    # then
+    assert (
+        by_table
+        == by_schema
+        == {
+            ("users", ("email",)),
+            ("billing.invoices", ("number",)),
+        }
+    )
+    assert extra_schema == by_schema
+
+
+def test_collect_indexes_in_bulk_sqlite_reads_order_predicate_and_uniqueness(
+    tmp_path,
+):
+    # given
+    engine = create_engine(f"sqlite:///{tmp_path / 'definitions.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE events (org_id INTEGER, created_at TEXT, deleted_at TEXT)"
+        )
+        conn.exec_driver_sql(
+            "CREATE INDEX ix_org_created ON events (org_id, created_at DESC)"
+        )
+        conn.exec_driver_sql(
+            "CREATE UNIQUE INDEX ix_live ON events (org_id) WHERE deleted_at IS NULL"
+        )
+
+    # when
+    with engine.connect() as conn:
+        indexes = collect_indexes_in_bulk(
+            "sqlite",
+            lambda sql, params: conn.exec_driver_sql(sql, tuple(params)).fetchall(),
+            placeholder="?",
+        )
+
+    # then
+    assert indexes == {
+        IndexDefinition("events", ("org_id", "created_at"), orders=("asc", "desc")),
+        IndexDefinition(
+            "events", ("org_id",), predicate="deleted_at IS NULL", unique=True
+        ),
+    }
+
+
+def test_collect_indexes_in_bulk_sqlite_reads_multi_line_partial_index(tmp_path):
+    # given
+    engine = create_engine(f"sqlite:///{tmp_path / 'partial.db'}")
+    with engine.begin() as conn:
+        conn.exec_driver_sql("CREATE TABLE events (org_id INTEGER, deleted_at TEXT)")
+        conn.exec_driver_sql(
+            "CREATE INDEX ix_live ON events (org_id)\n\tWHERE\n\tdeleted_at IS NULL"
+        )
+
+    # when
+    with engine.connect() as conn:
+        indexes = collect_indexes_in_bulk(
+            "sqlite",
+            lambda sql, params: conn.exec_driver_sql(sql, tuple(params)).fetchall(),
+            placeholder="?",
+        )
+
+    # then
+    assert indexes == {
+        IndexDefinition("events", ("org_id",), predicate="deleted_at IS NULL")
+    }
+
+
+def test_sqlalchemy_schema_index_definitions():
+    # given
+    metadata = MetaData()
+    events = Table(
+        "events",
+        metadata,
+        Column("org_id", Integer),
+        Column("email", String),
+        Column("deleted_at", String),
+    )
+    Index("ix_org_email", events.c.org_id, events.c.email.desc())
+    Index(
+        "ix_live_lower_email",
+        func.lower(events.c.email),
+        unique=True,
+        sqlite_where=events.c.deleted_at.is_(None),
+    )
+    Index("ix_email_hash", events.c.email, postgresql_using="hash")
+
+    # when
+    indexes = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_schema(metadata)
+
+    # then
+    assert indexes == {
+        IndexDefinition("events", ("org_id", "email"), orders=("asc", "desc")),
+        IndexDefinition(
+            "events",
+            ("lower(email)",),
+            predicate="deleted_at IS NULL",
+            unique=True,
+        ),
+        IndexDefinition("events", ("email",), method="hash"),
+    }
+
+
+def test_sqlalchemy_schema_collects_primary_keys_and_unique_constraints():
+    # given
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("email", String, unique=True),
+        Column("org_id", Integer, index=True),
+        Column("handle", String),
+        UniqueConstraint("org_id", "handle"),
+    )
+
+    # when
+    indexes = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_schema(metadata)
+
+    # then
+    assert indexes == {
+        IndexDefinition("users", ("id",), kind="primary"),
+        IndexDefinition("users", ("email",), unique=True, kind="unique"),
+        IndexDefinition("users", ("org_id", "handle"), unique=True, kind="unique"),
+        ("users", ("org_id",)),
+    }
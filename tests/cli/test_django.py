@@ -346,3 +346,190 @@ def test_cli_django_from_db_missing(
     assert f"[MISSING] {table_name}('email',)" in result.output
     assert "[usage=1]" in result.output
     assert "[OK]" not in result.output
+
+
+def test_cli_django_verify_plans(tmp_path, monkeypatch, random_app_label):
+    # given
+    project = tmp_path / "sample_project"
+    project.mkdir()
+
+    (project / "settings.py").write_text(
+        textwrap.dedent(f"""
+        INSTALLED_APPS = ["{random_app_label}"]
+        SECRET_KEY = "dummy"
+        DATABASES = {{
+            "default": {{
+                "ENGINE": "django.db.backends.sqlite3",
+                "NAME": ":memory:",
+            }}
+        }}
+    """)
+    )
+
+    app_dir = project / random_app_label
+    app_dir.mkdir()
+    (app_dir / "__init__.py").write_text("")
+
+    table_name = f"{random_app_label}_user"
+
+    (app_dir / "repo.py").write_text(
+        textwrap.dedent(f"""
+        from query_patterns import query_pattern
+
+        class Repo:
+            @query_pattern(table="{table_name}", columns=["email"])
+            def find(self):
+                pass
+    """)
+    )
+
+    monkeypatch.chdir(project)
+    sys.path.insert(0, str(project))
+    monkeypatch.setenv("DJANGO_SETTINGS_MODULE", "settings")
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {table_name} (id INTEGER, email TEXT)")
+        cursor.execute(f"CREATE INDEX ix_{table_name}_email ON {table_name} (email)")
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "django",
+            "--source",
+            "db",
+            "--settings",
+            "settings",
+            "--module",
+            f"{random_app_label}.repo",
+            "--verify-plans",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert (
+        f"[OK] {table_name}('email',) [usage=1] [plan=ix_{table_name}_email]"
+        in result.output
+    )
+
+
+def test_django_db_collector_reads_other_database_aliases(
+    sqlite_aliases, random_app_label
+):
+    # given: a second, file-backed alias next to the in-memory default
+    from django.db import connections
+
+    from query_patterns.cli.runner.django import DjangoRunner
+
+    sqlite_aliases("other")
+    table_name = f"{random_app_label}_event"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {table_name} (id INTEGER, kind TEXT)")
+        cursor.execute(f"CREATE INDEX ix_{table_name}_kind ON {table_name} (kind)")
+    with connections["other"].cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {table_name} (id INTEGER, at TEXT)")
+        cursor.execute(f"CREATE INDEX ix_{table_name}_at ON {table_name} (at)")
+    connections["other"].close()
+
+    # when
+    indexes = DjangoRunner._collect_django_indexes_from_databases(
+        targets={None: {table_name}, "other": {table_name}}
+    )
+
+    # then
+    assert indexes == {
+        (table_name, ("kind",)),
+        (f"other:{table_name}", ("at",)),
+    }
+
+
+def test_django_schema_index_definitions(sqlite_aliases, random_app_label):
+    # given
+    from django.db import models
+    from django.db.models.functions import Lower
+
+    from query_patterns.cli.runner.django import _model_index_definition
+    from query_patterns.cli.runner.types import IndexDefinition, normalize_sql
+
+    sqlite_aliases()
+
+    class Account(models.Model):
+        org_id = models.IntegerField()
+        email = models.CharField(max_length=50)
+        created_at = models.DateTimeField(db_column="created")
+        deleted_at = models.DateTimeField(null=True)
+
+        class Meta:
+            app_label = random_app_label
+            indexes = [
+                models.Index(
+                    fields=["org_id", "-created_at"],
+                    name="ix_org_created",
+                    condition=models.Q(deleted_at__isnull=True),
+                ),
+                models.Index(Lower("email").desc(), name="ix_lower_email"),
+            ]
+
+    # when
+    ordered, functional = (
+        _model_index_definition(Account, index) for index in Account._meta.indexes
+    )
+
+    # then
+    assert ordered.columns == ("org_id", "created")
+    assert ordered.orders == ("asc", "desc")
+    assert normalize_sql(ordered.predicate) == "deleted_atisnull"
+    assert functional == IndexDefinition(
+        Account._meta.db_table, ('LOWER("email")',), orders=("desc",)
+    )
+
+
+def test_django_schema_collects_constraint_and_field_indexes(
+    sqlite_aliases, random_app_label
+):
+    # given
+    from django.db import models
+
+    from query_patterns.cli.runner.django import _model_index_definitions
+    from query_patterns.cli.runner.types import IndexDefinition
+
+    sqlite_aliases()
+
+    class Org(models.Model):
+        slug = models.SlugField(unique=True)
+
+        class Meta:
+            app_label = random_app_label
+
+    class Member(models.Model):
+        org = models.ForeignKey(Org, on_delete=models.CASCADE)
+        email = models.CharField(max_length=50, db_index=True)
+        role = models.CharField(max_length=10)
+        handle = models.CharField(max_length=10)
+
+        class Meta:
+            app_label = random_app_label
+            unique_together = [("org", "role")]
+            constraints = [
+                models.UniqueConstraint(fields=["org", "handle"], name="uq_handle")
+            ]
+
+    # when
+    org_indexes = set(_model_index_definitions(Org))
+    member_indexes = set(_model_index_definitions(Member))
+
+    # then
+    org_table, member_table = Org._meta.db_table, Member._meta.db_table
+    assert org_indexes == {
+        IndexDefinition(org_table, ("id",), kind="primary"),
+        IndexDefinition(org_table, ("slug",), unique=True, kind="unique"),
+    }
+    assert member_indexes == {
+        IndexDefinition(member_table, ("id",), kind="primary"),
+        IndexDefinition(member_table, ("org_id",), kind="foreign-key"),
+        IndexDefinition(member_table, ("email",), kind="db-index"),
+        IndexDefinition(member_table, ("org_id", "role"), unique=True, kind="unique"),
+        IndexDefinition(member_table, ("org_id", "handle"), unique=True, kind="unique"),
+    }
@@ -0,0 +1,300 @@
+import asyncio
+import json
+import textwrap
+import threading
+
+import click.testing
+import pytest
+from sqlalchemy import Column, Index, Integer, MetaData, Table, create_engine
+
+from query_patterns.cli.main import main as cli_main
+from query_patterns.cli.runner.fleet import FleetTarget, collect_fleet
+
+
+def test_collect_fleet_reports_errors_and_timeouts():
+    # given
+    release = threading.Event()
+
+    def hang(tables):
+        release.wait(5)
+        return set()
+
+    def fail(tables):
+        raise RuntimeError("connection refused")
+
+    targets = [
+        FleetTarget("slow", hang),
+        FleetTarget("broken", fail),
+        FleetTarget("fine", lambda tables: {(t, ("id",)) for t in tables}),
+    ]
+
+    # when
+    results = collect_fleet(targets, {"users"}, workers=2, timeout=0.2)
+    release.set()
+
+    # then
+    assert list(results) == ["slow", "broken", "fine"]
+    assert results["slow"].status == "timeout"
+    assert results["broken"].error == "connection refused"
+    assert results["fine"].indexes == {("users", ("id",))}
+
+
+def test_collect_fleet_bounds_concurrency():
+    # given
+    lock = threading.Lock()
+    running = peak = 0
+
+    def collect(tables):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        threading.Event().wait(0.02)
+        with lock:
+            running -= 1
+        return set()
+
+    targets = [FleetTarget(f"db{i}", collect) for i in range(10)]
+
+    # when
+    results = collect_fleet(targets, None, workers=3, timeout=None)
+
+    # then
+    assert all(r.status == "ok" for r in results.values())
+    assert peak == 3
+
+
+def test_collect_fleet_counts_timed_out_threads_against_workers():
+    # given: "slow" outlives its timeout, so its thread keeps the only slot
+    release = threading.Event()
+    lock = threading.Lock()
+    running = peak = 0
+
+    def collect(tables, wait=0.0):
+        nonlocal running, peak
+        with lock:
+            running += 1
+            peak = max(peak, running)
+        release.wait(wait)
+        with lock:
+            running -= 1
+        return set()
+
+    targets = [
+        FleetTarget("slow", lambda tables: collect(tables, wait=5)),
+        FleetTarget("next", collect),
+    ]
+
+    # when
+    results = collect_fleet(targets, None, workers=1, timeout=0.1)
+    release.set()
+
+    # then
+    assert results["slow"].error == "timed out after 0.1s"
+    assert results["next"].status == "timeout"
+    assert "1 timed-out connection(s) still open" in results["next"].error
+    assert peak == 1
+
+
+def test_collect_fleet_runs_async_targets_next_to_threads():
+    # given
+    sync_started = threading.Event()
+
+    async def acollect(tables):
+        # Only returns indexes when the threaded target runs at the same time.
+        for _ in range(100):
+            if sync_started.is_set():
+                return {("users", ("id",))}
+            await asyncio.sleep(0.01)
+        return set()
+
+    def collect(tables):
+        sync_started.set()
+        return {("users", ("id",))}
+
+    targets = [
+        FleetTarget("async", acollect=acollect),
+        FleetTarget("sync", collect),
+    ]
+
+    # when
+    results = collect_fleet(targets, None, workers=2, timeout=None)
+
+    # then
+    assert results["async"].indexes == {("users", ("id",))}
+    assert results["sync"].indexes == {("users", ("id",))}
+
+
+@pytest.fixture
+def fleet(tmp_path, monkeypatch, random_app_label):
+    # Three tenant databases; tenant_b lacks the email index.
+    urls = []
+    for name in ("tenant_a", "tenant_b", "tenant_c"):
+        metadata = MetaData()
+        users = Table(
+            "users", metadata, Column("id", Integer), Column("email", Integer)
+        )
+        if name != "tenant_b":
+            Index(f"ix_{name}_email", users.c.email)
+        Index(f"ix_{name}_id", users.c.id)
+        engine = create_engine(f"sqlite:///{tmp_path / name}.db")
+        metadata.create_all(engine)
+        engine.dispose()
+        urls.append(f"{name} sqlite:///{tmp_path / name}.db")
+
+    (tmp_path / "urls.txt").write_text("# tenants\n" + "\n".join(urls) + "\n\n")
+    (tmp_path / f"{random_app_label}.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["id"])
+            @query_pattern(table="users", columns=["email"])
+            @query_pattern(table="users", columns=["name"])
+            def find(): pass
+        """)
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path, random_app_label
+
+
+def test_engine_url_file_reports_drift(fleet):
+    # given
+    _, label = fleet
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        ["sqlalchemy", "--module", label, "--engine-url-file", "urls.txt"],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',) [usage=1] [databases=3]" in result.stdout
+    assert "[DRIFT] users('email',) [usage=1] [missing=1/3]" in result.stdout
+    assert "    missing on: tenant_b" in result.stdout
+    assert "[MISSING] users('name',) [usage=1] [missing=3/3]" in result.stdout
+    assert "1 ok, 1 drifted, 1 missing everywhere." in result.stdout
+
+
+def test_engine_url_file_json_matrix_with_unreadable_database(fleet):
+    # given
+    root, label = fleet
+    with open(root / "urls.txt", "a") as f:
+        f.write("nosuchdialect://host/db\n")
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            label,
+            "--engine-url-file",
+            "urls.txt",
+            "--format",
+            "json",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert [d["status"] for d in report["databases"]] == ["ok", "ok", "ok", "error"]
+    assert report["databases"][3]["name"] == "nosuchdialect://host/db"
+    email = next(r for r in report["results"] if r["columns"] == ["email"])
+    assert email["status"] == "drift"
+    assert email["databases"] == {
+        "tenant_a": "ok",
+        "tenant_b": "missing",
+        "tenant_c": "ok",
+        "nosuchdialect://host/db": "error",
+    }
+    assert report["summary"] == {"total": 3, "ok": 1, "drift": 1, "missing": 1}
+    assert "[WARN] nosuchdialect://host/db:" in result.stderr
+
+
+def test_engine_url_file_rejects_engine_url(fleet):
+    # given
+    _, label = fleet
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            label,
+            "--engine-url",
+            "sqlite://",
+            "--engine-url-file",
+            "urls.txt",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 1
+    assert "mutually exclusive" in result.stderr
+
+
+def test_django_fleet_database_globs(sqlite_aliases, random_app_label):
+    # given
+    from django.db import connection, connections
+
+    from query_patterns.cli.runner.django import DjangoRunner
+
+    sqlite_aliases("tenant_a", "tenant_b")
+    table = f"{random_app_label}_user"
+
+    with connection.cursor() as cursor:
+        cursor.execute(f"CREATE TABLE {table} (id INTEGER, email TEXT)")
+    for alias in ("tenant_a", "tenant_b"):
+        with connections[alias].cursor() as cursor:
+            cursor.execute(f"CREATE TABLE {table} (id INTEGER, email TEXT)")
+            if alias == "tenant_a":
+                cursor.execute(f"CREATE INDEX ix_{table}_email ON {table} (email)")
+        connections[alias].close()
+
+    runner = DjangoRunner(
+        module=(),
+        settings=None,
+        source="db",
+        quiet=False,
+        fleet_databases=("tenant_*",),
+    )
+
+    # when
+    targets = runner._fleet_targets()
+    results = collect_fleet(targets, {table}, workers=2, timeout=None)
+
+    # then
+    assert [t.name for t in targets] == ["tenant_a", "tenant_b"]
+    assert results["tenant_a"].indexes == {(table, ("email",))}
+    assert results["tenant_b"].indexes == set()
+
+
+def test_collect_fleet_cancels_async_targets_on_timeout():
+    # given
+    import asyncio
+
+    async def hang(tables):
+        await asyncio.sleep(5)
+        return set()
+
+    async def fine(tables):
+        return {(t, ("id",)) for t in tables}
+
+    targets = [
+        FleetTarget("slow", acollect=hang),
+        FleetTarget("fine", acollect=fine),
+        FleetTarget("sync", lambda tables: set()),
+    ]
+
+    # when
+    results = collect_fleet(targets, {"users"}, workers=1, timeout=0.1)
+
+    # then
+    assert list(results) == ["slow", "fine", "sync"]
+    assert results["slow"].status == "timeout"
+    assert results["fine"].indexes == {("users", ("id",))}
+    assert results["sync"].status == "ok"
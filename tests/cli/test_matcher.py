@@ -0,0 +1,239 @@
+from query_patterns.cli.matcher import IndexMatcher
+from query_patterns.cli.runner.types import IndexDefinition
+
+
+def test_exact_match():
+    # given
+    matcher = IndexMatcher({("users", ("email",)), ("users", ("email", "name"))})
+
+    # when
+    result = matcher.match("users", ("email",))
+
+    # then
+    assert result == ("ok", ("email",))
+
+
+def test_leftmost_prefix_match_reports_shortest_index():
+    # given
+    matcher = IndexMatcher(
+        {
+            ("events", ("org_id", "created_at", "kind")),
+            ("events", ("org_id", "created_at")),
+        }
+    )
+
+    # when
+    result = matcher.match("events", ("org_id",))
+
+    # then
+    assert result == ("ok-prefix", ("org_id", "created_at"))
+
+
+def test_non_leading_columns_are_missing():
+    # given
+    matcher = IndexMatcher({("events", ("org_id", "created_at"))})
+
+    # when
+    result = matcher.match("events", ("created_at",))
+
+    # then
+    assert result == ("missing", None)
+
+
+def test_reordered_equality_columns():
+    # given
+    matcher = IndexMatcher({("events", ("org_id", "user_id", "created_at"))})
+
+    # when
+    exact_length = matcher.match("events", ("user_id", "org_id"))
+    too_far = matcher.match("events", ("created_at", "org_id"))
+
+    # then
+    assert exact_length == ("ok-reordered", ("org_id", "user_id", "created_at"))
+    assert too_far == ("missing", None)
+
+
+def test_indexes_on_other_tables_do_not_match():
+    # given
+    matcher = IndexMatcher({("orders", ("user_id",))})
+
+    # when
+    result = matcher.match("users", ("user_id",))
+
+    # then
+    assert result == ("missing", None)
+
+
+def test_many_indexes_per_table():
+    # given
+    indexes = {("t", (f"c{i}", f"c{i + 1}")) for i in range(500)}
+    matcher = IndexMatcher(indexes)
+
+    # when
+    prefix = matcher.match("t", ("c250",))
+    reordered = matcher.match("t", ("c251", "c250"))
+
+    # then
+    assert prefix == ("ok-prefix", ("c250", "c251"))
+    assert reordered == ("ok-reordered", ("c250", "c251"))
+
+
+def test_redundant_indexes_are_strict_left_prefixes():
+    # given
+    matcher = IndexMatcher(
+        {
+            ("events", ("org_id",)),
+            ("events", ("org_id", "created_at")),
+            ("events", ("org_id", "created_at", "kind")),
+            ("events", ("created_at",)),
+            ("users", ("email",)),
+        }
+    )
+
+    # when
+    redundant = matcher.redundant()
+
+    # then
+    assert redundant == [
+        ("events", ("org_id",), ("org_id", "created_at")),
+        ("events", ("org_id", "created_at"), ("org_id", "created_at", "kind")),
+    ]
+
+
+def test_prefix_index_with_other_sort_order_is_not_redundant():
+    # given
+    matcher = IndexMatcher(
+        {
+            IndexDefinition("events", ("org_id", "kind"), orders=("asc", "desc")),
+            IndexDefinition("events", ("org_id", "kind", "id")),
+            IndexDefinition("events", ("kind",), orders=("desc",)),
+            IndexDefinition("events", ("kind", "id"), orders=("asc", "desc")),
+        }
+    )
+
+    # when
+    redundant = matcher.redundant()
+
+    # then: a backward scan of (kind ASC, id DESC) serves (kind DESC)
+    assert redundant == [("events", ("kind",), ("kind", "id"))]
+
+
+def test_order_by_served_by_index_after_equality_columns():
+    # given
+    matcher = IndexMatcher(
+        {IndexDefinition("events", ("org_id", "created_at"), orders=("asc", "desc"))}
+    )
+
+    # when
+    same = matcher.match("events", ("org_id",), ("-created_at",))
+    backward = matcher.match("events", ("org_id",), ("created_at",))
+    other_column = matcher.match("events", ("org_id",), ("-id",))
+
+    # then
+    assert same == ("ok", ("org_id", "created_at"))
+    assert backward == ("ok", ("org_id", "created_at"))
+    assert other_column == ("sort", ("org_id", "created_at"))
+
+
+def test_mixed_directions_need_a_matching_index():
+    # given
+    matcher = IndexMatcher({("events", ("org_id", "kind", "created_at"))})
+
+    # when
+    mixed = matcher.match("events", ("org_id",), ("kind", "-created_at"))
+    uniform = matcher.match("events", ("org_id",), ("-kind", "-created_at"))
+
+    # then
+    assert mixed == ("sort", ("org_id", "kind", "created_at"))
+    assert uniform == ("ok", ("org_id", "kind", "created_at"))
+
+
+def test_order_only_pattern():
+    # given
+    matcher = IndexMatcher({("events", ("created_at", "id"))})
+
+    # when
+    served = matcher.match("events", (), ("-created_at",))
+    unserved = matcher.match("events", (), ("id",))
+
+    # then
+    assert served == ("ok-prefix", ("created_at", "id"))
+    assert unserved == ("missing", None)
+
+
+def test_partial_index_serves_only_its_condition():
+    # given
+    matcher = IndexMatcher(
+        {IndexDefinition("users", ("email",), predicate='("deleted_at" IS NULL)')}
+    )
+
+    # when
+    same_condition = matcher.match("users", ("email",), condition="deleted_at is null")
+    no_condition = matcher.match("users", ("email",))
+    other_condition = matcher.match("users", ("email",), condition="active")
+
+    # then
+    assert same_condition == ("ok", ("email",))
+    assert no_condition == ("missing", None)
+    assert other_condition == ("missing", None)
+
+
+def test_partial_index_predicate_literals_keep_their_case():
+    # given
+    matcher = IndexMatcher(
+        {
+            IndexDefinition(
+                "orders", ("org_id",), predicate="(\"Status\" = 'Open'::text)"
+            )
+        }
+    )
+
+    # when
+    same_literal = matcher.match("orders", ("org_id",), condition="status = 'Open'")
+    other_literal = matcher.match("orders", ("org_id",), condition="status = 'open'")
+
+    # then
+    assert same_literal == ("ok", ("org_id",))
+    assert other_literal == ("missing", None)
+
+
+def test_expression_index_columns_are_normalized():
+    # given
+    matcher = IndexMatcher({("users", ("lower((email)::text)",))})
+
+    # when
+    result = matcher.match("users", ("LOWER(email)",))
+
+    # then
+    assert result == ("ok", ("lower(email)",))
+
+
+def test_non_btree_index_serves_equality_on_its_columns_only():
+    # given
+    matcher = IndexMatcher({IndexDefinition("docs", ("tags",), method="gin")})
+
+    # when
+    lookup = matcher.match("docs", ("tags",))
+    ordered = matcher.match("docs", ("tags",), ("tags",))
+
+    # then
+    assert lookup == ("ok", ("tags",))
+    assert ordered == ("missing", None)
+
+
+def test_unique_prefix_index_is_not_redundant():
+    # given
+    matcher = IndexMatcher(
+        {
+            IndexDefinition("users", ("email",), unique=True),
+            ("users", ("email", "name")),
+            ("users", ("org_id",)),
+            ("users", ("org_id", "name")),
+        }
+    )
+
+    # when
+    redundant = matcher.redundant()
+
+    # then
+    assert redundant == [("users", ("org_id",), ("org_id", "name"))]
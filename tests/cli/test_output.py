@@ -0,0 +1,175 @@
+import json
+import textwrap
+import xml.etree.ElementTree as ET
+
+import click.testing
+import pytest
+
+from query_patterns.cli.main import main as cli_main
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, random_app_label):
+    (tmp_path / f"{random_app_label}.py").write_text(
+        textwrap.dedent(
+            """
+            from query_patterns import query_pattern
+
+            class Repo:
+                @query_pattern(table="users", columns=["email"])
+                def by_email(self): pass
+
+                @query_pattern(table="users", columns=["name"])
+                def by_name(self): pass
+            """
+        )
+    )
+    (tmp_path / f"{random_app_label}_meta.py").write_text(
+        textwrap.dedent(
+            """
+            from sqlalchemy import MetaData, Table, Column, Integer, String, Index
+            metadata = MetaData()
+            Table(
+                "users",
+                metadata,
+                Column("email", String),
+                Column("name", String),
+                Index("ix_users_email", "email"),
+            )
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return random_app_label
+
+
+def _invoke(module, output_format):
+    return click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            module,
+            "--metadata",
+            f"{module}_meta.metadata",
+            "--format",
+            output_format,
+        ],
+    )
+
+
+def test_json_format(project):
+    # when
+    result = _invoke(project, "json")
+
+    # then
+    assert result.exit_code == 0, result.output
+    document = json.loads(result.stdout)
+    assert document["summary"] == {"total": 2, "failures": 1}
+    assert document["results"] == [
+        {
+            "table": "users",
+            "columns": ["email"],
+            "status": "ok",
+            "usage": 1,
+            "index": ["email"],
+            "locations": [
+                {
+                    "module": project,
+                    "qualname": "Repo.by_email",
+                    "file": f"{project}.py",
+                    "line": 5,
+                }
+            ],
+        },
+        {
+            "table": "users",
+            "columns": ["name"],
+            "status": "missing",
+            "usage": 1,
+            "index": None,
+            "locations": [
+                {
+                    "module": project,
+                    "qualname": "Repo.by_name",
+                    "file": f"{project}.py",
+                    "line": 8,
+                }
+            ],
+        },
+    ]
+    assert "Import module" in result.stderr
+
+
+def test_ndjson_format(project):
+    # when
+    result = _invoke(project, "ndjson")
+
+    # then
+    lines = [json.loads(line) for line in result.stdout.splitlines()]
+    assert [line.get("status") for line in lines[:2]] == ["ok", "missing"]
+    assert lines[2] == {"summary": {"total": 2, "failures": 1}}
+
+
+def test_sarif_format_reports_failures_only(project):
+    # when
+    result = _invoke(project, "sarif")
+
+    # then
+    document = json.loads(result.stdout)
+    assert document["version"] == "2.1.0"
+    results = document["runs"][0]["results"]
+    assert [r["ruleId"] for r in results] == ["missing-index"]
+    assert results[0]["locations"][0]["physicalLocation"] == {
+        "artifactLocation": {"uri": f"{project}.py"},
+        "region": {"startLine": 8},
+    }
+    assert results[0]["locations"][0]["logicalLocations"][0]["fullyQualifiedName"] == (
+        f"{project}.Repo.by_name"
+    )
+
+
+def test_junit_format(project):
+    # when
+    result = _invoke(project, "junit")
+
+    # then
+    suite = ET.fromstring(result.stdout)
+    assert (suite.get("tests"), suite.get("failures")) == ("2", "1")
+    failures = [case.get("name") for case in suite if case.find("failure") is not None]
+    assert failures == ["users(name)"]
+
+
+def test_machine_format_requires_patterns_report(project):
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        ["sqlalchemy", "--module", project, "--report", "unused", "--format", "json"],
+    )
+
+    # then
+    assert result.exit_code != 0
+    assert "only supported with --report=patterns" in result.output
+
+
+@pytest.mark.parametrize("extra_args", [[], ["--collector", "static"], ["-j", "2"]])
+def test_text_format_shows_where_missing_patterns_are_declared(project, extra_args):
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            project,
+            "--metadata",
+            f"{project}_meta.metadata",
+            *extra_args,
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    lines = result.output.splitlines()
+    missing = lines.index("[MISSING] users('name',) [usage=1]")
+    assert lines[missing + 1] == f"    at {project}.py:8 ({project}.Repo.by_name)"
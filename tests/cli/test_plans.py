@@ -0,0 +1,185 @@
+import json
+
+from query_patterns.cli.runner.plans import (
+    Plan,
+    explain_pattern,
+    load_plan_cache,
+    parse_postgresql_plan,
+    parse_sqlite_plan,
+    pattern_key,
+    save_plan_cache,
+    schema_hash,
+)
+from query_patterns.pattern import QueryPattern
+
+
+def test_parse_sqlite_plan():
+    assert parse_sqlite_plan(["SEARCH users USING INDEX ix_email (email=?)"]) == Plan(
+        "index", "ix_email"
+    )
+    assert parse_sqlite_plan(
+        ["SEARCH TABLE users USING COVERING INDEX ix_org_email (org_id=?)"]
+    ) == Plan("index", "ix_org_email")
+    assert parse_sqlite_plan(
+        ["SEARCH users USING INTEGER PRIMARY KEY (rowid=?)"]
+    ) == Plan("index", "PRIMARY KEY")
+    assert parse_sqlite_plan(["SCAN users"]) == Plan("seq")
+    assert parse_sqlite_plan(
+        ["SEARCH users USING AUTOMATIC COVERING INDEX (email=?)"]
+    ) == Plan("seq")
+
+
+def test_parse_sqlite_plan_for_ordered_queries():
+    assert parse_sqlite_plan(
+        ["SCAN events USING COVERING INDEX ix_created"], ordered_scan=True
+    ) == Plan("index", "ix_created")
+    assert parse_sqlite_plan(["SCAN events"], ordered_scan=True) == Plan(
+        "index", "PRIMARY KEY"
+    )
+    assert parse_sqlite_plan(
+        ["SCAN events", "USE TEMP B-TREE FOR ORDER BY"], ordered_scan=True
+    ) == Plan("seq")
+    assert parse_sqlite_plan(
+        ["SEARCH events USING INDEX ix_org (org_id=?)", "USE TEMP B-TREE FOR ORDER BY"]
+    ) == Plan("sort", "ix_org")
+
+
+def test_explain_pattern_sqlite_order_only_pattern_has_no_where():
+    # given
+    statements = []
+
+    def run(sql, params):
+        statements.append((sql, params))
+        return [(3, 0, 0, "SCAN events USING INDEX ix_created")]
+
+    # when
+    plan = explain_pattern("sqlite", "events", (), run, order_by=("-created_at",))
+
+    # then
+    assert plan == Plan("index", "ix_created")
+    assert statements == [
+        (
+            'EXPLAIN QUERY PLAN SELECT * FROM "events" ORDER BY "created_at" DESC',
+            [],
+        )
+    ]
+
+
+def test_explain_pattern_sqlite_adds_condition_for_partial_indexes():
+    # given
+    statements = []
+
+    def run(sql, params):
+        statements.append(sql)
+        return [(3, 0, 0, "SEARCH users USING INDEX ix_live_email (email=?)")]
+
+    # when
+    plan = explain_pattern(
+        "sqlite", "users", ("email",), run, placeholder="?", condition="active = 1"
+    )
+
+    # then
+    assert plan == Plan("index", "ix_live_email")
+    assert statements == [
+        'EXPLAIN QUERY PLAN SELECT * FROM "users" WHERE "email" = ? AND (active = 1)'
+    ]
+
+
+def test_pattern_key_includes_order_and_condition():
+    # given
+    plain = QueryPattern("users", ("email",))
+    partial = QueryPattern("users", ("email",), condition="active = 1")
+    ordered = QueryPattern("users", ("email",), order_by=("-id",))
+
+    # then
+    assert len({pattern_key(p) for p in (plain, partial, ordered)}) == 3
+
+
+def test_parse_postgresql_plan():
+    # given
+    bitmap = [
+        {
+            "Plan": {
+                "Node Type": "Bitmap Heap Scan",
+                "Relation Name": "users",
+                "Plans": [
+                    {"Node Type": "Bitmap Index Scan", "Index Name": "ix_users_email"}
+                ],
+            }
+        }
+    ]
+    seq = [{"Plan": {"Node Type": "Seq Scan", "Relation Name": "users"}}]
+
+    # then
+    assert parse_postgresql_plan(bitmap, "users") == Plan("index", "ix_users_email")
+    assert parse_postgresql_plan(seq, "users") == Plan("seq")
+
+
+def test_parse_postgresql_plan_with_schema_qualified_table():
+    # given
+    seq = [{"Plan": {"Node Type": "Seq Scan", "Relation Name": "users"}}]
+    verbose = [
+        {
+            "Plan": {
+                "Node Type": "Seq Scan",
+                "Relation Name": "users",
+                "Schema": "billing",
+            }
+        }
+    ]
+
+    # then
+    assert parse_postgresql_plan(seq, "auth.users") == Plan("seq")
+    assert parse_postgresql_plan(verbose, "auth.users") == Plan("unknown")
+    assert parse_postgresql_plan(verbose, "billing.users") == Plan("seq")
+
+
+def test_explain_pattern_postgresql_uses_generic_plan_without_seqscans():
+    # given
+    statements = []
+
+    def run(sql, params):
+        statements.append(sql)
+        if sql.startswith("EXPLAIN"):
+            return [
+                (
+                    json.dumps(
+                        [
+                            {
+                                "Plan": {
+                                    "Node Type": "Index Scan",
+                                    "Relation Name": "users",
+                                    "Index Name": "ix_a_b",
+                                }
+                            }
+                        ]
+                    ),
+                )
+            ]
+        return []
+
+    # when
+    plan = explain_pattern("postgresql", "users", ("a", "b"), run, name="probe")
+
+    # then
+    assert plan == Plan("index", "ix_a_b")
+    assert statements == [
+        "SET LOCAL enable_seqscan = off",
+        "SET LOCAL plan_cache_mode = force_generic_plan",
+        'PREPARE probe AS SELECT * FROM "users" WHERE "a" = $1 AND "b" = $2',
+        "EXPLAIN (FORMAT JSON) EXECUTE probe(NULL, NULL)",
+        "DEALLOCATE probe",
+    ]
+
+
+def test_plan_cache_is_discarded_when_schema_changes(tmp_path):
+    # given
+    before = schema_hash("sqlite", {("users", ("email",))})
+    after = schema_hash("sqlite", {("users", ("email",)), ("users", ("name",))})
+    save_plan_cache(tmp_path, before, {"users(email)": Plan("index", "ix_email")})
+
+    # when / then
+    assert load_plan_cache(tmp_path, before) == {
+        "users(email)": Plan("index", "ix_email")
+    }
+    assert load_plan_cache(tmp_path, after) == {}
@@ -0,0 +1,127 @@
+import shutil
+import subprocess
+import textwrap
+
+import click.testing
+import pytest
+
+from query_patterns.cli.main import main as cli_main
+
+pytestmark = pytest.mark.skipif(shutil.which("git") is None, reason="git not found")
+
+
+def _git(cwd, *args):
+    subprocess.run(
+        ["git", "-c", "user.name=test", "-c", "user.email=test@example.com", *args],
+        cwd=cwd,
+        check=True,
+        capture_output=True,
+    )
+
+
+def _repo_module(table, column):
+    return textwrap.dedent(
+        f"""
+        from query_patterns import query_pattern
+
+        class Repo:
+            @query_pattern(table="{table}", columns=["{column}"])
+            def find(self): pass
+        """
+    )
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, random_app_label):
+    (tmp_path / f"{random_app_label}_meta.py").write_text(
+        textwrap.dedent(
+            """
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table(
+                "users",
+                metadata,
+                Column("email", Integer),
+                Column("name", Integer),
+                Index("ix_users_email", "email"),
+            )
+            """
+        )
+    )
+    (tmp_path / f"{random_app_label}_old.py").write_text(_repo_module("users", "name"))
+    _git(tmp_path, "init", "-q")
+    _git(tmp_path, "add", ".")
+    _git(tmp_path, "commit", "-q", "-m", "initial")
+
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path, random_app_label
+
+
+def _invoke(label, *args):
+    return click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--metadata",
+            f"{label}_meta.metadata",
+            "--since",
+            "HEAD",
+            *args,
+        ],
+    )
+
+
+@pytest.mark.parametrize("collector", ["import", "static"])
+def test_since_only_checks_changed_modules(project, collector):
+    # given
+    root, label = project
+    (root / f"{label}_new.py").write_text(_repo_module("users", "email"))
+
+    # when
+    result = _invoke(label, "--collector", collector)
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('email',)" in result.stdout
+    # The committed module has a missing index but did not change.
+    assert "name" not in result.stdout
+
+
+def test_since_includes_uncommitted_changes(project):
+    # given
+    root, label = project
+    (root / f"{label}_old.py").write_text(_repo_module("users", "name") + "\n")
+
+    # when
+    result = _invoke(label, "--collector", "static")
+
+    # then
+    assert "[MISSING] users('name',)" in result.stdout
+
+
+def test_since_without_changes_passes(project):
+    # given
+    _, label = project
+
+    # when
+    result = _invoke(label)
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "No @query_pattern declarations changed since HEAD." in result.output
+
+
+def test_since_unknown_ref(project):
+    # given
+    _, label = project
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        ["sqlalchemy", "--metadata", f"{label}_meta.metadata", "--since", "nope"],
+    )
+
+    # then
+    assert result.exit_code == 1
+    assert "git diff failed" in result.stderr
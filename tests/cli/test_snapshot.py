@@ -0,0 +1,179 @@
+import json
+import textwrap
+
+import click.testing
+import pytest
+from sqlalchemy import Column, Index, Integer, MetaData, Table, create_engine
+
+from query_patterns.cli.main import main as cli_main
+from query_patterns.cli.runner.types import IndexDefinition
+from query_patterns.cli.snapshot import (
+    SnapshotError,
+    dump_snapshot,
+    load_snapshot,
+)
+
+
+def test_snapshot_round_trip(tmp_path):
+    # given
+    indexes = {
+        ("users", ("email",)),
+        ("users", ("org_id", "created_at")),
+        ("orders", ("user_id",)),
+    }
+    path = tmp_path / "indexes.json"
+
+    # when
+    dump_snapshot(indexes, path, {"dialect": "postgresql"})
+
+    # then
+    assert load_snapshot(path) == indexes
+    document = json.loads(path.read_text())
+    assert document["version"] == 2
+    assert document["metadata"]["dialect"] == "postgresql"
+    assert document["tables"]["users"] == [["email"], ["org_id", "created_at"]]
+
+
+def test_snapshot_round_trip_keeps_index_properties(tmp_path):
+    # given
+    indexes = {
+        ("users", ("email",)),
+        IndexDefinition(
+            "users", ("org_id", "created_at"), orders=("asc", "desc"), unique=True
+        ),
+        IndexDefinition("users", ("email",), predicate="deleted_at IS NULL"),
+    }
+    path = tmp_path / "indexes.json"
+
+    # when
+    dump_snapshot(indexes, path)
+
+    # then
+    assert load_snapshot(path) == indexes
+    document = json.loads(path.read_text())
+    assert {"columns": ["email"], "predicate": "deleted_at IS NULL"} in document[
+        "tables"
+    ]["users"]
+
+
+def test_load_snapshot_reads_version_1(tmp_path):
+    # given
+    path = tmp_path / "indexes.json"
+    path.write_text(
+        json.dumps(
+            {
+                "format": "query-patterns-snapshot",
+                "version": 1,
+                "tables": {"users": [["email"]]},
+            }
+        )
+    )
+
+    # when
+    indexes = load_snapshot(path)
+
+    # then
+    assert indexes == {("users", ("email",))}
+
+
+def test_load_snapshot_rejects_unknown_version(tmp_path):
+    # given
+    path = tmp_path / "indexes.json"
+    path.write_text(
+        json.dumps({"format": "query-patterns-snapshot", "version": 99, "tables": {}})
+    )
+
+    # when / then
+    with pytest.raises(SnapshotError, match="version"):
+        load_snapshot(path)
+
+
+@pytest.mark.parametrize(
+    "tables, message",
+    [
+        ([["email"]], "'tables' must be an object"),
+        ({"users": {"email": 1}}, "must be a list"),
+        ({"users": [{"columns": ["email"], "sparse": True}]}, "unknown key"),
+        ({"users": [{"orders": ["asc"]}]}, "'columns' must be a list"),
+        ({"users": [{"columns": ["email"], "orders": "asc"}]}, "'orders'"),
+        ({"users": [[1]]}, "columns must be strings"),
+        ({"users": ["email"]}, "expected a column list"),
+        ({"users": [{"columns": ["email"], "method": 5}]}, "'method'"),
+        ({"users": [{"columns": ["email"], "predicate": 7}]}, "'predicate'"),
+        ({"users": [{"columns": ["email"], "unique": "no"}]}, "'unique'"),
+        ({"users": [{"columns": ["email"], "kind": "bogus"}]}, "'kind'"),
+        ({"users": [{"columns": ["email"], "orders": ["up"]}]}, "'asc' / 'desc'"),
+        (
+            {"users": [{"columns": ["org_id", "email"], "orders": ["asc"]}]},
+            "one entry per column",
+        ),
+    ],
+)
+def test_load_snapshot_rejects_malformed_indexes(tmp_path, tables, message):
+    # given
+    path = tmp_path / "indexes.json"
+    path.write_text(
+        json.dumps(
+            {"format": "query-patterns-snapshot", "version": 2, "tables": tables}
+        )
+    )
+
+    # when / then
+    with pytest.raises(SnapshotError, match=message):
+        load_snapshot(path)
+
+
+def test_cli_snapshot_then_check_against_snapshot(tmp_path, monkeypatch):
+    # given
+    (tmp_path / "mod_snapshot.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            class Repo:
+                @query_pattern(table="users", columns=["id"])
+                def foo(self): pass
+
+                @query_pattern(table="users", columns=["email"])
+                def bar(self): pass
+        """)
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    engine_url = f"sqlite:///{tmp_path / 'snapshot.db'}"
+    metadata = MetaData()
+    Table("users", metadata, Column("id", Integer), Index("ix_users_id", "id"))
+    metadata.create_all(create_engine(engine_url))
+    snapshot_file = tmp_path / "indexes.json"
+
+    runner = click.testing.CliRunner()
+
+    # when
+    dumped = runner.invoke(
+        cli_main,
+        [
+            "snapshot",
+            "sqlalchemy",
+            "--engine-url",
+            engine_url,
+            "--output",
+            str(snapshot_file),
+        ],
+    )
+    result = runner.invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            "mod_snapshot",
+            "--source",
+            "snapshot",
+            "--snapshot-file",
+            str(snapshot_file),
+        ],
+    )
+
+    # then
+    assert dumped.exit_code == 0, dumped.output
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',)" in result.output
+    assert "[MISSING] users('email',)" in result.output
@@ -1,23 +1,38 @@
+import sys
 import textwrap
+import threading
+import time
 import click.testing
 
 from query_patterns.cli.main import main as cli_main
+from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+from query_patterns.cli.runner.types import IndexDefinition
 
-from sqlalchemy import MetaData, Table, Column, Integer, Index, create_engine
+from sqlalchemy import (
+    Column,
+    Index,
+    Integer,
+    MetaData,
+    Table,
+    UniqueConstraint,
+    create_engine,
+)
 
 
 def test_cli_sqlalchemy_from_schema_success(tmp_path, monkeypatch):
     # given
     module_file = tmp_path / "mod.py"
     module_file.write_text(
-        textwrap.dedent((
-            """
+        textwrap.dedent(
+            (
+                """
             from query_patterns import query_pattern
             class Repo:
                 @query_pattern(table="users", columns=["id"])
                 def foo(self): pass
             """
-        ))
+            )
+        )
     )
 
     monkeypatch.syspath_prepend(str(tmp_path))
@@ -206,3 +221,502 @@ def test_cli_sqlalchemy_from_db_missing(tmp_path, monkeypatch):
     assert "users('id',)" in result.output
     assert "[usage=1]" in result.output
     assert "[OK]" not in result.output
+
+
+def test_cli_sqlalchemy_with_jobs(tmp_path, monkeypatch):
+    # given
+    for name in ("mod_jobs_a", "mod_jobs_b"):
+        (tmp_path / f"{name}.py").write_text(
+            textwrap.dedent(
+                """
+                from query_patterns import query_pattern
+
+                class Repo:
+                    @query_pattern(table="users", columns=["id"])
+                    def foo(self): pass
+                """
+            )
+        )
+    (tmp_path / "meta_jobs.py").write_text(
+        textwrap.dedent(
+            """
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table("users", metadata, Column("id", Integer), Index("ix_users_id", "id"))
+            """
+        )
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # when
+    runner = click.testing.CliRunner()
+    result = runner.invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--jobs",
+            "2",
+            "--module",
+            "mod_jobs_a",
+            "--module",
+            "mod_jobs_b",
+            "--metadata",
+            "meta_jobs.metadata",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',) [usage=2]" in result.output
+
+
+def test_cli_sqlalchemy_with_jobs_imports_metadata_from_cwd(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given: no PYTHONPATH, cwd is not on sys.path
+    (tmp_path / f"{random_app_label}_repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["id"])
+            def find(): pass
+        """)
+    )
+    (tmp_path / f"{random_app_label}_orm.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table("users", metadata, Column("id", Integer), Index("ix_users_id", "id"))
+        """)
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("PYTHONPATH", raising=False)
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if p not in ("", ".")])
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--jobs",
+            "2",
+            "--module",
+            f"{random_app_label}_repo",
+            "--metadata",
+            f"{random_app_label}_orm.metadata",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',) [usage=1]" in result.output
+
+
+def test_sqlalchemy_per_table_introspection_with_workers(tmp_path):
+    # given
+    engine = create_engine(f"sqlite:///{tmp_path / 'workers.db'}")
+    metadata = MetaData()
+    for i in range(10):
+        Table(
+            f"t{i}",
+            metadata,
+            Column("id", Integer, primary_key=True),
+            Column("a", Integer),
+            Column("b", Integer),
+            Index(f"ix_t{i}_a", "a"),
+            Index(f"ix_t{i}_a_b", "a", "b"),
+        )
+    metadata.create_all(engine)
+
+    # when
+    serial = SQLAlchemyRunner._collect_sqlalchemy_indexes_per_table(engine)
+    concurrent = SQLAlchemyRunner._collect_sqlalchemy_indexes_per_table(
+        engine, workers=4
+    )
+
+    # then
+    assert concurrent == serial
+    assert len(concurrent) == 30
+    assert IndexDefinition("t7", ("id",), kind="primary") in concurrent
+    assert ("t7", ("a", "b")) in concurrent
+
+
+def test_sqlalchemy_schemas_share_the_db_workers_budget(monkeypatch):
+    # given: 4 schemas read with a budget of 2 connections
+    lock = threading.Lock()
+    active = {"now": 0, "peak": 0}
+
+    def collect_schema(engine, workers, tables, schema):
+        with lock:
+            active["now"] += workers
+            active["peak"] = max(active["peak"], active["now"])
+        time.sleep(0.05)
+        with lock:
+            active["now"] -= workers
+        return {(f"{schema}.t", ("a",))}
+
+    monkeypatch.setattr(
+        SQLAlchemyRunner,
+        "_collect_sqlalchemy_schema_indexes",
+        staticmethod(collect_schema),
+    )
+
+    # when
+    indexes = SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(
+        None, workers=2, schemas=["s1", "s2", "s3"]
+    )
+
+    # then
+    assert len(indexes) == 4
+    assert active["peak"] <= 2
+
+
+def test_cli_sqlalchemy_prefix_of_composite_index(tmp_path, monkeypatch):
+    # given
+    (tmp_path / "mod_prefix.py").write_text(
+        textwrap.dedent(
+            """
+            from query_patterns import query_pattern
+
+            class Repo:
+                @query_pattern(table="events", columns=["org_id"])
+                def foo(self): pass
+            """
+        )
+    )
+    (tmp_path / "meta_prefix.py").write_text(
+        textwrap.dedent(
+            """
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table(
+                "events",
+                metadata,
+                Column("org_id", Integer),
+                Column("created_at", Integer),
+                Index("ix_events_org_created", "org_id", "created_at"),
+            )
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        ["sqlalchemy", "--module", "mod_prefix", "--metadata", "meta_prefix.metadata"],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert (
+        "[OK-PREFIX] events('org_id',) [usage=1] [index=('org_id', 'created_at')]"
+        in result.output
+    )
+    assert "[MISSING]" not in result.output
+
+
+def test_cli_sqlalchemy_unused_index_report(tmp_path, monkeypatch):
+    # given
+    (tmp_path / "mod_unused.py").write_text(
+        textwrap.dedent(
+            """
+            from query_patterns import query_pattern
+
+            class Repo:
+                @query_pattern(table="events", columns=["org_id", "created_at"])
+                def foo(self): pass
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    engine_url = f"sqlite:///{tmp_path / 'unused.db'}"
+    metadata = MetaData()
+    Table(
+        "events",
+        metadata,
+        Column("org_id", Integer),
+        Column("created_at", Integer),
+        Column("kind", Integer),
+        Index("ix_events_org", "org_id"),
+        Index("ix_events_org_created", "org_id", "created_at"),
+        Index("ix_events_kind", "kind"),
+    )
+    Table("other", metadata, Column("a", Integer), Index("ix_other_a", "a"))
+    metadata.create_all(create_engine(engine_url))
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            "mod_unused",
+            "--source",
+            "db",
+            "--engine-url",
+            engine_url,
+            "--report",
+            "unused",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[UNUSED] events('kind',) [size=4.0 kB]" in result.output
+    assert (
+        "[UNUSED] [REDUNDANT] events('org_id',) "
+        "[covered-by=('org_id', 'created_at')] [size=4.0 kB]" in result.output
+    )
+    assert "events('org_id', 'created_at')" not in result.output
+    assert "other" not in result.output
+    assert "2 removable index(es)" in result.output
+    assert "2 on events" in result.output
+
+
+def test_cli_sqlalchemy_verify_plans_flags_sequential_scans(tmp_path, monkeypatch):
+    # given: the schema declares two indexes, the database only has one
+    (tmp_path / "mod_plans.py").write_text(
+        textwrap.dedent(
+            """
+            from query_patterns import query_pattern
+
+            class Repo:
+                @query_pattern(table="events", columns=["org_id"])
+                def by_org(self): pass
+
+                @query_pattern(table="events", columns=["kind"])
+                def by_kind(self): pass
+            """
+        )
+    )
+    (tmp_path / "meta_plans.py").write_text(
+        textwrap.dedent(
+            """
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table(
+                "events",
+                metadata,
+                Column("org_id", Integer),
+                Column("kind", Integer),
+                Index("ix_events_org", "org_id"),
+                Index("ix_events_kind", "kind"),
+            )
+            """
+        )
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+
+    engine_url = f"sqlite:///{tmp_path / 'plans.db'}"
+    metadata = MetaData()
+    Table(
+        "events",
+        metadata,
+        Column("org_id", Integer),
+        Column("kind", Integer),
+        Index("ix_events_org", "org_id"),
+    )
+    metadata.create_all(create_engine(engine_url))
+    args = [
+        "sqlalchemy",
+        "--module",
+        "mod_plans",
+        "--metadata",
+        "meta_plans.metadata",
+        "--engine-url",
+        engine_url,
+        "--verify-plans",
+    ]
+
+    # when
+    first = click.testing.CliRunner().invoke(cli_main, args)
+    second = click.testing.CliRunner().invoke(cli_main, args)
+
+    # then
+    for result in (first, second):
+        assert result.exit_code == 0, result.output
+        assert "[OK] events('org_id',) [usage=1] [plan=ix_events_org]" in result.output
+        assert "[SEQ-SCAN] events('kind',) [usage=1] [index=('kind',)]" in result.output
+    assert "Explaining 2 pattern(s) (0 cached)" in first.output
+    assert "Explaining" not in second.output
+    assert (tmp_path / ".query-patterns-cache" / "plans.json").exists()
+
+
+def test_cli_sqlalchemy_verify_plans_explains_order_only_patterns(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given: two order-only patterns, only created_at is indexed in the database
+    (tmp_path / f"{random_app_label}_repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="events", columns=[], order_by=["-created_at"])
+            def latest(): pass
+
+            @query_pattern(table="events", columns=[], order_by=["kind"])
+            def by_kind(): pass
+        """)
+    )
+    (tmp_path / f"{random_app_label}_meta.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table(
+                "events",
+                metadata,
+                Column("id", Integer, primary_key=True),
+                Column("created_at", Integer),
+                Column("kind", Integer),
+                Index("ix_events_created", "created_at"),
+                Index("ix_events_kind", "kind"),
+            )
+        """)
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    engine_url = f"sqlite:///{tmp_path / 'plans.db'}"
+    with create_engine(engine_url).begin() as conn:
+        conn.exec_driver_sql(
+            "CREATE TABLE events (id INTEGER PRIMARY KEY, created_at INTEGER, "
+            "kind INTEGER)"
+        )
+        conn.exec_driver_sql("CREATE INDEX ix_events_created ON events (created_at)")
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            f"{random_app_label}_repo",
+            "--metadata",
+            f"{random_app_label}_meta.metadata",
+            "--engine-url",
+            engine_url,
+            "--verify-plans",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "Cannot explain" not in result.output
+    assert (
+        "[OK] events() order_by(-created_at) [usage=1] [plan=ix_events_created]"
+        in result.output
+    )
+    assert "[SEQ-SCAN] events() order_by(kind) [usage=1]" in result.output
+
+
+def test_cli_sqlalchemy_reports_sort_when_index_misses_order(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given
+    (tmp_path / f"{random_app_label}_repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(
+                table="events", columns=["org_id"], order_by=["-created_at"]
+            )
+            def latest(): pass
+
+            @query_pattern(table="events", columns=["org_id"], order_by=["-id"])
+            def by_id(): pass
+        """)
+    )
+    (tmp_path / f"{random_app_label}_meta.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import Column, Index, Integer, MetaData, Table
+
+            metadata = MetaData()
+            events = Table(
+                "events",
+                metadata,
+                Column("id", Integer),
+                Column("org_id", Integer),
+                Column("created_at", Integer),
+            )
+            Index("ix_org_created", events.c.org_id, events.c.created_at.desc())
+        """)
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            f"{random_app_label}_repo",
+            "--metadata",
+            f"{random_app_label}_meta.metadata",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] events('org_id',) order_by(-created_at) [usage=1]" in result.output
+    assert (
+        "[SORT] events('org_id',) order_by(-id) [usage=1] "
+        "[index=('org_id', 'created_at')]" in result.output
+    )
+
+
+def test_cli_sqlalchemy_constraints_serve_patterns_and_are_never_unused(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given
+    (tmp_path / f"{random_app_label}_repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["id"])
+            @query_pattern(table="users", columns=["email"])
+            @query_pattern(table="users", columns=["org_id"])
+            def find(): pass
+        """)
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    engine_url = f"sqlite:///{tmp_path / 'constraints.db'}"
+    metadata = MetaData()
+    Table(
+        "users",
+        metadata,
+        Column("id", Integer, primary_key=True),
+        Column("email", Integer, unique=True),
+        Column("org_id", Integer),
+        Column("handle", Integer),
+        UniqueConstraint("org_id", "handle"),
+    )
+    metadata.create_all(create_engine(engine_url))
+
+    def invoke(*args):
+        return click.testing.CliRunner().invoke(
+            cli_main,
+            [
+                "sqlalchemy",
+                "--module",
+                f"{random_app_label}_repo",
+                "--source",
+                "db",
+                "--engine-url",
+                engine_url,
+                *args,
+            ],
+        )
+
+    # when
+    patterns = invoke()
+    unused = invoke("--report", "unused")
+
+    # then
+    assert "[MISSING]" not in patterns.output
+    assert "[OK] users('id',)" in patterns.output
+    assert "[OK] users('email',)" in patterns.output
+    assert "[OK-PREFIX] users('org_id',)" in patterns.output
+    assert "No unused or redundant indexes." in unused.output
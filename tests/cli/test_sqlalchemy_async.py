@@ -0,0 +1,174 @@
+import asyncio
+import json
+import textwrap
+
+import click.testing
+import pytest
+from sqlalchemy import Column, Index, Integer, MetaData, Table, create_engine
+
+pytest.importorskip("aiosqlite")
+pytest.importorskip("greenlet")
+
+from query_patterns.cli.main import main as cli_main
+from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+from query_patterns.cli.runner.sqlalchemy_async import (
+    collect_indexes,
+    with_engine,
+)
+
+
+def _create_database(path, with_email_index=True):
+    metadata = MetaData()
+    users = Table("users", metadata, Column("id", Integer), Column("email", Integer))
+    Index("ix_users_id", users.c.id)
+    if with_email_index:
+        Index("ix_users_email", users.c.email)
+    engine = create_engine(f"sqlite:///{path}")
+    metadata.create_all(engine)
+    return engine
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, random_app_label):
+    (tmp_path / f"{random_app_label}.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["id"])
+            @query_pattern(table="users", columns=["email"])
+            def find(): pass
+        """)
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    return tmp_path, random_app_label
+
+
+def test_async_collection_matches_sync_collection(tmp_path):
+    # given
+    sync_engine = _create_database(tmp_path / "app.db")
+    url = f"sqlite+aiosqlite:///{tmp_path / 'app.db'}"
+
+    # when
+    bulk = asyncio.run(with_engine(url, collect_indexes))
+    per_table = asyncio.run(
+        with_engine(
+            url,
+            lambda engine: collect_indexes(engine, workers=2, tables={"users"}),
+        )
+    )
+
+    # then
+    assert (
+        bulk
+        == per_table
+        == SQLAlchemyRunner._collect_sqlalchemy_indexes_from_db(sync_engine)
+        == {("users", ("id",)), ("users", ("email",))}
+    )
+
+
+def test_async_collection_keeps_connections_within_workers(monkeypatch):
+    # given: no bulk catalog query, so every schema is inspected per table
+    active = peak = 0
+
+    class Connection:
+        async def __aenter__(self):
+            nonlocal active, peak
+            active += 1
+            peak = max(peak, active)
+            await asyncio.sleep(0.01)
+            return self
+
+        async def __aexit__(self, *exc_info):
+            nonlocal active
+            active -= 1
+
+        async def run_sync(self, fn, *args):
+            return fn(self, *args)
+
+    class Engine:
+        def connect(self):
+            return Connection()
+
+    monkeypatch.setattr(
+        SQLAlchemyRunner, "_bulk_indexes", staticmethod(lambda *args: None)
+    )
+    monkeypatch.setattr(
+        SQLAlchemyRunner,
+        "_table_names",
+        staticmethod(lambda conn, tables, schema: ["a", "b", "c", "d"]),
+    )
+    monkeypatch.setattr(
+        SQLAlchemyRunner,
+        "_inspect_indexes",
+        staticmethod(
+            lambda conn, names, schema: {(f"{schema}.{n}", ("id",)) for n in names}
+        ),
+    )
+
+    # when
+    indexes = asyncio.run(
+        collect_indexes(Engine(), workers=2, schemas=["s1", "s2", "s3"])
+    )
+
+    # then
+    assert len(indexes) == 16
+    assert peak == 2
+
+
+def test_cli_async_engine_url_with_verify_plans(project):
+    # given
+    root, label = project
+    _create_database(root / "app.db", with_email_index=False)
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            label,
+            "--source",
+            "db",
+            "--engine-url",
+            f"sqlite+aiosqlite:///{root / 'app.db'}",
+            "--verify-plans",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',) [usage=1] [plan=ix_users_id]" in result.stdout
+    assert "[MISSING] users('email',)" in result.stdout
+
+
+def test_cli_fleet_of_async_and_sync_urls(project):
+    # given
+    root, label = project
+    _create_database(root / "a.db")
+    _create_database(root / "b.db", with_email_index=False)
+    (root / "urls.txt").write_text(
+        f"a sqlite+aiosqlite:///{root / 'a.db'}\nb sqlite:///{root / 'b.db'}\n"
+    )
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--module",
+            label,
+            "--engine-url-file",
+            "urls.txt",
+            "--format",
+            "json",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    report = json.loads(result.stdout)
+    assert {r["columns"][0]: r["databases"] for r in report["results"]} == {
+        "id": {"a": "ok", "b": "ok"},
+        "email": {"a": "ok", "b": "missing"},
+    }
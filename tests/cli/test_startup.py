@@ -0,0 +1,58 @@
+import json
+import subprocess
+import sys
+
+import pytest
+
+# Seconds for importing the CLI and rendering --help, best of a few runs.
+STARTUP_BUDGET = 0.1
+
+HEAVY_MODULES = ["sqlalchemy", "django", "query_patterns.cli.runner.base"]
+
+SCRIPT = """
+import json, sys, time
+started = time.perf_counter()
+from query_patterns.cli.main import main
+try:
+    main(sys.argv[1:], standalone_mode=False)
+except SystemExit:
+    pass
+elapsed = time.perf_counter() - started
+print(json.dumps({"elapsed": elapsed, "modules": sorted(sys.modules)}))
+"""
+
+
+def _startup(*args):
+    result = subprocess.run(
+        [sys.executable, "-c", SCRIPT, *args],
+        capture_output=True,
+        text=True,
+        check=True,
+    )
+    return json.loads(result.stdout.splitlines()[-1])
+
+
+@pytest.mark.parametrize(
+    "args",
+    [
+        ["--help"],
+        ["sqlalchemy", "--help"],
+        ["django", "--help"],
+        ["snapshot", "sqlalchemy", "--help"],
+    ],
+)
+def test_help_does_not_import_orms_or_runners(args):
+    # when
+    startup = _startup(*args)
+
+    # then
+    loaded = set(startup["modules"])
+    assert [m for m in HEAVY_MODULES if m in loaded] == []
+
+
+def test_help_starts_within_budget():
+    # when
+    elapsed = min(_startup("--help")["elapsed"] for _ in range(3))
+
+    # then
+    assert elapsed < STARTUP_BUDGET
@@ -0,0 +1,466 @@
+import sys
+import textwrap
+
+import click.testing
+
+from query_patterns.cli.collector.cache import DEFAULT_CACHE_DIR, ExtractCache
+from query_patterns.cli.collector.static import StaticCollector, extract_file
+from query_patterns.cli.main import main as cli_main
+from query_patterns.cli.runner.base import BaseRunner
+
+
+class DummyRunner(BaseRunner):
+    pass
+
+
+def _write_project(root, package):
+    pkg = root / package
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "models.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import MetaData, Table, Column, Integer, String
+            from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+            metadata = MetaData()
+
+            orders = Table(
+                "orders",
+                metadata,
+                Column("id", Integer, primary_key=True),
+                Column("user_id", Integer),
+            )
+
+            class Base(DeclarativeBase):
+                pass
+
+            class User(Base):
+                __tablename__ = "users"
+
+                id: Mapped[int] = mapped_column(primary_key=True)
+                email: Mapped[str] = mapped_column(String)
+        """)
+    )
+    (pkg / "repo.py").write_text(
+        textwrap.dedent(f"""
+            from query_patterns import query_pattern
+            from {package}.models import User, orders
+            from {package} import models
+
+            ORDERS = "orders"
+
+            @query_pattern(table=orders, columns=[orders.c.user_id])
+            def find_orders(user_id):
+                pass
+
+            class Repo:
+                @query_pattern(table=User, columns=[User.email])
+                def by_email(self):
+                    pass
+
+                @query_pattern(table="users", columns=["id"])
+                @query_pattern(table=models.User, columns=(User.id, User.email))
+                def by_id(self):
+                    pass
+
+            class OtherRepo:
+                @query_pattern(table=ORDERS, columns=["user_id"])
+                def by_user(self):
+                    pass
+        """)
+    )
+
+
+def test_static_collector_matches_import_collector(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given
+    _write_project(tmp_path, random_app_label)
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    runner = DummyRunner()
+    runner.module = (f"{random_app_label}.repo",)
+
+    # when
+    static_patterns, static_counts = runner._collect_query_patterns_statically()
+    modules = runner._import_module_from_cwd(runner.module)
+    import_patterns, import_counts = runner._collect_query_patterns(modules)
+
+    # then
+    assert static_patterns == import_patterns
+    assert static_counts == import_counts
+    assert [(p.table, p.columns, n) for p, n in static_counts.items()] == [
+        ("orders", ("user_id",), 2),
+        ("users", ("email",), 1),
+        ("users", ("id", "email"), 1),
+        ("users", ("id",), 1),
+    ]
+
+
+def test_static_collector_qualified_tables_match_import_collector(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given
+    pkg = tmp_path / random_app_label
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "models.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import MetaData, Table, Column, Integer
+            from sqlalchemy.orm import DeclarativeBase, Mapped, mapped_column
+
+            metadata = MetaData()
+
+            invoices = Table(
+                "invoices", metadata, Column("number", Integer), schema="billing"
+            )
+
+            class Base(DeclarativeBase):
+                pass
+
+            class Entry(Base):
+                __tablename__ = "entries"
+                __table_args__ = ({"schema": "ledger"},)
+
+                id: Mapped[int] = mapped_column(primary_key=True)
+        """)
+    )
+    (pkg / "repo.py").write_text(
+        textwrap.dedent(f"""
+            from query_patterns import query_pattern
+            from {random_app_label}.models import Entry, invoices
+
+            @query_pattern(table=invoices, columns=["number"])
+            @query_pattern(table=Entry, columns=[Entry.id], database="replica")
+            @query_pattern(table=Entry.__tablename__, columns=["id"])
+            def find(): pass
+        """)
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    runner = DummyRunner()
+    runner.module = (f"{random_app_label}.repo",)
+
+    # when
+    static_patterns, _ = runner._collect_query_patterns_statically()
+    modules = runner._import_module_from_cwd(runner.module)
+    import_patterns, _ = runner._collect_query_patterns(modules)
+
+    # then
+    assert static_patterns == import_patterns
+    assert [p.table for p in static_patterns] == [
+        "entries",
+        "replica:ledger.entries",
+        "billing.invoices",
+    ]
+
+
+def test_static_collector_order_by_and_condition_match_import_collector(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given
+    pkg = tmp_path / random_app_label
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "repo.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+
+            from query_patterns import query_pattern
+
+            events = Table(
+                "events",
+                MetaData(),
+                Column("org_id", Integer),
+                Column("created_at", DateTime),
+            )
+
+            @query_pattern(
+                table=events,
+                columns=[events.c.org_id],
+                order_by=[events.c.created_at.desc(), "id"],
+                condition="deleted_at IS NULL",
+            )
+            @query_pattern(table=events, columns=[], order_by=["-created_at"])
+            def latest(): pass
+        """)
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+    runner = DummyRunner()
+    runner.module = (f"{random_app_label}.repo",)
+
+    # when
+    static_patterns, _ = runner._collect_query_patterns_statically()
+    modules = runner._import_module_from_cwd(runner.module)
+    import_patterns, _ = runner._collect_query_patterns(modules)
+
+    # then
+    assert static_patterns == import_patterns
+    assert {(p.columns, p.order_by, p.condition) for p in static_patterns} == {
+        (("org_id",), ("-created_at", "id"), "deleted_at IS NULL"),
+        ((), ("-created_at",), None),
+    }
+
+
+def test_static_collector_does_not_import(tmp_path):
+    # given
+    path = tmp_path / "repo.py"
+    path.write_text(
+        textwrap.dedent("""
+            import query_patterns as qp
+
+            raise RuntimeError("must not be imported")
+
+            @qp.query_pattern(table="users", columns=["email"])
+            def find():
+                pass
+        """)
+    )
+
+    # when
+    collector = StaticCollector([extract_file(path, "repo")])
+    patterns, _ = collector.collect(["repo"])
+
+    # then
+    assert [(p.table, p.columns) for p in patterns] == [("users", ("email",))]
+    assert collector.errors == []
+
+
+def test_static_collector_reports_unresolved_table(tmp_path):
+    # given
+    path = tmp_path / "repo.py"
+    path.write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+            from somewhere import Unknown
+
+            @query_pattern(table=Unknown, columns=["id"])
+            def find():
+                pass
+        """)
+    )
+
+    # when
+    collector = StaticCollector([extract_file(path, "repo")])
+    patterns, _ = collector.collect(["repo"])
+
+    # then
+    assert patterns == []
+    assert "cannot resolve table Unknown" in collector.errors[0]
+
+
+def test_static_collector_django_default_table_name(tmp_path):
+    # given
+    app = tmp_path / "shop"
+    app.mkdir()
+    (app / "models.py").write_text(
+        textwrap.dedent("""
+            from django.db import models
+
+            class Product(models.Model):
+                sku = models.CharField(max_length=32)
+        """)
+    )
+    (app / "repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+            from .models import Product
+
+            @query_pattern(table=Product, columns=[Product.sku])
+            def find():
+                pass
+        """)
+    )
+
+    # when
+    collector = StaticCollector(
+        [
+            extract_file(app / "models.py", "shop.models"),
+            extract_file(app / "repo.py", "shop.repo"),
+        ]
+    )
+    patterns, _ = collector.collect(["shop.repo"])
+
+    # then
+    assert [(p.table, p.columns) for p in patterns] == [("shop_product", ("sku",))]
+
+
+def test_static_collector_django_app_label_of_models_package(tmp_path):
+    # given
+    models = tmp_path / "shop" / "models"
+    models.mkdir(parents=True)
+    (models / "product.py").write_text(
+        textwrap.dedent("""
+            from django.db import models
+
+            class Product(models.Model):
+                sku = models.CharField(max_length=32)
+        """)
+    )
+    (tmp_path / "shop" / "repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+            from .models.product import Product
+
+            @query_pattern(table=Product, columns=[Product.sku])
+            def find():
+                pass
+        """)
+    )
+
+    # when
+    collector = StaticCollector(
+        [
+            extract_file(models / "product.py", "shop.models.product"),
+            extract_file(tmp_path / "shop" / "repo.py", "shop.repo"),
+        ]
+    )
+    patterns, _ = collector.collect(["shop.repo"])
+
+    # then
+    assert [(p.table, p.columns) for p in patterns] == [("shop_product", ("sku",))]
+
+
+def test_cli_sqlalchemy_static_collector(tmp_path, monkeypatch):
+    # given
+    (tmp_path / "mod_static.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            class Repo:
+                @query_pattern(table="users", columns=["id"])
+                def foo(self): pass
+        """)
+    )
+    (tmp_path / "meta_static.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table("users", metadata, Column("id", Integer), Index("ix_users_id", "id"))
+        """)
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--collector",
+            "static",
+            "--metadata",
+            "meta_static.metadata",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',)" in result.output
+
+
+def test_cli_static_collector_imports_metadata_from_cwd(
+    tmp_path, monkeypatch, random_app_label
+):
+    # given: no PYTHONPATH, cwd is not on sys.path
+    (tmp_path / f"{random_app_label}_repo.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["id"])
+            def find(): pass
+        """)
+    )
+    (tmp_path / f"{random_app_label}_orm.py").write_text(
+        textwrap.dedent("""
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table("users", metadata, Column("id", Integer), Index("ix_users_id", "id"))
+        """)
+    )
+    monkeypatch.chdir(tmp_path)
+    monkeypatch.delenv("PYTHONPATH", raising=False)
+    monkeypatch.setattr(sys, "path", [p for p in sys.path if p not in ("", ".")])
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--collector",
+            "static",
+            "--metadata",
+            f"{random_app_label}_orm.metadata",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 0, result.output
+    assert "[OK] users('id',)" in result.output
+
+
+def test_extract_cache_reparses_only_changed_files(tmp_path):
+    # given
+    repo = tmp_path / "repo.py"
+    repo.write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["id"])
+            def find():
+                pass
+        """)
+    )
+    other = tmp_path / "other.py"
+    other.write_text("")
+
+    cache = ExtractCache(tmp_path / DEFAULT_CACHE_DIR)
+    cache.load()
+    cache.get(repo, "repo")
+    cache.get(other, "other")
+    cache.save()
+
+    repo.write_text(repo.read_text().replace('"id"', '"email"'))
+
+    # when
+    cache = ExtractCache(tmp_path / DEFAULT_CACHE_DIR)
+    cache.load()
+    extracts = [cache.get(repo, "repo"), cache.get(other, "other")]
+    patterns, _ = StaticCollector(extracts).collect(["repo"])
+
+    # then
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert [(p.table, p.columns) for p in patterns] == [("users", ("email",))]
+
+
+def test_extract_cache_round_trip_keeps_declarations(tmp_path):
+    # given
+    repo = tmp_path / "repo.py"
+    repo.write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+            from models import User
+
+            @query_pattern(table=User, columns=[User.email])
+            def find():
+                pass
+        """)
+    )
+    models = tmp_path / "models.py"
+    models.write_text("class User:\n    __tablename__ = 'users'\n")
+
+    cache = ExtractCache(tmp_path / DEFAULT_CACHE_DIR)
+    cache.get(repo, "repo")
+    cache.get(models, "models")
+    cache.save()
+
+    # when
+    cache = ExtractCache(tmp_path / DEFAULT_CACHE_DIR)
+    cache.load()
+    extracts = [cache.get(repo, "repo"), cache.get(models, "models")]
+    patterns, _ = StaticCollector(extracts).collect(["repo"])
+
+    # then
+    assert cache.misses == 0
+    assert [(p.table, p.columns) for p in patterns] == [("users", ("email",))]
@@ -0,0 +1,289 @@
+import sys
+import textwrap
+import time
+
+import click.testing
+import pytest
+
+from query_patterns import registry
+from query_patterns.cli.main import main as cli_main
+from query_patterns.cli.runner.sqlalchemy import SQLAlchemyRunner
+from query_patterns.cli.runner.watch import WatchSession
+from query_patterns.cli.watcher import InotifyWatcher, PollingWatcher
+
+
+def _repo_module(*columns):
+    methods = "".join(
+        f"""
+            @query_pattern(table="users", columns=["{column}"])
+            def by_{column}(self): pass
+        """
+        for column in columns
+    )
+    return textwrap.dedent(
+        """
+        from query_patterns import query_pattern
+
+        class Repo:
+        """
+    ) + textwrap.indent(textwrap.dedent(methods), "    ")
+
+
+@pytest.fixture
+def project(tmp_path, monkeypatch, random_app_label):
+    (tmp_path / f"{random_app_label}_meta.py").write_text(
+        textwrap.dedent(
+            """
+            from sqlalchemy import MetaData, Table, Column, Integer, Index
+            metadata = MetaData()
+            Table(
+                "users",
+                metadata,
+                Column("email", Integer),
+                Column("name", Integer),
+                Index("ix_users_email", "email"),
+            )
+            """
+        )
+    )
+    (tmp_path / f"{random_app_label}_repo.py").write_text(_repo_module("name"))
+    monkeypatch.syspath_prepend(str(tmp_path))
+    monkeypatch.chdir(tmp_path)
+    yield tmp_path, random_app_label
+    sys.modules.pop(f"{random_app_label}_repo", None)
+
+
+def _session(label, collector):
+    runner = SQLAlchemyRunner(
+        module=(),
+        source="schema",
+        metadata=f"{label}_meta.metadata",
+        engine_url=None,
+        quiet=False,
+        collector=collector,
+    )
+    registry.set_enabled(True)
+    return WatchSession(runner)
+
+
+@pytest.mark.parametrize("collector", ["import", "static"])
+def test_watch_session_reports_status_changes(project, collector, capsys):
+    # given
+    root, label = project
+    session = _session(label, collector)
+    session.start()
+    assert "[MISSING] users('name',)" in capsys.readouterr().out
+    repo = root / f"{label}_repo.py"
+
+    # when
+    repo.write_text(_repo_module("email"))
+    changes = session.apply({repo})
+
+    # then
+    out = capsys.readouterr().out
+    assert changes == 2
+    assert "[OK] users('email',)" in out
+    assert "[REMOVED] users('name',)" in out
+    assert "1 file(s) changed, 2 status change(s)" in out
+
+
+@pytest.mark.parametrize("collector", ["import", "static"])
+def test_watch_session_new_and_deleted_modules(project, collector, capsys):
+    # given
+    root, label = project
+    session = _session(label, collector)
+    session.start()
+    capsys.readouterr()
+    new = root / f"{label}_new.py"
+
+    # when
+    new.write_text(_repo_module("name", "email"))
+    added = session.apply({new})
+    new.unlink()
+    removed = session.apply({new})
+
+    # then
+    out = capsys.readouterr().out
+    # users('name',) was already declared with the same status.
+    assert added == 1
+    assert "[OK] users('email',)" in out
+    assert removed == 1
+    assert "[REMOVED] users('email',)" in out
+    sys.modules.pop(f"{label}_new", None)
+
+
+def test_watch_session_keeps_declarations_of_broken_module(project, capsys):
+    # given
+    root, label = project
+    session = _session(label, "import")
+    session.start()
+    capsys.readouterr()
+    repo = root / f"{label}_repo.py"
+
+    # when
+    repo.write_text("def broken(:\n")
+    changes = session.apply({repo})
+
+    # then
+    assert changes == 0
+    assert f"[WARN] Failed to import {label}_repo" in capsys.readouterr().err
+
+
+def test_watch_session_static_rescans_importers_of_changed_module(project, capsys):
+    # given: the repo resolves its table through a model in another module
+    root, label = project
+    models = root / f"{label}_models.py"
+    model = textwrap.dedent(
+        """
+        class User(Base):
+            __tablename__ = "{table}"
+        """
+    )
+    models.write_text(model.format(table="users"))
+    (root / f"{label}_repo.py").write_text(
+        textwrap.dedent(
+            f"""
+            from query_patterns import query_pattern
+            from {label}_models import User
+
+            @query_pattern(table=User, columns=[User.name])
+            def find(): pass
+            """
+        )
+    )
+    session = _session(label, "static")
+    session.start()
+    assert "[MISSING] users('name',)" in capsys.readouterr().out
+
+    # when
+    models.write_text(model.format(table="people"))
+    changes = session.apply({models})
+
+    # then
+    out = capsys.readouterr().out
+    assert changes == 2
+    assert "[MISSING] people('name',)" in out
+    assert "[REMOVED] users('name',)" in out
+
+
+def test_watch_session_reimports_importers_of_changed_module(project, capsys):
+    # given: the repo takes its table name from a private module
+    root, label = project
+    names = root / f"_{label}_names.py"
+    names.write_text('TABLE = "users"\n')
+    (root / f"{label}_repo.py").write_text(
+        textwrap.dedent(
+            f"""
+            from query_patterns import query_pattern
+            from _{label}_names import TABLE
+
+            @query_pattern(table=TABLE, columns=["name"])
+            def find(): pass
+            """
+        )
+    )
+    session = _session(label, "import")
+    session.start()
+    assert "[MISSING] users('name',)" in capsys.readouterr().out
+
+    # when
+    names.write_text('TABLE = "people"\n')
+    changes = session.apply({names})
+
+    # then
+    out = capsys.readouterr().out
+    assert changes == 2
+    assert "[MISSING] people('name',)" in out
+    assert "[REMOVED] users('name',)" in out
+    sys.modules.pop(f"_{label}_names", None)
+
+
+def test_watch_session_reimports_same_size_edit_without_deleting_bytecode(
+    project, capsys
+):
+    # given
+    root, label = project
+    session = _session(label, "import")
+    session.start()
+    capsys.readouterr()
+    repo = root / f"{label}_repo.py"
+    bytecode = list((root / "__pycache__").glob(f"{label}_repo.*.pyc"))
+
+    # when: same size, within the same second
+    repo.write_text(_repo_module("mail"))
+    changes = session.apply({repo})
+
+    # then
+    out = capsys.readouterr().out
+    assert changes == 2
+    assert "[MISSING] users('mail',)" in out
+    assert "[REMOVED] users('name',)" in out
+    assert all(path.exists() for path in bytecode)
+
+
+def test_watch_rejects_machine_formats(project):
+    # given
+    _, label = project
+
+    # when
+    result = click.testing.CliRunner().invoke(
+        cli_main,
+        [
+            "sqlalchemy",
+            "--metadata",
+            f"{label}_meta.metadata",
+            "--format",
+            "json",
+            "--watch",
+        ],
+    )
+
+    # then
+    assert result.exit_code == 1
+    assert "--watch cannot be combined with --format=json" in result.stderr
+
+
+def test_polling_watcher_reports_changed_files(tmp_path):
+    # given
+    (tmp_path / "a.py").write_text("a = 1\n")
+    (tmp_path / "b.py").write_text("b = 1\n")
+    (tmp_path / ".venv").mkdir()
+    watcher = PollingWatcher(tmp_path, exclude={".venv"}, interval=0.01)
+
+    # when
+    (tmp_path / "a.py").write_text("a = 22\n")
+    (tmp_path / "b.py").unlink()
+    (tmp_path / "c.py").write_text("c = 1\n")
+    (tmp_path / ".venv" / "d.py").write_text("d = 1\n")
+    changed = watcher.wait(timeout=1)
+
+    # then
+    assert changed == {tmp_path / "a.py", tmp_path / "b.py", tmp_path / "c.py"}
+    assert watcher.wait(timeout=0.05) == set()
+
+
+@pytest.mark.skipif(
+    not sys.platform.startswith("linux"), reason="inotify is Linux-only"
+)
+def test_inotify_watcher_reports_changed_files(tmp_path):
+    # given
+    (tmp_path / "a.py").write_text("a = 1\n")
+    try:
+        watcher = InotifyWatcher(tmp_path, exclude={".venv"})
+    except OSError:
+        pytest.skip("inotify is not available")
+
+    # when
+    try:
+        (tmp_path / "a.py").write_text("a = 2\n")
+        (tmp_path / "pkg").mkdir()
+        time.sleep(0.01)
+        (tmp_path / "pkg" / "b.py").write_text("b = 1\n")
+        (tmp_path / "notes.txt").write_text("")
+        changed = watcher.wait(timeout=1)
+        changed |= watcher.wait(timeout=0.2)
+    finally:
+        watcher.close()
+
+    # then
+    assert changed == {tmp_path / "a.py", tmp_path / "pkg" / "b.py"}
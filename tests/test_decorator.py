@@ -137,6 +137,23 @@ def test_query_pattern_with_sqlalchemy_table():
     assert patterns[0].columns == ("id",)
 
 
+def test_query_pattern_qualifies_schema_and_database():
+    from sqlalchemy import MetaData, Table, Column, Integer
+
+    metadata = MetaData()
+    invoices = Table("invoices", metadata, Column("id", Integer), schema="billing")
+
+    @query_pattern(table=invoices, columns=["id"])
+    @query_pattern(table="users", columns=["id"], database="replica")
+    def foo():
+        pass
+
+    assert [p.table for p in get_patterns(foo)] == [
+        "replica:users",
+        "billing.invoices",
+    ]
+
+
 def setup_django():
     from django.conf import settings
     from django.apps import apps
@@ -255,3 +272,37 @@ def test_columns_invalid_type():
 
     with pytest.raises(TypeError):
         QueryPattern(table="users", columns=(NotAColumn(),))
+
+
+def test_order_by_and_condition():
+    from sqlalchemy import Column, DateTime, Integer, MetaData, Table
+
+    events = Table(
+        "events",
+        MetaData(),
+        Column("org_id", Integer),
+        Column("created_at", DateTime),
+    )
+
+    @query_pattern(
+        table=events,
+        columns=[events.c.org_id],
+        order_by=[events.c.created_at.desc(), "id"],
+        condition="deleted_at IS NULL",
+    )
+    @query_pattern(table=events, columns=[], order_by=["-created_at"])
+    def foo():
+        pass
+
+    order_only, filtered = get_patterns(foo)
+    assert filtered.columns == ("org_id",)
+    assert filtered.order_by == ("-created_at", "id")
+    assert filtered.condition == "deleted_at IS NULL"
+    assert filtered != QueryPattern(table="events", columns=["org_id"])
+    assert order_only.columns == ()
+    assert order_only.order_by == ("-created_at",)
+
+
+def test_empty_columns_without_order_by():
+    with pytest.raises(ValueError):
+        query_pattern(table="users", columns=[])
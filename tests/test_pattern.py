@@ -0,0 +1,61 @@
+import pickle
+from dataclasses import FrozenInstanceError
+
+import pytest
+from sqlalchemy import Column, Integer, MetaData, Table
+
+from query_patterns.pattern import QueryPattern
+
+
+def test_equal_patterns_are_interned():
+    # when
+    a = QueryPattern(table="users", columns=["id", "email"])
+    b = QueryPattern(table="users", columns=("id", "email"))
+
+    # then
+    assert a is b
+    assert hash(a) == hash(("users", ("id", "email")))
+    assert QueryPattern(table="users", columns=["id"]) != a
+
+
+def test_pattern_is_immutable():
+    # given
+    pattern = QueryPattern(table="users", columns=["id"])
+
+    # then
+    with pytest.raises(FrozenInstanceError):
+        pattern.table = "orders"
+    with pytest.raises(AttributeError):
+        pattern.extra = 1
+
+
+def test_pattern_repr_and_pickle_round_trip():
+    # given
+    pattern = QueryPattern(table="users", columns=["id"])
+
+    # then
+    assert repr(pattern) == "QueryPattern(table='users', columns=('id',))"
+    assert pickle.loads(pickle.dumps(pattern)) is pattern
+
+
+def test_resolver_cache_falls_back_when_instance_differs():
+    # given: plain classes share type(), but only one has __tablename__
+    class Orm:
+        __tablename__ = "orm_users"
+
+    class Model:
+        class _meta:
+            db_table = "django_users"
+
+    core = Table("core_users", MetaData(), Column("id", Integer))
+
+    # when
+    patterns = [
+        QueryPattern(table=Orm, columns=[core.c.id]),
+        QueryPattern(table=Model, columns=["id"]),
+        QueryPattern(table=core, columns=["id"]),
+    ]
+
+    # then
+    assert [p.table for p in patterns] == ["orm_users", "django_users", "core_users"]
+    assert patterns[0].columns == ("id",)
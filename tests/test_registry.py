@@ -0,0 +1,180 @@
+import secrets
+import sys
+import textwrap
+import types
+
+import pytest
+
+from query_patterns import registry
+from query_patterns.decorator import query_pattern
+from query_patterns.pattern import QueryPattern
+from query_patterns.registry import PatternRegistry
+from query_patterns.utils import get_patterns, iter_module_patterns
+
+
+@pytest.fixture
+def enabled():
+    yield
+    registry.set_enabled(True)
+
+
+def test_register_interns_patterns_and_dedupes_declarations():
+    # given
+    reg = PatternRegistry()
+    a = QueryPattern(table="users", columns=("email",))
+    b = QueryPattern(table="users", columns=("email",))
+
+    # when
+    first = reg.register(a, "app.repo", "Repo.find")
+    again = reg.register(b, "app.repo", "Repo.find")
+    other = reg.register(b, "app.other", "find")
+
+    # then
+    assert (first, again, other) == (True, False, True)
+    assert reg.patterns == [a]
+    assert [(p, d.module, d.qualname) for p, d in reg.iter_declarations()] == [
+        (a, "app.repo", "Repo.find"),
+        (a, "app.other", "find"),
+    ]
+
+
+def test_discard_module_allows_registering_again():
+    # given
+    reg = PatternRegistry()
+    pattern = QueryPattern(table="users", columns=("email",))
+    reg.register(pattern, "app.repo", "find")
+
+    # when
+    reg.discard_module("app.repo")
+
+    # then
+    assert list(reg.iter_declarations()) == []
+    assert reg.register(pattern, "app.repo", "find") is True
+
+
+def test_disabled_decorator_is_a_no_op(enabled):
+    # given
+    registry.set_enabled(False)
+
+    # when
+    @query_pattern(table="users", columns=["email"])
+    def find():
+        pass
+
+    # then
+    assert not hasattr(find, "__query_patterns__")
+
+
+def test_redefined_function_keeps_its_patterns():
+    # given
+    def define():
+        @query_pattern(table="users", columns=["email"])
+        def find():
+            pass
+
+        return find
+
+    # when
+    first, second = define(), define()
+
+    # then
+    assert (
+        get_patterns(first)
+        == get_patterns(second)
+        == [QueryPattern(table="users", columns=("email",))]
+    )
+
+
+def test_iter_module_patterns_reads_declarations_made_in_module(tmp_path, monkeypatch):
+    # given
+    random_app_label = f"app_{secrets.token_hex(4)}"
+    pkg = tmp_path / random_app_label
+    pkg.mkdir()
+    (pkg / "__init__.py").write_text("")
+    (pkg / "base.py").write_text(
+        textwrap.dedent("""
+            from query_patterns import query_pattern
+
+            @query_pattern(table="users", columns=["email"])
+            def find_by_email():
+                pass
+        """)
+    )
+    (pkg / "repo.py").write_text(
+        textwrap.dedent(f"""
+            from query_patterns import query_pattern
+            from {random_app_label}.base import find_by_email
+
+            def make():
+                @query_pattern(table="orders", columns=["user_id"])
+                def nested():
+                    pass
+                return nested
+
+            make()
+        """)
+    )
+    monkeypatch.syspath_prepend(str(tmp_path))
+
+    # when
+    __import__(f"{random_app_label}.repo")
+    repo = sys.modules[f"{random_app_label}.repo"]
+
+    # then: the imported function is counted in base only
+    assert list(iter_module_patterns(repo)) == [
+        QueryPattern(table="orders", columns=("user_id",))
+    ]
+
+
+def test_iter_module_patterns_fallback_skips_imported_and_inherited_functions():
+    # given: a module that is not in the registry
+    module = types.ModuleType(f"app_{secrets.token_hex(4)}.repo")
+
+    @query_pattern(table="users", columns=["email"])
+    def imported():
+        pass
+
+    @query_pattern(table="users", columns=["name"])
+    def local():
+        pass
+
+    class Base:
+        @query_pattern(table="orders", columns=["user_id"])
+        def by_user(self):
+            pass
+
+    class Repo(Base):
+        @query_pattern(table="orders", columns=["status"])
+        def by_status(self):
+            pass
+
+    local.__module__ = Repo.__module__ = module.__name__
+    module.imported, module.local, module.Repo = imported, local, Repo
+
+    # when
+    patterns = list(iter_module_patterns(module))
+
+    # then
+    assert patterns == [
+        QueryPattern(table="users", columns=("name",)),
+        QueryPattern(table="orders", columns=("status",)),
+    ]
+
+
+def test_declaration_records_file_and_line_from_code_object():
+    # given
+    @query_pattern(table="users", columns=["location"])
+    def find():
+        pass
+
+    # when
+    [(_, declaration)] = [
+        (p, d)
+        for p, d in registry.registry.iter_declarations([__name__])
+        if d.qualname.endswith("find") and p.columns == ("location",)
+    ]
+
+    # then
+    assert declaration.file == __file__
+    assert declaration.line == find.__code__.co_firstlineno
+    assert declaration.module is sys.intern(__name__)
@@ -0,0 +1,196 @@
+import asyncio
+import threading
+
+import pytest
+from sqlalchemy import create_engine, text
+
+from query_patterns import runtime
+from query_patterns.decorator import query_pattern
+from query_patterns.utils import get_patterns
+
+
+@pytest.fixture
+def capture():
+    runtime.enable_capture(sample_rate=1.0, buffer_size=8)
+    runtime.drain()
+    yield
+    runtime.disable_capture()
+    runtime.drain()
+
+
+@pytest.fixture
+def engine(tmp_path):
+    engine = create_engine(f"sqlite:///{tmp_path / 'runtime.db'}")
+    with engine.begin() as conn:
+        conn.execute(text("CREATE TABLE users (id INTEGER, email TEXT, name TEXT)"))
+    runtime.install_sqlalchemy(engine)
+    return engine
+
+
+def test_decorator_leaves_function_untouched_when_capture_disabled():
+    # given
+    def find(email):
+        return email
+
+    # when
+    decorated = query_pattern(table="users", columns=["email"])(find)
+
+    # then
+    assert decorated is find
+
+
+def test_captured_sql_is_verified_against_declared_patterns(capture, engine):
+    # given
+    @query_pattern(table="users", columns=["email"])
+    def find_by_email(email):
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT id FROM users WHERE email = :email"), {"email": email}
+            ).fetchall()
+
+    @query_pattern(table="users", columns=["email"])
+    def find_by_name(name):
+        with engine.connect() as conn:
+            return conn.execute(
+                text("SELECT id FROM users WHERE name = :name ORDER BY id"),
+                {"name": name},
+            ).fetchall()
+
+    # when
+    find_by_email("a@example.com")
+    find_by_name("a")
+    findings = runtime.verify(runtime.drain())
+
+    # then
+    assert [(f.status, f.function.rsplit(".", 1)[-1]) for f in findings] == [
+        ("ok", "find_by_email"),
+        ("column-drift", "find_by_name"),
+    ]
+    assert findings[1].statement == runtime.ParsedStatement("users", ("name",), ("id",))
+
+
+def test_statements_outside_decorated_functions_are_not_recorded(capture, engine):
+    # when
+    with engine.connect() as conn:
+        conn.execute(text("SELECT id FROM users WHERE email = 'x'"))
+
+    # then
+    assert runtime.drain() == []
+
+
+def test_stacked_decorators_share_patterns_with_wrapper(capture):
+    # given
+    @query_pattern(table="t", columns=["a"])
+    @query_pattern(table="t", columns=["a", "b"])
+    def foo():
+        runtime.record("SELECT * FROM t WHERE a = 1")
+
+    # when
+    foo()
+    captured = runtime.drain()
+
+    # then
+    assert [p.columns for p in get_patterns(foo)] == [("a", "b"), ("a",)]
+    assert len(captured) == 1
+    assert captured[0].patterns == tuple(get_patterns(foo))
+
+
+def test_interleaved_coroutines_record_under_their_own_function(capture):
+    # given
+    @query_pattern(table="a", columns=["x"])
+    async def fa():
+        await asyncio.sleep(0)
+        runtime.record("SELECT * FROM a WHERE x = 1")
+        await asyncio.sleep(0.01)
+
+    @query_pattern(table="b", columns=["y"])
+    async def fb():
+        await asyncio.sleep(0)
+        await asyncio.sleep(0)
+        runtime.record("SELECT * FROM b WHERE y = 1")
+
+    async def main():
+        await asyncio.gather(fa(), fb())
+
+    # when
+    asyncio.run(main())
+    captured = runtime.drain()
+
+    # then
+    assert sorted((c.function.rsplit(".", 1)[-1], c.statement) for c in captured) == [
+        ("fa", "SELECT * FROM a WHERE x = 1"),
+        ("fb", "SELECT * FROM b WHERE y = 1"),
+    ]
+
+
+def test_ring_buffer_keeps_most_recent_statements_per_thread(capture):
+    # given
+    @query_pattern(table="t", columns=["a"])
+    def run(n):
+        for i in range(n):
+            runtime.record(f"SELECT * FROM t WHERE a = {i}")
+
+    # when
+    run(10)
+    thread = threading.Thread(target=run, args=(3,))
+    thread.start()
+    thread.join()
+    statements = [c.statement for c in runtime.drain()]
+
+    # then
+    assert len(statements) == 8 + 3
+    assert statements[:8] == [f"SELECT * FROM t WHERE a = {i}" for i in range(2, 10)]
+
+
+def test_drain_releases_buffers_of_finished_threads(capture):
+    # given
+    @query_pattern(table="t", columns=["a"])
+    def run():
+        runtime.record("SELECT * FROM t WHERE a = 1")
+
+    thread = threading.Thread(target=run)
+    thread.start()
+    thread.join()
+
+    # when
+    first = runtime.drain()
+    second = runtime.drain()
+
+    # then
+    assert [c.statement for c in first] == ["SELECT * FROM t WHERE a = 1"]
+    assert second == []
+    assert all(buffer.thread is not thread for buffer in runtime._buffers)
+
+
+def test_invalid_capture_environment_variable_warns(monkeypatch):
+    # given
+    monkeypatch.setenv("QUERY_PATTERNS_CAPTURE", "yes")
+
+    # when
+    with pytest.warns(RuntimeWarning, match="QUERY_PATTERNS_CAPTURE"):
+        runtime._enable_from_environment()
+
+    # then
+    assert not runtime.capture_enabled()
+
+
+@pytest.mark.parametrize(
+    "sql, expected",
+    [
+        (
+            'SELECT "users".id FROM "users" WHERE "users".org_id = ? AND users.created_at >= ? ORDER BY users.created_at DESC LIMIT 10',
+            runtime.ParsedStatement("users", ("org_id", "created_at"), ("created_at",)),
+        ),
+        (
+            "UPDATE orders SET status = ? WHERE id IN (?, ?)",
+            runtime.ParsedStatement("orders", ("id",), ()),
+        ),
+        (
+            "DELETE FROM public.sessions WHERE expires_at < now()",
+            runtime.ParsedStatement("sessions", ("expires_at",), ()),
+        ),
+        ("INSERT INTO users (email) VALUES (?)", None),
+    ],
+)
+def test_parse_statement(sql, expected):
+    assert runtime.parse_statement(sql) == expected
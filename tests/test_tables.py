@@ -0,0 +1,44 @@
+from query_patterns.tables import (
+    group_tables,
+    qualify_table,
+    split_database,
+    split_schema,
+)
+
+
+def test_qualify_and_split_round_trip():
+    # given
+    name = qualify_table("invoices", schema="billing", database="replica")
+
+    # when
+    database, rest = split_database(name)
+    schema, table = split_schema(rest)
+
+    # then
+    assert name == "replica:billing.invoices"
+    assert (database, schema, table) == ("replica", "billing", "invoices")
+    assert split_database("users") == (None, "users")
+    assert split_schema("users") == (None, "users")
+
+
+def test_group_tables_by_target():
+    # given
+    tables = {"users", "billing.invoices", "billing.refunds"}
+
+    # when
+    grouped = group_tables(tables, split_schema, targets=["audit"])
+
+    # then
+    assert grouped == {
+        None: {"users"},
+        "billing": {"invoices", "refunds"},
+        "audit": {"users"},
+    }
+
+
+def test_group_tables_without_tables_reads_every_target():
+    # when
+    grouped = group_tables(None, split_database, targets=["replica"])
+
+    # then
+    assert grouped == {None: None, "replica": None}